@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Deduplicated image records shared by NBHScraper and NextJSScraper
+Each image is kept once under an asset ID derived from its source URL, and pages refer to it by that ID
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+
+def asset_id(url):
+    """Stable short ID for an image's absolute source URL"""
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+
+
+@dataclass(slots=True)
+class ImageAsset:
+    src: str  # Remote URL, or public path once NextJSScraper has stored it
+    alt: str = ''
+    title: str = ''
+    width: str = ''
+    height: str = ''
+    page_url: str = ''  # First page the image was found on
+    pages: int = 0  # Pages that show it
+
+    def as_dict(self, camel_case=False):
+        record = {"src": self.src, "alt": self.alt, "title": self.title, "width": self.width, "height": self.height}
+        if camel_case:
+            record.update(pageUrl=self.page_url, pages=self.pages)
+        else:
+            record.update(page_url=self.page_url, pages=self.pages)
+        return record
+
+
+class AssetTable:
+    """Image assets keyed by asset ID, the first record seen for an ID wins as with the old per-page copies"""
+
+    def __init__(self):
+        self.assets = {}
+
+    def add(self, key, record):
+        """Fold one page's record of an image into the table and return its ID"""
+        asset = self.assets.get(key)
+        if asset is None:
+            asset = self.assets[key] = ImageAsset(
+                record["src"], record.get("alt", ''), record.get("title", ''), record.get("width", ''),
+                record.get("height", ''), record.get("page_url", record.get("pageUrl", ''))
+            )
+        asset.pages += 1
+        return key
+
+    def add_page(self, records):
+        """Fold a page's {asset ID: record} map into the table, counting each image once per page"""
+        for key, record in records.items():
+            self.add(key, record)
+        return list(records)
+
+    def get(self, key):
+        return self.assets.get(key)
+
+    def replace_paths(self, mapping):
+        """Swap provisional src paths per mapping, as replace_image_paths does for page records"""
+        for asset in self.assets.values():
+            asset.src = mapping.get(asset.src, asset.src)
+
+    def records(self, camel_case=False):
+        """Plain dicts for JSON output, sorted by ID so unchanged tables keep their bytes"""
+        return {key: self.assets[key].as_dict(camel_case) for key in sorted(self.assets)}
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __contains__(self, key):
+        return key in self.assets
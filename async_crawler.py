@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Async crawl engine shared by NBHScraper and NextJSScraper
+Keeps several page fetches in flight while extraction stays on the event loop thread
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from parse_workers import make_parse_pool, merge_parsed, parse_in_worker
+
+
+class AsyncCrawler:
+    def __init__(self, scraper, concurrency=8, per_host_limit=4, parse_workers=0):
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.parse_workers = parse_workers  # Worker processes for parsing, 0 parses in-process
+        self.host_slots = {}  # Map host to its concurrency semaphore
+        self.parse_pool = None
+
+    def run(self, frontier, max_pages=100):
+        """Crawl URLs from the frontier and return the number of pages fetched"""
+        return asyncio.run(self._crawl(frontier, max_pages))
+
+    async def _crawl(self, frontier, max_pages):
+        scraper = self.scraper
+        in_flight = set()
+        pages_scraped = 0
+
+        # Pages being parsed count towards the window too, so keep room for fetches
+        window = self.concurrency + self.parse_workers
+
+        # Blocking requests calls run in a dedicated pool sized to the crawl
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        if self.parse_workers:
+            self.parse_pool = make_parse_pool(scraper, self.parse_workers)
+        try:
+            while frontier or in_flight:
+                # Top up the in-flight window
+                while (frontier and len(in_flight) < window
+                       and pages_scraped + len(in_flight) < max_pages):
+                    url = frontier.pop()
+                    if url in scraper.visited_urls:
+                        continue
+                    scraper.visited_urls.add(url)
+                    in_flight.add(asyncio.create_task(self._fetch(executor, url)))
+
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, page, error = task.result()
+                    pages_scraped += 1
+                    if error:
+                        scraper.record_error(url, error)
+                        continue
+
+                    # Results are merged here so scraper state is only touched by one thread
+                    try:
+                        if self.parse_pool is not None:
+                            new_links = merge_parsed(scraper, page)
+                        else:
+                            new_links = scraper.process_page(url, page)
+                    except Exception as e:
+                        scraper.record_error(url, e)
+                        continue
+
+                    for link in new_links or []:
+                        if link not in scraper.visited_urls:
+                            frontier.add(link)
+        finally:
+            executor.shutdown(wait=True)
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown(wait=True)
+                self.parse_pool = None
+
+        return pages_scraped
+
+    async def _fetch(self, executor, url):
+        """Fetch one page while holding a slot for its host, then parse it if workers are in use"""
+        host = urlparse(url).netloc
+        slots = self.host_slots.get(host)
+        if slots is None:
+            slots = self.host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+
+        await slots.acquire()
+        print(f"Scraping: {url}")
+        loop = asyncio.get_running_loop()
+        try:
+            if self.parse_pool is not None:
+                page = await loop.run_in_executor(executor, self.scraper.fetch_content, url)
+            else:
+                page = await loop.run_in_executor(executor, self.scraper.fetch_page, url)
+            result = (url, page, None)
+        except Exception as e:
+            result = (url, None, e)
+
+        # Pacing is the rate limiter's job, the slot only caps requests in flight
+        slots.release()
+
+        if self.parse_pool is not None and result[2] is None:
+            # Parsing happens after the host slot is released
+            content, encoding = result[1]
+            try:
+                page = await loop.run_in_executor(self.parse_pool, parse_in_worker, url, content, encoding)
+                result = (url, page, None)
+            except Exception as e:
+                result = (url, None, e)
+
+        return result
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end crawl benchmark
+Runs NBHScraper and NextJSScraper crawl_site, separately or as one combined CrawlCore crawl, against the
+local stand-in site and saves pages/sec, bytes/sec, per-extractor CPU time, peak RSS and output size as JSON
+for comparing versions
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.site_server import StandInSite, start_server
+
+# Methods timed in each scraper, nested calls are counted in both
+EXTRACTORS = {
+    'nbh': ['parse_tree', 'extract_page', 'extract_all', 'clean_text', 'store_page'],
+    'nextjs': ['parse_tree', 'extract_page', 'extract_seo_data', 'extract_navigation', 'extract_components',
+               'extract_page_content', 'categorize_page', 'clean_text', 'download_image', 'store_page'],
+}
+# One crawl feeding both scrapers through CrawlCore
+EXTRACTORS['combined'] = [f'{name}.{method}' for name in ('nbh', 'nextjs') for method in EXTRACTORS[name]]
+
+
+def instrument(scraper, names, prefix=''):
+    """Wrap scraper methods to accumulate CPU seconds and call counts"""
+    stats = {}
+    for name in names:
+        method = getattr(scraper, name)
+        entry = stats[prefix + name] = {"cpu_seconds": 0.0, "calls": 0}
+
+        def timed(*args, _method=method, _entry=entry, **kwargs):
+            start = time.thread_time()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                _entry["cpu_seconds"] += time.thread_time() - start
+                _entry["calls"] += 1
+
+        setattr(scraper, name, timed)
+    return stats
+
+
+def tree_size(*paths):
+    total = 0
+    for path in paths:
+        if os.path.isfile(path):
+            total += os.path.getsize(path)
+        for dirpath, _, filenames in os.walk(path):
+            total += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+    return total
+
+
+def run_worker(args):
+    """Crawl in this process and write the measurements to args.result"""
+    os.chdir(args.workdir)
+    scrapers = {}
+    if args.worker in ('nbh', 'combined'):
+        from scraper import NBHScraper
+        scrapers['nbh'] = NBHScraper(args.base_url, cache_dir=None, parser=args.parser, state_path=None)
+    if args.worker in ('nextjs', 'combined'):
+        from scraper_nextjs import NextJSScraper
+        scrapers['nextjs'] = NextJSScraper(args.base_url, cache_dir=None, parser=args.parser, state_path=None,
+                                           stream_dir='.crawl_pages')
+    extractors = {}
+    for name, scraper in scrapers.items():
+        # The stand-in site is local, the politeness cap would only measure the limiter
+        scraper.rate_limiter.max_rate = 1000.0
+        prefix = f'{name}.' if args.worker == 'combined' else ''
+        extractors.update(instrument(scraper, EXTRACTORS[name], prefix))
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    if args.worker == 'combined':
+        from crawl_core import CrawlCore
+        CrawlCore(scrapers.values()).crawl(max_pages=args.max_pages, concurrency=args.concurrency,
+                                           delay=args.delay, image_workers=4)
+    else:
+        scrapers[args.worker].crawl_site(max_pages=args.max_pages, concurrency=args.concurrency,
+                                         delay=args.delay, parse_workers=args.parse_workers)
+    crawl_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    outputs = []
+    if 'nbh' in scrapers:
+        scrapers['nbh'].save_data('scraped_content')
+        outputs += ['scraped_content']
+    if 'nextjs' in scrapers:
+        scrapers['nextjs'].save_nextjs_data()
+        outputs += ['src', 'public', 'scrape_summary.json', 'scrape_changes.json']
+    save_seconds = time.perf_counter() - start
+
+    result = {
+        # Sinks of a combined crawl share one visited set
+        "pages": len(next(iter(scrapers.values())).visited_urls),
+        "crawl_seconds": crawl_seconds,
+        "save_seconds": save_seconds,
+        "cpu_seconds": time.process_time() - cpu_start,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "output_bytes": tree_size(*outputs),
+        "extractors": extractors,
+    }
+    with open(args.result, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def bench_scraper(name, site, args):
+    with tempfile.TemporaryDirectory() as workdir:
+        result_path = os.path.join(workdir, 'result.json')
+        command = [
+            sys.executable, os.path.abspath(__file__), '--worker', name,
+            '--base-url', site.base_url, '--workdir', workdir, '--result', result_path,
+            '--max-pages', str(args.max_pages), '--concurrency', str(args.concurrency),
+            '--delay', str(args.delay), '--parser', args.parser, '--parse-workers', str(args.parse_workers),
+        ]
+        bytes_before = site.bytes_sent
+        requests_before = site.requests
+        # Scrapers print progress per page, keep it out of the report
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, cwd=ROOT)
+        with open(result_path, encoding='utf-8') as f:
+            result = json.load(f)
+
+    result["requests"] = site.requests - requests_before
+    result["bytes_downloaded"] = site.bytes_sent - bytes_before
+    result["pages_per_second"] = result["pages"] / result["crawl_seconds"]
+    result["bytes_per_second"] = result["bytes_downloaded"] / result["crawl_seconds"]
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def report(name, result):
+    print(f"\n{name}: {result['pages']} pages in {result['crawl_seconds']:.2f}s")
+    print(f"  {result['pages_per_second']:.1f} pages/sec, {result['bytes_per_second'] / 1e6:.2f} MB/sec "
+          f"({result['requests']} requests)")
+    print(f"  peak RSS {result['peak_rss_bytes'] / 1e6:.1f} MB, output {result['output_bytes'] / 1e6:.2f} MB, "
+          f"save {result['save_seconds']:.2f}s")
+    for extractor, stats in sorted(result["extractors"].items(), key=lambda item: -item[1]["cpu_seconds"]):
+        print(f"  {extractor:<28}{stats['cpu_seconds'] * 1000:10.1f} ms CPU  {stats['calls']:7d} calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end crawl benchmark")
+    parser.add_argument('--pages', type=int, default=100, help='synthetic pages served, 100 to 10000')
+    parser.add_argument('--max-pages', type=int, default=None, help='crawl limit, defaults to every page')
+    parser.add_argument('--scrapers', default='nbh,nextjs', help='comma-separated, combined crawls once for both')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--delay', type=float, default=0.0)
+    parser.add_argument('--parser', default='html.parser')
+    parser.add_argument('--parse-workers', type=int, default=0)
+    parser.add_argument('--no-recorded', action='store_true', help='serve synthetic pages only')
+    parser.add_argument('--duplicates', action='store_true', help='link trailing-slash and ?lang= duplicates too')
+    parser.add_argument('--output', help='results file, defaults to benchmarks/results/crawl-<revision>.json')
+    # Internal: run one scraper inside a subprocess so peak RSS is its own
+    parser.add_argument('--worker', choices=sorted(EXTRACTORS), help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    site = StandInSite(args.pages, recorded=not args.no_recorded, duplicates=args.duplicates)
+    server = start_server(site)
+    if args.max_pages is None:
+        # The crawl also requests the scrapers' common paths, most of which are 404 here
+        args.max_pages = args.pages + len(site.recorded) + 20
+    revision = git_revision()
+    print(f"Stand-in site at {site.base_url}: {len(site.recorded)} recorded + {args.pages} synthetic pages")
+
+    results = {}
+    try:
+        for name in args.scrapers.split(','):
+            results[name] = bench_scraper(name, site, args)
+            report(name, results[name])
+    finally:
+        server.shutdown()
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f'crawl-{revision}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "revision": revision,
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "config": {
+                "synthetic_pages": args.pages,
+                "recorded_pages": len(site.recorded),
+                "max_pages": args.max_pages,
+                "concurrency": args.concurrency,
+                "delay": args.delay,
+                "parser": args.parser,
+                "parse_workers": args.parse_workers,
+                "duplicates": args.duplicates,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
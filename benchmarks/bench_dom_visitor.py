@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Per-page extraction benchmark
+Compares the multi-pass extract_* functions NBHScraper used to run with its single-pass extract_all
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from benchmarks.corpus import BASE_URL, wix_page
+from scraper import NBHScraper
+
+
+# Reference multi-pass extractors, as NBHScraper ran them before extract_all
+def extract_metadata(scraper, soup):
+    """Extract page metadata"""
+    metadata = {}
+
+    # Title
+    title_tag = soup.find('title')
+    metadata['title'] = title_tag.text.strip() if title_tag else ""
+
+    # Meta tags
+    for meta in soup.find_all('meta'):
+        name = meta.get('name') or meta.get('property', '')
+        content = meta.get('content', '')
+        if name and content:
+            metadata[name] = content
+
+    # Canonical URL
+    canonical = soup.find('link', {'rel': 'canonical'})
+    if canonical:
+        metadata['canonical_url'] = canonical.get('href', '')
+
+    return metadata
+
+
+def extract_navigation(scraper, soup):
+    """Extract navigation menu structure"""
+    nav_data = {
+        "main_menu": [],
+        "footer_menu": [],
+        "social_links": []
+    }
+
+    # Try to find navigation elements
+    nav_elements = soup.find_all(['nav', 'header'])
+    for nav in nav_elements:
+        links = nav.find_all('a')
+        for link in links:
+            href = link.get('href', '')
+            text = scraper.clean_text(link.get_text())
+            if href and text:
+                nav_item = {
+                    "text": text,
+                    "url": urljoin(scraper.base_url, href),
+                    "type": "internal" if scraper.base_url in urljoin(scraper.base_url, href) else "external"
+                }
+                if 'footer' in str(nav.get('class', [])).lower():
+                    nav_data["footer_menu"].append(nav_item)
+                else:
+                    nav_data["main_menu"].append(nav_item)
+
+    # Extract social links
+    social_patterns = ['facebook', 'twitter', 'instagram', 'linkedin', 'youtube', 'pinterest']
+    all_links = soup.find_all('a', href=True)
+    for link in all_links:
+        href = link.get('href', '').lower()
+        for pattern in social_patterns:
+            if pattern in href:
+                nav_data["social_links"].append({
+                    "platform": pattern,
+                    "url": link.get('href', ''),
+                    "text": scraper.clean_text(link.get_text())
+                })
+                break
+
+    return nav_data
+
+
+def extract_content_sections(scraper, soup):
+    """Extract main content sections from the page"""
+    content = {
+        "headers": [],
+        "paragraphs": [],
+        "lists": [],
+        "sections": []
+    }
+
+    # Extract headers
+    for i in range(1, 7):
+        headers = soup.find_all(f'h{i}')
+        for header in headers:
+            text = scraper.clean_text(header.get_text())
+            if text:
+                content["headers"].append({
+                    "level": i,
+                    "text": text,
+                    "id": header.get('id', '')
+                })
+
+    # Extract paragraphs
+    paragraphs = soup.find_all('p')
+    for p in paragraphs:
+        text = scraper.clean_text(p.get_text())
+        if text and len(text) > 20:  # Filter out very short paragraphs
+            content["paragraphs"].append(text)
+
+    # Extract lists
+    for list_type in ['ul', 'ol']:
+        lists = soup.find_all(list_type)
+        for lst in lists:
+            items = []
+            for li in lst.find_all('li'):
+                text = scraper.clean_text(li.get_text())
+                if text:
+                    items.append(text)
+            if items:
+                content["lists"].append({
+                    "type": list_type,
+                    "items": items
+                })
+
+    # Extract main content sections
+    main_sections = soup.find_all(['section', 'article', 'main'])
+    for section in main_sections:
+        section_data = {
+            "id": section.get('id', ''),
+            "class": ' '.join(section.get('class', [])),
+            "content": scraper.clean_text(section.get_text())[:500]  # First 500 chars
+        }
+        if section_data["content"]:
+            content["sections"].append(section_data)
+
+    return content
+
+
+def extract_images(scraper, soup, page_url):
+    """Extract all images from the page"""
+    images = []
+    img_tags = soup.find_all('img')
+
+    for img in img_tags:
+        src = img.get('src', '')
+        if src:
+            img_data = {
+                "src": urljoin(page_url, src),
+                "alt": img.get('alt', ''),
+                "title": img.get('title', ''),
+                "width": img.get('width', ''),
+                "height": img.get('height', ''),
+                "page_url": page_url
+            }
+            images.append(img_data)
+
+    return images
+
+
+def extract_forms(scraper, soup):
+    """Extract form data from the page"""
+    forms = []
+    form_tags = soup.find_all('form')
+
+    for form in form_tags:
+        form_data = {
+            "action": form.get('action', ''),
+            "method": form.get('method', 'get'),
+            "id": form.get('id', ''),
+            "fields": []
+        }
+
+        # Extract form fields
+        inputs = form.find_all(['input', 'textarea', 'select'])
+        for field in inputs:
+            field_data = {
+                "type": field.get('type', field.name),
+                "name": field.get('name', ''),
+                "id": field.get('id', ''),
+                "placeholder": field.get('placeholder', ''),
+                "required": field.has_attr('required')
+            }
+            form_data["fields"].append(field_data)
+
+        if form_data["fields"]:
+            forms.append(form_data)
+
+    return forms
+
+
+def multi_pass(scraper, soup, url):
+    """The extraction scrape_page ran before the single-pass visitor"""
+    data = {
+        "metadata": extract_metadata(scraper, soup),
+        "navigation": extract_navigation(scraper, soup),
+        "content": extract_content_sections(scraper, soup),
+        "images": extract_images(scraper, soup, url),
+        "forms": extract_forms(scraper, soup)
+    }
+    links = []
+    for link in soup.find_all('a', href=True):
+        href = urljoin(url, link['href'])
+        if scraper.base_url in href and href not in scraper.visited_urls:
+            links.append(href)
+    return data, links
+
+
+def single_pass(scraper, soup, url):
+    return scraper.extract_all(soup, url)
+
+
+def timed(func, scraper, soups, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, soup in soups:
+            func(scraper, soup, url)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(soups)
+
+
+def main():
+    scraper = NBHScraper(BASE_URL, cache_dir=None)
+    pages = 20
+    soups = []
+    for i in range(pages):
+        url = f"{BASE_URL}/page-{i}"
+        soups.append((url, BeautifulSoup(wix_page(i, sections=16, depth=14), 'html.parser')))
+
+    # The single-pass engine must produce identical page data
+    for url, soup in soups:
+        if multi_pass(scraper, soup, url) != single_pass(scraper, soup, url):
+            print(f"MISMATCH on {url}")
+            sys.exit(1)
+
+    multi = timed(multi_pass, scraper, soups, repeat=3)
+    single = timed(single_pass, scraper, soups, repeat=3)
+    print(f"pages: {pages} (identical output)")
+    print(f"multi-pass:  {multi * 1000:8.2f} ms/page")
+    print(f"single-pass: {single * 1000:8.2f} ms/page")
+    print(f"speedup:     {multi / single:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Frontier benchmark
+Compares per-URL enqueue/dequeue cost of CrawlFrontier against the old list-based to_visit
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl_frontier import CrawlFrontier
+
+BASE_URL = "https://www.nothingbetterhealth.com"
+
+
+def make_urls(count):
+    return [f"{BASE_URL}/page-{i}" for i in range(count)]
+
+
+def bench_list(urls):
+    """Old crawl_site behaviour: linear membership check and pop(0)"""
+    to_visit = []
+    start = time.perf_counter()
+    for url in urls:
+        if url not in to_visit:
+            to_visit.append(url)
+    enqueue = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while to_visit:
+        to_visit.pop(0)
+    dequeue = time.perf_counter() - start
+    return enqueue, dequeue
+
+
+def bench_frontier(urls, **kwargs):
+    frontier = CrawlFrontier(**kwargs)
+    start = time.perf_counter()
+    for i, url in enumerate(urls):
+        frontier.add(url, priority=i % 4)
+    # Re-adding every URL exercises the dedup path
+    for url in urls:
+        frontier.add(url)
+    enqueue = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while frontier:
+        frontier.pop()
+    dequeue = time.perf_counter() - start
+    return enqueue, dequeue
+
+
+def main():
+    sizes = [1000, 10000, 100000, 250000]
+    list_limit = 10000  # The list baseline is quadratic, keep it short
+
+    print(f"{'urls':>8}  {'impl':<16}{'enqueue us/url':>16}{'dequeue us/url':>16}")
+    for size in sizes:
+        urls = make_urls(size)
+        runs = [
+            ('frontier', bench_frontier(urls)),
+            ('frontier+bloom', bench_frontier(urls, use_bloom=True, bloom_capacity=size)),
+        ]
+        if size <= list_limit:
+            runs.insert(0, ('list', bench_list(urls)))
+
+        for name, (enqueue, dequeue) in runs:
+            print(f"{size:>8}  {name:<16}{enqueue / size * 1e6:>16.3f}{dequeue / size * 1e6:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
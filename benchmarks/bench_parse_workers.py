@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Parse worker throughput benchmark
+Feeds pre-fetched page bytes through 1/2/4/8 parse worker processes and reports pages/sec
+against in-process parsing
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import BASE_URL, wix_page
+from parse_workers import DeferredDownloads, make_parse_pool, merge_parsed, parse_in_worker
+from scraper import NBHScraper
+from scraper_nextjs import NextJSScraper
+
+
+def in_process(scraper, pages):
+    start = time.perf_counter()
+    for url, content in pages:
+        scraper.process_page(url, content.decode('utf-8'))
+    return time.perf_counter() - start
+
+
+def with_workers(scraper, pages, workers):
+    pool = make_parse_pool(scraper, workers)
+    try:
+        # Warm the workers up so process start-up is not counted
+        list(pool.map(parse_in_worker, [pages[0][0]] * workers, [pages[0][1]] * workers, ['utf-8'] * workers))
+
+        start = time.perf_counter()
+        futures = [pool.submit(parse_in_worker, url, content, 'utf-8') for url, content in pages]
+        for future in futures:
+            merge_parsed(scraper, future.result())
+        return time.perf_counter() - start
+    finally:
+        pool.shutdown(wait=True)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 80
+    pages = [(f"{BASE_URL}/page-{i}", wix_page(i, sections=16, depth=14).encode('utf-8')) for i in range(count)]
+    print(f"{count} pages, {os.cpu_count()} CPUs available")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        for name, make_scraper, parser in (
+            ('NBHScraper', NBHScraper, 'lxml-direct'),
+            ('NextJSScraper', NextJSScraper, 'lxml'),
+        ):
+            scraper = make_scraper(BASE_URL, cache_dir=None, parser=parser)
+            scraper.image_pool = DeferredDownloads()
+            baseline = in_process(scraper, pages)
+            print(f"{name:<14}{'in-process':<12}{count / baseline:10.1f} pages/sec")
+
+            for workers in (1, 2, 4, 8):
+                scraper = make_scraper(BASE_URL, cache_dir=None, parser=parser)
+                scraper.image_pool = DeferredDownloads()
+                elapsed = with_workers(scraper, pages, workers)
+                print(f"{name:<14}{f'{workers} workers':<12}{count / elapsed:10.1f} pages/sec"
+                      f"  ({baseline / elapsed:.2f}x in-process)")
+
+
+if __name__ == "__main__":
+    main()
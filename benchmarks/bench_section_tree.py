@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Section tree benchmark
+Rebuilds the most deeply nested page recorded in src/data/siteData.json as Wix-style HTML and
+compares the old per-container extract_page_content with the single-pass section builder
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import BASE_URL, nested
+from html_parsers import make_soup
+from scraper_nextjs import NextJSScraper
+
+
+def legacy_extract_page_content(scraper, soup, page_url):
+    """extract_page_content as it was before the section builder, kept for comparison"""
+    content = {"sections": [], "images": {}}
+    main_content = soup.find('main') or soup.find('article') or soup.find('body')
+    if main_content:
+        for section in main_content.find_all(['section', 'div']):
+            section_data = {
+                "id": section.get('id', ''),
+                "className": ' '.join(section.get('class', [])),
+                "heading": None,
+                "content": [],
+                "images": []
+            }
+            heading = section.find(['h1', 'h2', 'h3'])
+            if heading:
+                section_data["heading"] = {
+                    "level": int(heading.name[1]),
+                    "text": scraper.clean_text(heading.get_text())
+                }
+            for elem in section.find_all(['p', 'ul', 'ol', 'blockquote', 'img', 'figure'], recursive=False):
+                scraper.add_content_block(elem, section_data, content, page_url)
+            if section_data["content"] or section_data["heading"]:
+                content["sections"].append(section_data)
+    return content
+
+
+def heading_depth(page):
+    """Longest run of sections repeating one heading, i.e. the recorded wrapper depth"""
+    best = run = 1
+    previous = None
+    for section in page["content"]["sections"]:
+        heading = json.dumps(section["heading"])
+        run = run + 1 if section["heading"] and heading == previous else 1
+        best = max(best, run)
+        previous = heading
+    return best
+
+
+def render_page(page, depth):
+    """Turn recorded sections back into nested HTML"""
+    rng = random.Random(page["slug"])
+    blocks = []
+    previous = None
+    for section in page["content"]["sections"]:
+        heading = section["heading"]
+        html = ''
+        if heading and json.dumps(heading) != previous:
+            html += f'<h{heading["level"]}>{heading["text"]}</h{heading["level"]}>'
+        previous = json.dumps(heading)
+        for block in section["content"]:
+            if block["type"] == 'paragraph':
+                html += f'<p>{block["text"]}</p>'
+            elif block["type"] == 'list':
+                items = ''.join(f'<li>{item}</li>' for item in block["items"])
+                html += f'<{block["listType"]}>{items}</{block["listType"]}>'
+            elif block["type"] == 'blockquote':
+                html += f'<blockquote>{block["text"]}</blockquote>'
+            elif block["type"] in ('image', 'figure'):
+                html += f'<img src="https://static.wixstatic.com/media/{rng.randint(0, 9999)}.jpg" alt="{block["alt"]}">'
+        if html:
+            blocks.append(nested(f'<div class="wixui-rich-text">{html}</div>', depth, rng))
+    return f'<html><body><main>{nested("".join(blocks), 3, rng)}</main></body></html>'
+
+
+class SkipDownloads:
+    def submit(self, key, *args):
+        return None
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    with open(os.path.join(ROOT, 'src', 'data', 'siteData.json'), encoding='utf-8') as f:
+        site_data = json.load(f)
+    pages = list(site_data["pages"].values()) + list(site_data["blog"]["posts"].values())
+    page = max(pages, key=lambda p: (heading_depth(p), len(p["content"]["sections"])))
+    depth = heading_depth(page)
+    print(f"deepest recorded page: {page['slug']} ({len(page['content']['sections'])} sections, "
+          f"heading repeated across {depth} nested containers)")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        scraper = NextJSScraper(BASE_URL, cache_dir=None)
+        scraper.image_pool = SkipDownloads()
+
+        print(f"{'depth':>6}{'legacy ms':>12}{'sections':>10}{'builder ms':>12}{'sections':>10}{'speedup':>9}")
+        for scale in (1, 2, 4):
+            soup = make_soup(render_page(page, depth * scale))
+            legacy, old = timed(lambda: legacy_extract_page_content(scraper, soup, page["url"]))
+            builder, new = timed(lambda: scraper.extract_page_content(soup, page["url"]))
+            print(f"{depth * scale:>6}{legacy * 1000:>12.2f}{len(old['sections']):>10}"
+                  f"{builder * 1000:>12.2f}{len(new['sections']):>10}{legacy / builder:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Text normalization benchmark
+Runs the previous per-call clean_text against text_normalize on every string in
+src/data/siteData.json, checking the output is identical
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from text_normalize import clean_text, clean_text_uncached, clean_texts
+
+
+def legacy_clean_text(text):
+    """clean_text as both scrapers implemented it before text_normalize"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\-.,!?;:()\'"/@#$%&*+=]', '', text)
+    return text.strip()
+
+
+def collect_strings(value, out):
+    if isinstance(value, str):
+        out.append(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            out.append(key)
+            collect_strings(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            collect_strings(item, out)
+    return out
+
+
+def timed(func, strings, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(strings)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    with open(os.path.join(ROOT, 'src', 'data', 'siteData.json'), encoding='utf-8') as f:
+        strings = collect_strings(json.load(f), [])
+    # Messier variants of the same strings, as get_text() returns them
+    strings += ['\n  ' + s.replace(' ', ' \t\n ') + '  ★ ' for s in strings]
+    repeat = 20
+
+    expected = [legacy_clean_text(s) for s in strings]
+    assert [clean_text_uncached(s) for s in strings] == expected, "fast path output differs"
+    assert clean_texts(strings) == expected, "batch output differs"
+    print(f"{len(strings)} strings ({len(set(strings))} distinct), outputs identical")
+
+    results = (
+        ('legacy re.sub', lambda ss: [legacy_clean_text(s) for s in ss]),
+        ('fast path, no cache', lambda ss: [clean_text_uncached(s) for s in ss]),
+        ('clean_text (cached)', lambda ss: [clean_text(s) for s in ss]),
+        ('clean_texts (batch)', clean_texts),
+    )
+    baseline = None
+    for name, func in results:
+        elapsed = timed(func, strings, repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<22}{elapsed / len(strings) * 1e6:8.3f} us/string  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
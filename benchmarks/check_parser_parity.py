@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Parser backend parity check
+Runs both scrapers over the same pages with every parser backend, verifies the extracted
+data is equivalent and reports per-page parse + extract time
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import BASE_URL, wix_page
+from html_parsers import PARSER_BACKENDS
+from scraper import NBHScraper
+from scraper_nextjs import NextJSScraper
+
+# Hand-written edge cases on top of the synthetic corpus
+EDGE_CASES = [
+    '<html><head><title> Edge &amp; Case </title><link rel="canonical stylesheet" href="/c"></head>'
+    '<body><p>Text with a <!-- comment --> comment and <script>var x = 1;</script>inline script '
+    'that should not leak</p><ul><li>One <style>.a{}</style>item</li><li>  </li></ul>'
+    '<nav class="site-footer menu"><a href="/x">Footer &nbsp; link</a></nav>'
+    '<form><input required name="q"><textarea></textarea></form></body></html>',
+    '<html><body><main><section id="s" class="a  b"><h3>Heading\n\t split</h3>'
+    '<p>Café – unicode punctuation © 2024 should be cleaned the same way</p></section>'
+    '<img src="relative.png" alt="" width="10"><a href="https://www.facebook.com/x">fb</a></main></body></html>',
+]
+
+
+class SkipDownloads:
+    """Stand-in image pool so NextJSScraper computes local paths without fetching"""
+
+    def submit(self, key, *args):
+        return None
+
+
+def strip_timestamps(data):
+    if isinstance(data, dict):
+        return {k: strip_timestamps(v) for k, v in data.items() if k not in ('scraped_at', 'scrapedAt')}
+    if isinstance(data, list):
+        return [strip_timestamps(v) for v in data]
+    return data
+
+
+def run(scraper, pages):
+    start = time.perf_counter()
+    for url, html in pages:
+        scraper.process_page(url, html)
+    return time.perf_counter() - start
+
+
+def main():
+    pages = [(f"{BASE_URL}/page-{i}", wix_page(i, sections=16, depth=14)) for i in range(20)]
+    pages += [(f"{BASE_URL}/edge-{i}", html) for i, html in enumerate(EDGE_CASES)]
+
+    failures = 0
+    # NextJSScraper decides image paths relative to the working directory
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        for name, make_scraper, output in (
+            ('NBHScraper', NBHScraper, lambda s: [s.content_data, s.assets.records(), s.templates.records()]),
+            ('NextJSScraper', NextJSScraper, lambda s: [s.site_data, s.assets.records(), s.templates.records()]),
+        ):
+            reference = None
+            for backend in PARSER_BACKENDS:
+                scraper = make_scraper(BASE_URL, cache_dir=None, parser=backend)
+                scraper.image_pool = SkipDownloads()
+                elapsed = run(scraper, pages)
+                data = json.loads(json.dumps(strip_timestamps(output(scraper)), default=list))
+
+                if reference is None:
+                    reference = data
+                    status = 'reference'
+                elif data == reference:
+                    status = 'equivalent'
+                else:
+                    status = 'DIFFERS'
+                    failures += 1
+                print(f"{name:<14}{backend:<14}{elapsed / len(pages) * 1000:8.2f} ms/page  {status}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
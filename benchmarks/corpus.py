@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Synthetic Wix-like page generator for the benchmarks
+Pages mimic the deeply nested div soup, repeated header/footer and image-heavy sections of the live site
+"""
+
+import random
+
+BASE_URL = "https://www.nothingbetterhealth.com"
+
+WORDS = (
+    "mental health medication management care provider patient virtual visit insurance "
+    "anxiety depression adhd treatment psychiatric nurse practitioner appointment referral "
+    "maryland virginia district columbia telehealth support individual needs plan team"
+).split()
+
+NAV_SLUGS = [
+    "all-locations-and-services", "district-of-columbia", "maryland", "virginia",
+    "about-our-care", "providers", "medications-we-rx", "all-resources", "faq", "contact-us"
+]
+
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def nested(html, depth, rng):
+    """Wrap html in depth levels of Wix-style anonymous divs"""
+    for level in range(depth):
+        class_name = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(6))
+        html = f'<div class="{class_name}" data-testid="level-{level}">{html}</div>'
+    return html
+
+
+def wix_page(index, slug=None, sections=12, depth=12, images=6, links=None, seed=None, base_url=BASE_URL):
+    """Return the HTML of one synthetic page"""
+    rng = random.Random(index if seed is None else seed)
+    slug = slug or f"page-{index}"
+    title = f"{sentence(rng, 4)[:-1]} | Nothing Better Health"
+
+    nav = ''.join(
+        f'<li><a href="{base_url}/{nav_slug}">{nav_slug.replace("-", " ").title()}</a></li>'
+        for nav_slug in NAV_SLUGS
+    )
+    header = (
+        f'<header id="SITE_HEADER" class="wixui-header"><a href="{base_url}">'
+        f'<img src="https://static.wixstatic.com/media/logo16.png" alt="logo"></a>'
+        f'<nav class="wixui-dropdown-menu"><ul>{nav}</ul></nav></header>'
+    )
+    footer = (
+        '<footer id="SITE_FOOTER" class="wixui-footer"><p>Nothing Better Health, virtual mental '
+        'health care throughout DC, MD and VA.</p>'
+        '<a href="https://www.facebook.com/nothingbetterhealth">Facebook</a>'
+        '<a href="https://www.instagram.com/nothingbetterhealth">Instagram</a>'
+        f'<a href="{base_url}/privacy-policy">Privacy Policy</a></footer>'
+    )
+
+    body = []
+    for i in range(sections):
+        parts = [f'<h2 class="font_2">{sentence(rng, 5)}</h2>']
+        for _ in range(rng.randint(1, 3)):
+            parts.append(nested(f'<p class="font_8">{sentence(rng, rng.randint(8, 30))}</p>', 3, rng))
+        if i % 3 == 0:
+            items = ''.join(f'<li><p>{sentence(rng, 6)}</p></li>' for _ in range(rng.randint(2, 6)))
+            parts.append(f'<ul class="font_8">{items}</ul>')
+        if i < images:
+            image_id = f"11062b_{index:04d}{i:04d}~mv2.jpg"
+            src = f"https://static.wixstatic.com/media/{image_id}/v1/fill/w_980,h_551/{image_id}"
+            if i % 2:
+                parts.append(f'<figure><img src="{src}" alt="{sentence(rng, 3)}" width="980" height="551">'
+                             f'<figcaption>{sentence(rng, 5)}</figcaption></figure>')
+            else:
+                parts.append(f'<img src="{src}" alt="{sentence(rng, 3)}" width="980" height="551">')
+        if i % 4 == 1:
+            parts.append(f'<a href="{base_url}/apppointment" class="wixui-button">Book Now</a>')
+        section_html = nested(''.join(parts), depth, rng)
+        body.append(f'<section id="comp-{index}-{i}" class="wixui-section">{section_html}</section>')
+
+    if index % 5 == 0:
+        body.append(
+            '<form action="/contact" method="post" id="contact-form">'
+            '<input type="text" name="name" placeholder="Name" required>'
+            '<input type="email" name="email" placeholder="Email" required>'
+            '<input type="hidden" name="token" value="x">'
+            '<select name="state"><option>DC</option><option>MD</option><option>VA</option></select>'
+            '<textarea name="message" placeholder="Message"></textarea></form>'
+        )
+
+    for link in links or []:
+        body.append(f'<a href="{base_url}/{link}">{link.replace("-", " ").title()}</a>')
+
+    description = sentence(rng, 20)
+    return (
+        '<!DOCTYPE html><html lang="en"><head>'
+        f'<meta charset="utf-8"><title>{title}</title>'
+        f'<meta name="description" content="{description}">'
+        f'<meta property="og:title" content="{title}">'
+        f'<meta property="og:description" content="{description}">'
+        f'<meta name="twitter:card" content="summary_large_image">'
+        f'<link rel="canonical" href="{base_url}/{slug}">'
+        '</head><body>'
+        f'{header}<main id="PAGES_CONTAINER">{"".join(body)}</main>{footer}'
+        '</body></html>'
+    )
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for nothingbetterhealth.com
+Serves the pages recorded in src/data/siteData.json plus synthetic Wix-like pages, their images,
+robots.txt and sitemaps, so crawls can be benchmarked without touching the live site
+"""
+
+import hashlib
+import html
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import NAV_SLUGS, wix_page
+
+IMAGE_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.gif': 'image/gif',
+               '.webp': 'image/webp', '.svg': 'image/svg+xml'}
+
+
+def load_recorded(root=ROOT):
+    """Return {slug: page_data} for every page and post recorded in siteData.json"""
+    path = os.path.join(root, 'src', 'data', 'siteData.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        site_data = json.load(f)
+    pages = dict(site_data.get("pages", {}))
+    pages.update(site_data.get("blog", {}).get("posts", {}))
+    pages.update(site_data.get("products", {}))
+    return pages
+
+
+def render_recorded(page_data, base_url, links):
+    """Rebuild Wix-like HTML for a recorded page record"""
+    seo = page_data.get("seo", {})
+    title = html.escape(seo.get("title") or page_data["slug"])
+    description = html.escape(seo.get("description", ""))
+
+    nav = ''.join(f'<li><a href="{base_url}/{slug}">{slug.replace("-", " ").title()}</a></li>' for slug in NAV_SLUGS)
+    body = []
+    seen = set()
+    for section in page_data.get("content", {}).get("sections", []):
+        # Recorded sections repeat once per nested container, keep the first copy
+        key = json.dumps([section.get("heading"), section.get("content")], sort_keys=True)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        parts = []
+        heading = section.get("heading")
+        if heading:
+            level = heading.get("level", 2)
+            parts.append(f'<h{level} class="font_2">{html.escape(heading.get("text", ""))}</h{level}>')
+        for block in section.get("content", []):
+            if block["type"] == "paragraph":
+                parts.append(f'<div class="wixui-rich-text"><p class="font_8">{html.escape(block["text"])}</p></div>')
+            elif block["type"] == "list":
+                items = ''.join(f'<li><p>{html.escape(item)}</p></li>' for item in block["items"])
+                parts.append(f'<{block["listType"]} class="font_8">{items}</{block["listType"]}>')
+            elif block["type"] == "image":
+                src = f'{base_url}/recorded{block["src"]}'
+                parts.append(f'<figure><img src="{html.escape(src)}" alt="{html.escape(block.get("alt", ""))}" '
+                             f'width="{block.get("width", "")}" height="{block.get("height", "")}">'
+                             f'<figcaption>{html.escape(block.get("caption", ""))}</figcaption></figure>')
+        if parts:
+            section_id = html.escape(section.get("id") or f'comp-{len(body)}')
+            body.append(f'<section id="{section_id}" class="wixui-section"><div>{"".join(parts)}</div></section>')
+
+    body.extend(f'<a href="{base_url}/{link}">{link}</a>' for link in links)
+    return (
+        '<!DOCTYPE html><html lang="en"><head>'
+        f'<meta charset="utf-8"><title>{title}</title>'
+        f'<meta name="description" content="{description}">'
+        f'<meta property="og:title" content="{title}">'
+        f'<link rel="canonical" href="{base_url}/{page_data["slug"]}">'
+        '</head><body>'
+        f'<header id="SITE_HEADER" class="wixui-header"><nav class="wixui-dropdown-menu"><ul>{nav}</ul></nav></header>'
+        f'<main id="PAGES_CONTAINER">{"".join(body)}</main>'
+        '<footer id="SITE_FOOTER" class="wixui-footer"><p>Nothing Better Health</p></footer>'
+        '</body></html>'
+    )
+
+
+class StandInSite:
+    """Content of the stand-in site, rendered on demand so large corpora stay out of memory"""
+
+    def __init__(self, synthetic_pages=100, recorded=True, sections=12, depth=12, images=6, duplicates=False):
+        self.synthetic_pages = synthetic_pages
+        self.duplicates = duplicates  # Also link trailing-slash and ?lang= variants of each page, as Wix does
+        self.sections = sections
+        self.depth = depth
+        self.images = images
+        self.base_url = ""
+        self.recorded = load_recorded() if recorded else {}
+        self.image_files = self._index_images()
+        self.bytes_sent = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _index_images(self):
+        images_dir = os.path.join(ROOT, 'public', 'images')
+        files = []
+        for dirpath, _, filenames in os.walk(images_dir):
+            for filename in sorted(filenames):
+                files.append(os.path.join(dirpath, filename))
+        return sorted(files)
+
+    def synthetic_links(self, index):
+        # Pages form a tree from page-0 so a crawl reaches every one of them
+        children = [2 * index + 1, 2 * index + 2, (index * 7919 + 13) % self.synthetic_pages]
+        links = [f"page-{i}" for i in children if i < self.synthetic_pages and i != index]
+        if self.duplicates:
+            links += [f"{link}/" for link in links] + [f"{link}?lang=es" for link in links]
+        return links
+
+    def page(self, slug):
+        """Return the HTML for a page slug, or None if it does not exist"""
+        if not slug:
+            slug = 'home' if 'home' in self.recorded else 'page-0'
+        if slug.startswith('page-') and slug[5:].isdigit():
+            index = int(slug[5:])
+            if index >= self.synthetic_pages:
+                return None
+            page = wix_page(index, slug=slug, sections=self.sections, depth=self.depth, images=self.images,
+                            links=self.synthetic_links(index), base_url=self.base_url)
+            # Wix serves media from its CDN, point it at this server instead
+            return page.replace('https://static.wixstatic.com/media/', f'{self.base_url}/media/')
+
+        record = self.recorded.get(slug)
+        if record is None:
+            return None
+        links = []
+        if slug == 'home':
+            # The home page links every recorded page and the root of the synthetic tree
+            links = [other for other in self.recorded if other != 'home']
+            if self.synthetic_pages:
+                links.append('page-0')
+        return render_recorded(record, self.base_url, links)
+
+    def robots(self):
+        return f"User-agent: *\nDisallow: /private/\n\nSitemap: {self.base_url}/sitemap.xml\n"
+
+    def sitemap(self, name):
+        """Return a Wix-style sitemap index or one of the sitemaps it lists, or None"""
+        if name == 'sitemap.xml':
+            entries = ''.join(f'<sitemap><loc>{self.base_url}/{child}</loc></sitemap>'
+                              for child in ('pages-sitemap.xml', 'synthetic-sitemap.xml'))
+            return ('<?xml version="1.0" encoding="UTF-8"?>'
+                    f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>')
+        if name == 'pages-sitemap.xml':
+            pages = [(slug, record.get("scrapedAt", "")[:10]) for slug, record in self.recorded.items()]
+        elif name == 'synthetic-sitemap.xml':
+            pages = [(f"page-{i}", f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}") for i in range(self.synthetic_pages)]
+        else:
+            return None
+        entries = ''.join(
+            f'<url><loc>{self.base_url}/{"" if slug == "home" else html.escape(slug)}</loc>'
+            f'{f"<lastmod>{lastmod}</lastmod>" if lastmod else ""}</url>'
+            for slug, lastmod in pages
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>')
+
+    def image(self, path):
+        """Return (content type, bytes) for an image path, or None"""
+        if path.startswith('/recorded/images/'):
+            file_path = os.path.join(ROOT, 'public', unquote(path[len('/recorded/'):]))
+            if not os.path.isfile(file_path):
+                return None
+        elif path.startswith('/media/') and self.image_files:
+            # Synthetic images reuse the recorded files, picked deterministically per URL
+            digest = int(hashlib.md5(path.encode('utf-8')).hexdigest(), 16)
+            file_path = self.image_files[digest % len(self.image_files)]
+        else:
+            return None
+        ext = os.path.splitext(file_path)[1].lower()
+        with open(file_path, 'rb') as f:
+            return IMAGE_TYPES.get(ext, 'application/octet-stream'), f.read()
+
+    def count(self, size):
+        with self.lock:
+            self.bytes_sent += size
+            self.requests += 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        site = self.server.site
+        path = urlparse(self.path).path
+        content_type, body = 'text/html; charset=utf-8', None
+
+        if path.startswith('/recorded/') or path.startswith('/media/'):
+            image = site.image(path)
+            if image:
+                content_type, body = image
+        elif path == '/robots.txt':
+            content_type, body = 'text/plain; charset=utf-8', site.robots().encode('utf-8')
+        elif path.endswith('sitemap.xml'):
+            sitemap = site.sitemap(path.lstrip('/'))
+            if sitemap is not None:
+                content_type, body = 'application/xml; charset=utf-8', sitemap.encode('utf-8')
+        else:
+            page = site.page(unquote(path).strip('/'))
+            if page is not None:
+                body = page.encode('utf-8')
+
+        status = 200
+        if body is None:
+            status, body = 404, b'<html><body><h1>404</h1></body></html>'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        site.count(len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(site, host='127.0.0.1', port=0):
+    """Serve site from a background thread and return the server, its base URL is on site.base_url"""
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.site = site
+    site.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=100, help='synthetic pages to serve')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--no-recorded', action='store_true', help='serve synthetic pages only')
+    parser.add_argument('--duplicates', action='store_true', help='link trailing-slash and ?lang= duplicates too')
+    args = parser.parse_args()
+
+    site = StandInSite(args.pages, recorded=not args.no_recorded, duplicates=args.duplicates)
+    server = start_server(site, port=args.port)
+    print(f"Serving {len(site.recorded)} recorded and {args.pages} synthetic pages at {site.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
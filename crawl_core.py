@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Crawl-and-parse core shared by NBHScraper and NextJSScraper
+Fetches and parses every page once and hands the parsed tree to each registered output sink,
+so the markdown export and the Next.js data come out of a single crawl
+"""
+
+import os
+import sys
+from urllib.parse import urljoin
+
+from async_crawler import AsyncCrawler
+from html_parsers import main_text
+from near_duplicates import NearDuplicateDetector
+from site_discovery import SiteDiscovery
+
+
+class CrawlCore:
+    """One crawl feeding several scrapers, the first sink's session, limiter and metrics drive it
+
+    A sink provides seed_paths, tree_backend(), parse_tree(html), extract_page(url, tree),
+    store_page(parsed), store_alias(url, canonical_url), record_error(url, error), begin_crawl(resume, journal, image_workers),
+    finish_crawl() and close_crawl_state()
+    """
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        if not self.sinks:
+            raise ValueError("CrawlCore needs at least one sink")
+        primary = self.sinks[0]
+        self.base_url = primary.base_url
+        self.metrics = primary.metrics
+        self.session = primary.session
+        self.rate_limiter = primary.rate_limiter
+        self.frontier = primary.frontier
+        self.visited_urls = primary.visited_urls
+        self.duplicates = None  # NearDuplicateDetector while a crawl with dedupe runs
+
+        # Every sink fetches through the same pools and limiter and sees the same crawl progress
+        for sink in self.sinks[1:]:
+            sink.session = self.session
+            sink.rate_limiter = self.rate_limiter
+            sink.frontier = self.frontier
+            sink.visited_urls = self.visited_urls
+
+    def fetch_page(self, url):
+        return self.sinks[0].fetch_page(url)
+
+    def fetch_content(self, url):
+        return self.sinks[0].fetch_content(url)
+
+    def process_page(self, url, html):
+        """Parse fetched HTML once per tree backend, store it in every sink and return the union of links"""
+        primary = self.sinks[0]
+        trees = {primary.tree_backend(): primary.parse_tree(html)}
+        fingerprint = None
+
+        # A page repeating an earlier one is recorded as its alias and never extracted
+        if self.duplicates is not None:
+            with self.metrics.timer('fingerprint'):
+                fingerprint = self.duplicates.fingerprint(main_text(trees[primary.tree_backend()]))
+                canonical = self.duplicates.check(url, fingerprint)
+            if canonical is not None:
+                self.metrics.count('near_duplicates')
+                for sink in self.sinks:
+                    sink.store_alias(url, canonical)
+                return []
+
+        links = {}
+        for sink in self.sinks:
+            backend = sink.tree_backend()
+            if backend not in trees:
+                trees[backend] = sink.parse_tree(html)
+            parsed = sink.metrics.profile(url, sink.extract_page, url, trees[backend])
+            links.update(dict.fromkeys(sink.store_page(parsed) or []))
+
+        # Only a page every sink has stored may become the canonical copy later pages alias to
+        if self.duplicates is not None and fingerprint is not None:
+            self.duplicates.add(url, fingerprint)
+            if primary.crawl_state is not None:
+                # Resumed crawls still recognise duplicates of pages stored before the interruption
+                primary.crawl_state.fingerprint(url, fingerprint)
+        return list(links)
+
+    def record_error(self, url, error):
+        for sink in self.sinks:
+            sink.record_error(url, error)
+
+    def scrape_page(self, url):
+        """Fetch and process one page, returning its internal links"""
+        if url in self.visited_urls:
+            return None
+
+        print(f"Scraping: {url}")
+        self.visited_urls.add(url)
+
+        try:
+            html = self.fetch_page(url)
+            return self.process_page(url, html)
+
+        except Exception as e:
+            self.record_error(url, e)
+            return []
+
+    def crawl(self, max_pages=100, concurrency=1, per_host_limit=4, delay=0.5, parse_workers=0,
+              resume=False, discover=True, image_workers=0, dedupe=True):
+        """Crawl the site, returning the number of pages fetched including those restored on resume"""
+        if parse_workers and len(self.sinks) > 1:
+            raise ValueError("parse_workers needs a single sink, worker processes parse for one scraper")
+
+        # Each sink opens its own checkpoint and output state, only the first one journals the frontier
+        pages_scraped = 0
+        for i, sink in enumerate(self.sinks):
+            done = sink.begin_crawl(resume, journal=i == 0, image_workers=image_workers)
+            if i == 0:
+                pages_scraped = done
+
+        # Near-duplicate pages become aliases and URL shapes that keep producing them are queued last,
+        # parse workers extract outside this process so their pages are not fingerprinted
+        if dedupe and not parse_workers:
+            self.duplicates = NearDuplicateDetector()
+            self.frontier.prioritize = self.duplicates.priority
+            if resume and self.sinks[0].crawl_state is not None:
+                for url, fingerprint in self.sinks[0].crawl_state.fingerprints().items():
+                    self.duplicates.add(url, fingerprint)
+
+        # Enough keep-alive connections for every fetch that can be in flight at once
+        self.session.set_pool_size(concurrency + image_workers)
+
+        # delay only sets the starting pace, the limiter adapts it to the server's responses
+        self.rate_limiter.start_rate = 1 / delay if delay else self.rate_limiter.max_rate
+
+        # robots.txt and the sitemaps list the real pages, the guessed paths are a fallback
+        discovery = SiteDiscovery(self.session, self.base_url) if discover else None
+        seeds = []
+        if discovery is not None:
+            with self.metrics.timer('discover'):
+                seeds = discovery.seeds()
+            self.metrics.count('sitemap_urls', len(seeds))
+            self.frontier.allow = discovery.allowed
+            if discovery.crawl_delay:
+                # Crawl-delay caps the site's rate however well it copes, one request at a time with no bursts
+                self.rate_limiter.limit_host(self.base_url, 1 / discovery.crawl_delay)
+                per_host_limit = 1
+            print(f"Discovered {len(seeds)} URLs from sitemaps")
+
+        self.frontier.add(self.base_url)
+        if seeds:
+            for url in seeds:
+                self.frontier.add(url)
+        else:
+            for sink in self.sinks:
+                for path in sink.seed_paths:
+                    self.frontier.add(urljoin(self.base_url, path))
+
+        try:
+            # Async engine keeps several requests in flight, capped per host,
+            # and can hand parsing to a pool of worker processes
+            if concurrency > 1 or parse_workers:
+                crawler = AsyncCrawler(self.sinks[0] if parse_workers else self, concurrency=concurrency,
+                                       per_host_limit=per_host_limit, parse_workers=parse_workers)
+                pages_scraped += crawler.run(self.frontier, max_pages=max_pages - pages_scraped)
+
+            while self.frontier and pages_scraped < max_pages:
+                url = self.frontier.pop()
+                new_links = self.scrape_page(url)
+
+                if new_links:
+                    for link in new_links:
+                        if link not in self.visited_urls:
+                            self.frontier.add(link)
+
+                pages_scraped += 1
+
+            for sink in self.sinks:
+                sink.finish_crawl()
+        finally:
+            self.frontier.prioritize = None
+            for sink in self.sinks:
+                sink.close_crawl_state()
+
+        if self.duplicates is not None and self.duplicates.duplicate_patterns():
+            print(f"Deprioritized duplicate URL patterns: {', '.join(self.duplicates.duplicate_patterns())}")
+
+        for host, stats in self.session.connection_stats().items():
+            self.metrics.gauge('pooled_connections', stats["connections"], host=host)
+            self.metrics.gauge('connection_reuse', stats["reuse"], host=host)
+        return pages_scraped
+
+
+
+def main():
+    from scraper import NBHScraper
+    from scraper_nextjs import NextJSScraper
+
+    print("Starting combined crawl for the markdown export and the Next.js data...")
+    nbh = NBHScraper()
+    # The Next.js sink fetches through the NBH session, so it needs no cache of its own
+    nextjs = NextJSScraper(cache_dir=None, stream_dir=".crawl_pages")
+
+    # Pass --resume to continue an interrupted crawl
+    pages_scraped = CrawlCore([nbh, nextjs]).crawl(max_pages=50, concurrency=8, image_workers=4,
+                                                   resume='--resume' in sys.argv[1:])
+    print(f"\nScraping complete! Scraped {pages_scraped} pages once for both outputs")
+    if nbh.cache:
+        print(nbh.cache.report())
+
+    nbh.save_data()
+    nextjs.optimize_images()
+    # Pass --sharded to write one data file per page for the Next.js app
+    nextjs.save_nextjs_data(layout='sharded' if '--sharded' in sys.argv[1:] else 'single')
+
+    print("\n" + nbh.metrics.report())
+    print("\n" + nextjs.metrics.report())
+    nbh.metrics.write_prometheus(os.path.join('scraped_content', 'metrics.prom'))
+    nextjs.metrics.write_prometheus('scrape_metrics.prom')
+
+
+if __name__ == "__main__":
+    main()
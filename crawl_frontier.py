@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Crawl frontier shared by NBHScraper and NextJSScraper
+Priority-bucketed FIFO queues with constant-time enqueue, dequeue and URL dedup
+"""
+
+import hashlib
+import heapq
+import math
+from collections import deque
+
+
+class BloomFilter:
+    """Fixed-size probabilistic seen-set for very large crawls"""
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item):
+        """Add an item, returning True if it was not already present"""
+        added = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            mask = 1 << bit
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item):
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+
+class CrawlFrontier:
+    """URLs waiting to be crawled, lower priority values are crawled first"""
+
+    def __init__(self, use_bloom=False, bloom_capacity=1000000, bloom_error_rate=0.001):
+        self.queues = {}  # Map priority to FIFO of URLs
+        self.priorities = []  # Heap of priorities that have queued URLs
+        self.size = 0
+        self.journal = None  # Optional CrawlState recording every queued URL
+        self.allow = None  # Optional predicate, such as robots.txt rules, a URL must pass to be queued
+        self.prioritize = None  # Optional function giving a URL extra priority, such as a duplicate penalty
+        if use_bloom:
+            self.seen = BloomFilter(bloom_capacity, bloom_error_rate)
+        else:
+            self.seen = set()
+
+    def add(self, url, priority=0):
+        """Queue a URL unless it was seen before, returning True if queued"""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        if self.allow is not None and not self.allow(url):
+            return False
+        if self.prioritize is not None:
+            priority += self.prioritize(url)
+
+        queue = self.queues.get(priority)
+        if queue is None:
+            queue = self.queues[priority] = deque()
+            heapq.heappush(self.priorities, priority)
+        queue.append(url)
+        self.size += 1
+        if self.journal is not None:
+            self.journal.queued(url, priority)
+        return True
+
+    def pop(self):
+        """Remove and return the next URL to crawl"""
+        if not self.size:
+            raise IndexError('pop from empty frontier')
+
+        priority = self.priorities[0]
+        queue = self.queues[priority]
+        url = queue.popleft()
+        if not queue:
+            heapq.heappop(self.priorities)
+            del self.queues[priority]
+        self.size -= 1
+        return url
+
+    def mark_seen(self, url):
+        """Record a URL as seen without queueing it"""
+        self.seen.add(url)
+
+    def __contains__(self, url):
+        return url in self.seen
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Persistent crawl checkpoint for resumable crawls
+Keeps frontier, visited status, per-URL results and the image map in a local SQLite file
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+
+class CrawlState:
+    """SQLite record of a crawl, written in batches, that a later run can resume from"""
+
+    def __init__(self, path, resume=False, batch_size=50):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []  # Buffered (sql, params) in the order they happened
+        self.seq = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " url TEXT PRIMARY KEY, priority INTEGER, seq INTEGER,"
+            " status TEXT, fetched_at REAL, error TEXT, result TEXT);"
+            "CREATE INDEX IF NOT EXISTS urls_queue ON urls (status, priority, seq);"
+            "CREATE TABLE IF NOT EXISTS images (url TEXT PRIMARY KEY, local_path TEXT);"
+            "CREATE TABLE IF NOT EXISTS fingerprints (url TEXT PRIMARY KEY, fingerprint TEXT);"
+        )
+        if not resume:
+            self.db.execute("DELETE FROM urls")
+            self.db.execute("DELETE FROM images")
+            self.db.execute("DELETE FROM fingerprints")
+        self.db.commit()
+        self.seq = self.db.execute("SELECT COALESCE(MAX(seq), 0) FROM urls").fetchone()[0]
+
+    def _queue(self, sql, params):
+        self.pending.append((sql, params))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered changes in one transaction"""
+        if not self.pending:
+            return
+        with self.db:
+            for sql, params in self.pending:
+                self.db.execute(sql, params)
+        self.pending = []
+
+    def queued(self, url, priority=0):
+        """Record a URL entering the frontier"""
+        self.seq += 1
+        self._queue(
+            "INSERT OR IGNORE INTO urls (url, priority, seq, status) VALUES (?, ?, ?, 'queued')",
+            (url, priority, self.seq)
+        )
+
+    def visited(self, url, result=None, error=None):
+        """Record the outcome of fetching a URL"""
+        status = 'error' if error is not None else 'done'
+        self._queue(
+            "INSERT INTO urls (url, priority, seq, status, fetched_at, error, result) VALUES (?, 0, 0, ?, ?, ?, ?)"
+            " ON CONFLICT(url) DO UPDATE SET status = excluded.status, fetched_at = excluded.fetched_at,"
+            " error = excluded.error, result = excluded.result",
+            (url, status, time.time(), error, json.dumps(result, ensure_ascii=False) if result is not None else None)
+        )
+
+    def image(self, img_url, local_path):
+        """Record (or with local_path None, forget) a downloaded image"""
+        if local_path is None:
+            self._queue("DELETE FROM images WHERE url = ?", (img_url,))
+        else:
+            self._queue("INSERT OR REPLACE INTO images (url, local_path) VALUES (?, ?)", (img_url, local_path))
+
+    def restore(self, frontier):
+        """Refill a frontier from the checkpoint and return (visited URLs, stored results, image map)"""
+        self.flush()
+        visited = set()
+        results = []
+        for url, status, result in self.db.execute(
+                "SELECT url, status, result FROM urls WHERE status != 'queued' ORDER BY fetched_at"):
+            visited.add(url)
+            frontier.mark_seen(url)
+            if status == 'done' and result is not None:
+                results.append(json.loads(result))
+
+        for url, priority in self.db.execute(
+                "SELECT url, priority FROM urls WHERE status = 'queued' ORDER BY priority, seq"):
+            frontier.add(url, priority)
+
+        images = dict(self.db.execute("SELECT url, local_path FROM images"))
+        return visited, results, images
+
+    def failed(self):
+        """URLs whose last fetch ended in an error"""
+        self.flush()
+        return {url for url, in self.db.execute("SELECT url FROM urls WHERE status = 'error'")}
+
+    def fingerprint(self, url, value):
+        """Record the near-duplicate fingerprint of a stored page"""
+        # Kept as hex, SQLite integers are signed 64-bit
+        self._queue("INSERT OR REPLACE INTO fingerprints (url, fingerprint) VALUES (?, ?)", (url, format(value, 'x')))
+
+    def fingerprints(self):
+        """Map each stored page's URL to its fingerprint"""
+        self.flush()
+        return {url: int(value, 16) for url, value in self.db.execute("SELECT url, fingerprint FROM fingerprints")}
+
+    def close(self):
+        self.flush()
+        self.db.close()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Single-pass DOM traversal for the scrapers
+Extractors register the tag names they care about and receive callbacks during one walk
+"""
+
+from itertools import chain
+
+from bs4 import Tag
+
+from html_parsers import LxmlNode
+
+
+class DOMVisitor:
+    def __init__(self):
+        self.handlers = {}  # Map tag name to callbacks
+
+    def register(self, names, callback):
+        """Call callback(tag) for every element whose name is in names"""
+        if isinstance(names, str):
+            names = [names]
+        for name in names:
+            self.handlers.setdefault(name, []).append(callback)
+
+    def walk(self, root, skip=(), on_skip=None):
+        """Visit root and every element under it once, in document order, passing over the nodes in skip"""
+        # With skip a mapping, on_skip(skip[node]) is called for each node passed over
+        handlers = self.handlers
+        if not isinstance(root, Tag):
+            # lxml tree: the C iterator filters by tag name, only matches get wrapped
+            for element in root.iter(*handlers):
+                if element in skip:
+                    if on_skip is not None:
+                        on_skip(skip[element])
+                    continue
+                node = LxmlNode(element)
+                for callback in handlers[element.tag]:
+                    callback(node)
+            return
+
+        # bs4 trees are skipped by id(), as page_templates.subtree_nodes collects them
+        for node in chain((root,), root.descendants):
+            if not isinstance(node, Tag):
+                continue
+            if id(node) in skip:
+                if on_skip is not None:
+                    on_skip(skip[id(node)])
+                continue
+            callbacks = handlers.get(node.name)
+            if callbacks:
+                for callback in callbacks:
+                    callback(node)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends for the scrapers
+Selects between BeautifulSoup builders and a direct lxml tree for the single-pass extractors
+"""
+
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+# Backends selectable per run
+#   html.parser  - BeautifulSoup with the pure-Python parser (slowest, most lenient)
+#   lxml         - BeautifulSoup with the lxml builder
+#   lxml-direct  - raw lxml tree walked by DOMVisitor, no BeautifulSoup objects at all
+PARSER_BACKENDS = ('html.parser', 'lxml', 'lxml-direct')
+
+# Attributes BeautifulSoup splits into lists
+MULTI_VALUED_ATTRIBUTES = {'class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey', 'dropzone'}
+
+# Elements whose text BeautifulSoup leaves out of an ancestor's get_text()
+TEXTLESS_TAGS = ('script', 'style', 'template')
+
+
+def make_soup(html, backend='html.parser'):
+    """Parse HTML into a BeautifulSoup tree with the builder behind a backend"""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}, expected one of {PARSER_BACKENDS}")
+    builder = 'html.parser' if backend == 'html.parser' else 'lxml'
+    return BeautifulSoup(html, builder)
+
+
+def parse_lxml(html):
+    """Parse HTML into an lxml element tree"""
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration
+        return lxml_html.document_fromstring(html.encode('utf-8'))
+
+
+def main_text(tree):
+    """Text of a parsed page's main content, from a BeautifulSoup or lxml tree"""
+    if isinstance(tree, BeautifulSoup):
+        main = tree.find('main') or tree.find('body') or tree
+        return main.get_text(' ')
+    main = tree.find('.//main')
+    if main is None:
+        main = tree.find('body')
+    return element_text(main if main is not None else tree)
+
+
+def element_text(element):
+    """Concatenate descendant text the way BeautifulSoup's get_text() does"""
+    if next(element.iterdescendants(*TEXTLESS_TAGS), None) is None:
+        return ''.join(element.itertext())
+
+    parts = []
+
+    def collect(node):
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in TEXTLESS_TAGS:
+                collect(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    collect(element)
+    return ''.join(parts)
+
+
+class LxmlNode:
+    """The slice of the BeautifulSoup Tag interface used by the extractors, over an lxml element"""
+
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    @property
+    def name(self):
+        return self.element.tag
+
+    @property
+    def text(self):
+        return element_text(self.element)
+
+    def get_text(self):
+        return element_text(self.element)
+
+    def get(self, key, default=None):
+        value = self.element.get(key)
+        if value is None:
+            return default
+        if key in MULTI_VALUED_ATTRIBUTES:
+            return value.split()
+        return value
+
+    def has_attr(self, key):
+        return key in self.element.attrib
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def find_all(self, names):
+        if isinstance(names, str):
+            names = [names]
+        return [LxmlNode(element) for element in self.element.iterdescendants(*names)]
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache for the scrapers
+Stores bodies with their ETag/Last-Modified validators and revalidates with conditional GETs
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Response headers kept alongside a cached body
+STORED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=".http_cache", max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(cache_dir, 'bodies'), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, url TEXT, headers TEXT, size INTEGER, last_access REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+        self.db.commit()
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        self.stats = {
+            "hits": 0,  # 304 answered from cache
+            "misses": 0,  # Full body downloaded
+            "stored": 0,
+            "evicted": 0,
+            "bytes_saved": 0,
+            "bytes_downloaded": 0
+        }
+        self.metrics = None  # Optional metrics.Metrics that also receives the stats as cache_* counters
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, 'bodies', key)
+
+    def lookup(self, url):
+        """Return stored headers for a URL, or None if it is not cached"""
+        with self.lock:
+            row = self.db.execute("SELECT headers FROM entries WHERE key = ?", (self._key(url),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load(self, url):
+        """Read a cached body and mark it as recently used"""
+        key = self._key(url)
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        with self.lock:
+            self.db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        return body
+
+    def store(self, url, headers, body):
+        """Save a body and its validators, evicting least recently used entries if needed"""
+        if len(body) > self.max_bytes:
+            return
+        key = self._key(url)
+        path = self._body_path(key)
+        tmp_path = path + '.part'
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+        stored_headers = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        with self.lock:
+            row = self.db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.total_bytes -= row[0]
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (key, url, headers, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, url, json.dumps(stored_headers), len(body), time.time())
+            )
+            self.total_bytes += len(body)
+            self.stats["stored"] += 1
+            self._evict()
+            self.db.commit()
+
+    def update_headers(self, url, headers):
+        """Refresh validators sent with a 304"""
+        key = self._key(url)
+        with self.lock:
+            row = self.db.execute("SELECT headers FROM entries WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return
+            stored_headers = json.loads(row[0])
+            for name in STORED_HEADERS:
+                if name in headers:
+                    stored_headers[name] = headers[name]
+            self.db.execute("UPDATE entries SET headers = ? WHERE key = ?", (json.dumps(stored_headers), key))
+            self.db.commit()
+
+    def _evict(self):
+        # Caller holds the lock
+        while self.total_bytes > self.max_bytes:
+            row = self.db.execute("SELECT key, size FROM entries ORDER BY last_access LIMIT 1").fetchone()
+            if not row:
+                break
+            key, size = row
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            self.total_bytes -= size
+            self.stats["evicted"] += 1
+
+    def record(self, stat, count=1):
+        with self.lock:
+            self.stats[stat] += count
+        if self.metrics is not None:
+            self.metrics.count('cache_' + stat, count)
+
+    def report(self):
+        """Summarise cache effectiveness for the end of a crawl"""
+        stats = self.stats
+        requests_made = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / requests_made * 100 if requests_made else 0
+        return (f"HTTP cache: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.1f}% hit rate), "
+                f"{stats['bytes_saved'] / 1024:.1f} KB saved, {stats['bytes_downloaded'] / 1024:.1f} KB downloaded, "
+                f"{stats['evicted']} evicted, {self.total_bytes / 1024:.1f} KB on disk")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """Transport adapter that revalidates GETs against a ResponseCache"""
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        cached_headers = self.cache.lookup(request.url)
+        if cached_headers:
+            if 'ETag' in cached_headers:
+                request.headers['If-None-Match'] = cached_headers['ETag']
+            if 'Last-Modified' in cached_headers:
+                request.headers['If-Modified-Since'] = cached_headers['Last-Modified']
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and cached_headers:
+            body = self.cache.load(request.url)
+            if body is not None:
+                self.cache.update_headers(request.url, response.headers)
+                self.cache.record("hits")
+                self.cache.record("bytes_saved", len(body))
+                response.close()
+                return self._cached_response(request, response, cached_headers, body)
+
+            # Body went missing from disk, fetch it again unconditionally
+            response.close()
+            request.headers.pop('If-None-Match', None)
+            request.headers.pop('If-Modified-Since', None)
+            response = super().send(request, **kwargs)
+
+        if response.status_code == 200:
+            self.cache.record("misses")
+            if 'ETag' in response.headers or 'Last-Modified' in response.headers:
+                # Reading content here keeps it available to iter_content for streamed calls
+                body = response.content
+                self.cache.record("bytes_downloaded", len(body))
+                self.cache.store(request.url, response.headers, body)
+            else:
+                self.cache.record("bytes_downloaded", int(response.headers.get('Content-Length') or 0))
+
+        return response
+
+    def _cached_response(self, request, not_modified, headers, body):
+        """Build a 200 response around a cached body"""
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers.update(not_modified.headers)
+        response.headers['Content-Length'] = str(len(body))
+        response.headers.pop('Content-Encoding', None)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response._content_consumed = True
+        response.url = not_modified.url
+        response.request = request
+        response.connection = self
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        return response
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+HTTP client shared by NBHScraper and NextJSScraper
+A requests.Session with keep-alive pools sized to the crawl, jittered retries for idempotent requests,
+separate connect and read timeouts, compressed transfers and per-host connection reuse stats
+"""
+
+import inspect
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from http_cache import CachingAdapter
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/120.0.0.0 Safari/537.36')
+
+# Statuses worth another attempt, the server may well answer the next one
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# backoff_jitter arrived in urllib3 2.0, 1.26 backs off without it
+RETRY_JITTER = 'backoff_jitter' in inspect.signature(Retry.__init__).parameters
+
+# Failures while reading a body, which happen after urllib3's own retries are done
+BODY_ERRORS = (requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)
+
+
+def backoff_delay(backoff, attempt):
+    """Exponential backoff with full jitter so parallel retries spread out"""
+    return random.uniform(0, backoff * (2 ** attempt))
+
+
+class CrawlRetry(Retry):
+    """urllib3 Retry that never lets a Retry-After header park a crawl thread for long"""
+    MAX_RETRY_AFTER = 60
+
+    def get_retry_after(self, response):
+        seconds = super().get_retry_after(response)
+        return min(seconds, self.MAX_RETRY_AFTER) if seconds is not None else None
+
+
+class CrawlSession(requests.Session):
+    """requests.Session with pooled retrying adapters and default connect/read timeouts"""
+
+    def __init__(self, cache=None, pool_size=10, retries=3, backoff=0.5, timeout=(5, 30), user_agent=USER_AGENT):
+        super().__init__()
+        self.cache = cache  # Optional ResponseCache, mounted through a CachingAdapter
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout  # (connect, read) seconds unless a request passes its own
+        self.metrics = None  # Optional Metrics counting retries
+        # ACCEPT_ENCODING includes br when a Brotli package is installed
+        self.headers.update({'User-Agent': user_agent, 'Accept-Encoding': ACCEPT_ENCODING})
+        self.set_pool_size(pool_size)
+
+    def set_pool_size(self, pool_size):
+        """Remount the adapters so each concurrent fetch to a host can keep its own connection alive"""
+        jitter = {'backoff_jitter': self.backoff} if RETRY_JITTER else {}
+        retry = CrawlRetry(
+            total=self.retries, connect=self.retries, read=self.retries, status=self.retries,
+            status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({'GET', 'HEAD'}),
+            backoff_factor=self.backoff, respect_retry_after_header=True, raise_on_status=False, **jitter
+        )
+        options = {'pool_connections': 10, 'pool_maxsize': max(1, pool_size), 'max_retries': retry}
+        adapter = CachingAdapter(self.cache, **options) if self.cache else HTTPAdapter(**options)
+
+        previous = set(self.adapters.values())
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+        for old in previous:
+            old.close()
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        if kwargs.get('stream') or method.upper() not in ('GET', 'HEAD'):
+            response = super().request(method, url, **kwargs)
+        else:
+            # Bodies are read inside request() when not streaming, so a broken transfer can be retried here
+            response = self.retrying(super().request, method, url, **kwargs)
+
+        retries = retry_history(response)
+        if retries and self.metrics is not None:
+            self.metrics.count('retries', len(retries))
+        return response
+
+    def retrying(self, func, *args, **kwargs):
+        """Call func, retrying with jittered backoff when a response body breaks off midway"""
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except BODY_ERRORS:
+                if attempt == self.retries:
+                    raise
+                if self.metrics is not None:
+                    self.metrics.count('retries')
+                time.sleep(backoff_delay(self.backoff, attempt))
+
+    def connection_stats(self):
+        """Map each host to its requests, pooled connections and the share of requests that reused one"""
+        stats = {}
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                entry = stats.setdefault(f"{pool.host}:{pool.port}", {"requests": 0, "connections": 0})
+                entry["requests"] += pool.num_requests
+                entry["connections"] += pool.num_connections
+        for entry in stats.values():
+            entry["reuse"] = 1 - entry["connections"] / entry["requests"] if entry["requests"] else 0.0
+        return stats
+
+
+def retry_history(response):
+    """urllib3's record of the attempts retried before this response"""
+    retries = getattr(response.raw, 'retries', None)
+    return retries.history if retries is not None else ()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Background image download stage for NextJSScraper
+Extraction enqueues images and keeps parsing while a bounded worker pool fetches them
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class ImageDownloadPool:
+    def __init__(self, fetch, max_workers=4, max_pending=64):
+        self.fetch = fetch  # Callable doing the actual download
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image')
+        self.pending = threading.BoundedSemaphore(max_pending)  # Backpressure on extraction
+        self.futures = {}  # Map image key to its download future
+        self.lock = threading.Lock()
+
+    def submit(self, key, *args):
+        """Queue a download once per key and return its future"""
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                return future
+
+        # Block while too many downloads are queued so memory stays bounded
+        self.pending.acquire()
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                self.pending.release()
+                return future
+            future = self.executor.submit(self.fetch, *args)
+            future.add_done_callback(lambda f: self.pending.release())
+            self.futures[key] = future
+        return future
+
+    def drain(self):
+        """Wait for every queued download and return a map of failed keys to errors"""
+        with self.lock:
+            futures = dict(self.futures)
+        wait(futures.values())
+
+        failed = {}
+        for key, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                failed[key] = error
+        return failed
+
+    def completed(self):
+        """Return a map of keys to results for downloads that finished successfully"""
+        with self.lock:
+            futures = dict(self.futures)
+        return {key: future.result() for key, future in futures.items()
+                if future.done() and future.exception() is None}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
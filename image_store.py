@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Content-addressed image store for NextJSScraper
+Files under public/images are keyed by a SHA-256 of their bytes, and a persistent manifest maps
+source URLs to content IDs and content IDs to public paths so each image is fetched and written once
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from urllib.parse import unquote, urlparse
+
+from site_writer import write_atomic
+
+# Provisional paths handed out while a download is still queued
+PENDING_PREFIX = '/images/pending/'
+
+# Wix media URL up to the stored file's name, the /v1/fill/... transform after it only resizes that file
+WIX_MEDIA = re.compile(r'^(https?://[^/]+/media/[^/?#]+~mv2\.[A-Za-z0-9]+)')
+
+CONTENT_TYPES = {
+    'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif', 'image/webp': '.webp',
+    'image/svg+xml': '.svg', 'image/avif': '.avif'
+}
+
+
+def replace_image_paths(data, mapping):
+    """Return a copy of data with local image paths swapped per mapping"""
+    if isinstance(data, dict):
+        replaced = {}
+        for k, v in data.items():
+            key = mapping.get(k, k) if isinstance(k, str) else k
+            # Several source URLs can resolve to one stored image, the first record wins as when extracted
+            if key not in replaced:
+                replaced[key] = replace_image_paths(v, mapping)
+        return replaced
+    if isinstance(data, list):
+        return [replace_image_paths(v, mapping) for v in data]
+    if isinstance(data, str):
+        return mapping.get(data, data)
+    return data
+
+
+def media_key(url):
+    """Manifest key for a source URL, every Wix rendition of one media file shares its canonical URL"""
+    match = WIX_MEDIA.match(url)
+    return match.group(1) if match else url
+
+
+def image_extension(url, content_type=None):
+    """Pick a file extension from the URL, falling back to the response Content-Type"""
+    ext = os.path.splitext(unquote(urlparse(url).path))[1].lower()
+    if ext in CONTENT_TYPES.values() or ext == '.jpeg':
+        return ext
+    if content_type:
+        ext = CONTENT_TYPES.get(content_type.split(';')[0].strip().lower())
+        if ext:
+            return ext
+    lowered = url.lower()
+    for name in ('png', 'gif', 'svg', 'webp'):
+        if name in lowered:
+            return '.' + name
+    return '.jpg'
+
+
+class ImageStore:
+    """Deduplicated image files plus the URL manifest that survives between runs"""
+
+    def __init__(self, public_dir="public", manifest_path="src/data/imageManifest.json"):
+        self.public_dir = public_dir
+        self.manifest_path = manifest_path
+        self.urls = {}  # Map media_key of a source URL to content ID
+        self.objects = {}  # Map content ID to public path
+        self.variants = {}  # Map content ID to its image_variants record
+        self.lock = threading.Lock()
+        self.dirty = False
+
+        if manifest_path and os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            # Forget objects whose file has gone so they are fetched again
+            self.objects = {cid: path for cid, path in manifest.get("objects", {}).items()
+                            if os.path.exists(self.file_path(path))}
+            for url, cid in manifest.get("urls", {}).items():
+                # Manifests from before media_key list each rendition, the first one kept stands for all
+                if cid in self.objects:
+                    self.urls.setdefault(media_key(url), cid)
+            self.variants = {cid: record for cid, record in manifest.get("variants", {}).items() if cid in self.objects}
+
+    def file_path(self, public_path):
+        return os.path.join(self.public_dir, public_path.lstrip('/'))
+
+    def lookup(self, url):
+        """Return the public path already stored for a source URL or another rendition of it, or None"""
+        with self.lock:
+            cid = self.urls.get(media_key(url))
+            return self.objects.get(cid) if cid else None
+
+    def content_ids(self):
+        """Map every stored public path to its content ID"""
+        with self.lock:
+            return {path: cid for cid, path in self.objects.items()}
+
+    def set_variants(self, cid, record):
+        with self.lock:
+            self.variants[cid] = record
+            self.dirty = True
+        return record
+
+    def pending_path(self, url):
+        """Unique placeholder path for a URL whose bytes are not known yet"""
+        return PENDING_PREFIX + hashlib.sha1(media_key(url).encode('utf-8')).hexdigest()[:16]
+
+    def is_pending(self, path):
+        return isinstance(path, str) and path.startswith(PENDING_PREFIX)
+
+    def put(self, url, chunks, subfolder='general', content_type=None):
+        """Store streamed bytes for url and return (public path, size, newly written)"""
+        os.makedirs(self.public_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(prefix='.image-', suffix='.part', dir=self.public_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            cid = digest.hexdigest()
+
+            with self.lock:
+                path = self.objects.get(cid)
+                written = path is None or not os.path.exists(self.file_path(path))
+                if written:
+                    path = self._object_path(url, cid, subfolder, content_type)
+                    os.makedirs(os.path.dirname(self.file_path(path)), exist_ok=True)
+                    os.replace(tmp_path, self.file_path(path))
+                    self.objects[cid] = path
+                self.urls[media_key(url)] = cid
+                self.dirty = True
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path, size, written
+
+    def _object_path(self, url, cid, subfolder, content_type):
+        # Readable stem from the URL, the content ID keeps names unique
+        stem = os.path.splitext(os.path.basename(unquote(urlparse(url).path)))[0]
+        stem = re.sub(r'[^\w-]+', '-', stem.lower()).strip('-')[:40] or 'image'
+        return f'/images/{subfolder}/{stem}.{cid[:12]}{image_extension(url, content_type)}'
+
+    def save(self):
+        """Write the manifest if anything changed"""
+        with self.lock:
+            if not self.dirty or not self.manifest_path:
+                return
+            manifest = {
+                "urls": dict(sorted(self.urls.items())),
+                "objects": dict(sorted(self.objects.items())),
+                "variants": dict(sorted(self.variants.items()))
+            }
+            self.dirty = False
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        write_atomic(self.manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False))
+
+    def __len__(self):
+        return len(self.objects)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Image optimization stage for NextJSScraper
+Builds resized WebP/AVIF variants and blur placeholders for stored images across a process pool,
+once per content hash, and returns the srcset data recorded in siteData.json
+"""
+
+import base64
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional, the stage is skipped without it
+    Image = None
+
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+VARIANT_FORMATS = ('avif', 'webp')
+QUALITY = {'avif': 50, 'webp': 75}
+PLACEHOLDER_WIDTH = 16
+
+# Vector and animated formats are served as downloaded
+OPTIMIZABLE = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def supported_formats(formats=VARIANT_FORMATS):
+    """Formats from formats that the installed Pillow can encode"""
+    if Image is None:
+        return []
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def _save_atomic(image, path, fmt, **options):
+    tmp_path = path + '.part'
+    image.save(tmp_path, fmt.upper(), **options)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def build_variants(source_file, out_dir, public_prefix, widths=VARIANT_WIDTHS, formats=VARIANT_FORMATS):
+    """Write resized variants of one image to out_dir and return its record"""
+    with Image.open(source_file) as opened:
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    width, height = image.size
+    # Never upscale, the widest variant is the original size
+    targets = sorted({w for w in widths if w < width} | {width})
+    os.makedirs(out_dir, exist_ok=True)
+
+    variants = []
+    for target in targets:
+        target_height = max(1, round(height * target / width))
+        resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+        for fmt in formats:
+            name = f"{target}.{fmt}"
+            size = _save_atomic(resized, os.path.join(out_dir, name), fmt, quality=QUALITY.get(fmt, 75))
+            variants.append({"src": f"{public_prefix}/{name}", "width": target, "height": target_height,
+                             "format": fmt, "bytes": size})
+
+    # Tiny inline image shown blurred while the real one loads
+    placeholder = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))))
+    buffer = io.BytesIO()
+    if 'webp' in formats:
+        placeholder.save(buffer, 'WEBP', quality=30)
+        mime = 'image/webp'
+    else:
+        placeholder.convert('RGB').save(buffer, 'JPEG', quality=40)
+        mime = 'image/jpeg'
+
+    return {
+        "width": width,
+        "height": height,
+        "variants": variants,
+        "srcset": {fmt: ', '.join(f"{v['src']} {v['width']}w" for v in variants if v['format'] == fmt)
+                   for fmt in formats},
+        "placeholder": f"data:{mime};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+    }
+
+
+class ImageOptimizer:
+    """Runs build_variants for images in an ImageStore across worker processes"""
+
+    def __init__(self, store, workers=None, widths=VARIANT_WIDTHS, formats=VARIANT_FORMATS):
+        self.store = store
+        self.workers = workers
+        self.widths = widths
+        self.formats = formats
+
+    def run(self, paths):
+        """Optimize the stored images at the given public paths and return {path: record}"""
+        if Image is None:
+            print("  Pillow is not installed, skipping image optimization")
+            return {}
+        formats = supported_formats(self.formats)
+
+        records = {}
+        todo = {}
+        content_ids = self.store.content_ids()
+        for path in set(paths):
+            cid = content_ids.get(path)
+            if cid is None or os.path.splitext(path)[1].lower() not in OPTIMIZABLE:
+                continue
+            # Variants are keyed by content hash, so each image is processed once across runs
+            record = self.store.variants.get(cid)
+            if record is not None and all(os.path.exists(self.store.file_path(v["src"])) for v in record["variants"]):
+                records[path] = record
+            else:
+                todo[cid] = path
+
+        if todo:
+            print(f"  Optimizing {len(todo)} images")
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {}
+                for cid, path in todo.items():
+                    prefix = f"/images/variants/{cid[:16]}"
+                    futures[pool.submit(build_variants, self.store.file_path(path), self.store.file_path(prefix),
+                                        prefix, self.widths, formats)] = (cid, path)
+                for future in as_completed(futures):
+                    cid, path = futures[future]
+                    try:
+                        records[path] = self.store.set_variants(cid, future.result())
+                    except Exception as e:
+                        print(f"  Error optimizing image {path}: {e}")
+            self.store.save()
+        return records
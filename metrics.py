@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Crawl instrumentation shared by NBHScraper and NextJSScraper
+Stage timers with latency histograms, counters, an end-of-run report, a Prometheus text dump
+and an opt-in cProfile mode that keeps profiles of slow pages
+"""
+
+import bisect
+import cProfile
+import functools
+import hashlib
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Latency distribution over fixed buckets"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(BUCKETS, self.counts):
+            if count and seen + count >= rank:
+                return min(lower + (bound - lower) * (rank - seen) / count, self.max)
+            seen += count
+            lower = bound
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "max_seconds": self.max,
+        }
+
+
+class Timer:
+    """Context manager recording its elapsed time into a Metrics stage"""
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Thread-safe timers and counters for one crawl"""
+
+    def __init__(self, namespace="scraper", profile_dir=None, slow_page_seconds=1.0):
+        self.namespace = namespace
+        self.profile_dir = profile_dir  # Set to keep cProfile output of pages slower than slow_page_seconds
+        self.slow_page_seconds = slow_page_seconds
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}  # Map (name, labels) to the latest value
+        self.slow_pages = []
+        self.lock = threading.Lock()
+
+    def settings(self):
+        """Constructor arguments for an equivalent Metrics in another process"""
+        return {"namespace": self.namespace, "profile_dir": self.profile_dir,
+                "slow_page_seconds": self.slow_page_seconds}
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value, **labels):
+        """Record the current value of something that goes up and down, such as a request rate"""
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def timer(self, stage):
+        return Timer(self, stage)
+
+    def since(self, stage, start):
+        """Record the time elapsed since a time.perf_counter() reading"""
+        self.observe(stage, time.perf_counter() - start)
+
+    def profile(self, url, func, *args):
+        """Run func under cProfile when profiling is on, keeping the profile if the page was slow"""
+        if not self.profile_dir:
+            return func(*args)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.slow_page_seconds:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                name = hashlib.md5(url.encode('utf-8')).hexdigest()[:12] + '.prof'
+                path = os.path.join(self.profile_dir, name)
+                profiler.dump_stats(path)
+                with self.lock:
+                    self.slow_pages.append({"url": url, "seconds": elapsed, "profile": path})
+
+    def drain(self):
+        """Return everything recorded so far and reset, for shipping between processes"""
+        with self.lock:
+            state = (self.counters, self.histograms, self.slow_pages)
+            self.counters, self.histograms, self.slow_pages = {}, {}, []
+        return state
+
+    def merge(self, state):
+        """Fold in the result of another Metrics' drain()"""
+        counters, histograms, slow_pages = state
+        with self.lock:
+            for name, n in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            for stage, other in histograms.items():
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = self.histograms[stage] = Histogram()
+                histogram.merge(other)
+            self.slow_pages.extend(slow_pages)
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {stage: histogram.as_dict() for stage, histogram in self.histograms.items()},
+                "gauges": [{"name": name, "labels": dict(labels), "value": value}
+                           for (name, labels), value in self.gauges.items()],
+                "slow_pages": list(self.slow_pages),
+            }
+
+    def report(self):
+        """Human-readable end-of-run summary"""
+        data = self.as_dict()
+        lines = [f"{'stage':<24}{'count':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for stage, timer in sorted(data["timers"].items(), key=lambda item: -item[1]["total_seconds"]):
+            lines.append(
+                f"{stage:<24}{timer['count']:>8}{timer['total_seconds']:>10.2f}{timer['mean_seconds'] * 1000:>10.1f}"
+                f"{timer['p50_seconds'] * 1000:>10.1f}{timer['p95_seconds'] * 1000:>10.1f}{timer['max_seconds'] * 1000:>10.1f}"
+            )
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"{name:<24}{value:>8}")
+        for gauge in sorted(data["gauges"], key=lambda g: (g["name"], sorted(g["labels"].items()))):
+            labels = ' '.join(f"{key}={value}" for key, value in sorted(gauge["labels"].items()))
+            lines.append(f"{gauge['name']:<24}{gauge['value']:>8.2f}  {labels}")
+        for page in data["slow_pages"]:
+            lines.append(f"Slow page {page['url']} ({page['seconds']:.2f}s), profile in {page['profile']}")
+        return '\n'.join(lines)
+
+    def prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        data_lines = []
+        with self.lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{self.namespace}_{name}_total"
+                data_lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            family = None
+            for (name, labels), value in sorted(self.gauges.items()):
+                metric = f"{self.namespace}_{name}"
+                if name != family:
+                    data_lines.append(f"# TYPE {metric} gauge")
+                    family = name
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                data_lines.append(f"{metric}{{{label_text}}} {value}" if labels else f"{metric} {value}")
+            for stage, histogram in sorted(self.histograms.items()):
+                metric = f"{self.namespace}_{stage}_seconds"
+                data_lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    data_lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                data_lines += [f"{metric}_sum {histogram.total}", f"{metric}_count {histogram.count}"]
+        return '\n'.join(data_lines) + '\n'
+
+    def write_prometheus(self, path):
+        tmp_path = path + '.part'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+
+def timed(stage):
+    """Decorator timing a scraper method into self.metrics"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.metrics.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
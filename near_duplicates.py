@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate page detection for the crawl core
+SimHash fingerprints of each page's main text, looked up through banded indexes so a page is matched
+against every earlier one in constant time, plus URL shapes learned to produce duplicates
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qs, urlparse
+
+FINGERPRINT_BITS = 64
+BANDS = 4  # Fingerprints within BANDS - 1 bits of each other share at least one band exactly
+BAND_BITS = FINGERPRINT_BITS // BANDS
+SHINGLE_WORDS = 3
+
+WORD = re.compile(r'\w+')
+
+
+def shingles(text):
+    """Overlapping lowercase word triples of text, and its word count"""
+    words = WORD.findall(text.lower())
+    features = {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    return features, len(words)
+
+
+def simhash(features):
+    """64-bit SimHash of a set of string features"""
+    if not features:
+        return 0
+    digests = b''.join(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest() for feature in features)
+    # One conversion of all digests to a bit string, 64 characters per feature
+    bits = format(int.from_bytes(digests, 'big'), f'0{len(digests) * 8}b')
+    half = len(features) / 2
+    fingerprint = 0
+    # Every 64th character is one bit position across all features, sliced and counted in C
+    for position in range(FINGERPRINT_BITS):
+        fingerprint = (fingerprint << 1) | (bits[position::FINGERPRINT_BITS].count('1') > half)
+    return fingerprint
+
+
+def url_pattern(url):
+    """Shape of a URL: its path with the last segment wildcarded, trailing slash and query keys"""
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    shape = '/' + '/'.join(segments[:-1] + ['*']) if segments else '/'
+    if segments and parsed.path.endswith('/'):
+        shape += '/'
+    keys = sorted(parse_qs(parsed.query, keep_blank_values=True))
+    return shape + ('?' + '&'.join(keys) if keys else '')
+
+
+class NearDuplicateDetector:
+    """Maps each page to the first page whose text it nearly repeats, learning which URL shapes do that"""
+
+    def __init__(self, max_distance=3, min_words=20, min_samples=5, duplicate_ratio=0.8, penalty=10):
+        if max_distance >= BANDS:
+            raise ValueError(f"max_distance must be below {BANDS} for the banded index to find every match")
+        self.max_distance = max_distance  # Differing fingerprint bits still counted as the same page
+        self.min_words = min_words  # Pages with less text are never collapsed
+        self.min_samples = min_samples
+        self.duplicate_ratio = duplicate_ratio
+        self.penalty = penalty  # Frontier priority added to URLs of a duplicate-prone shape
+        self.bands = [{} for _ in range(BANDS)]  # Band value to [(fingerprint, canonical URL)]
+        self.patterns = {}  # URL shape to [pages seen, duplicates]
+
+    def fingerprint(self, text):
+        """SimHash of text, or None when it is too short to compare safely"""
+        features, words = shingles(text)
+        if words < self.min_words:
+            return None
+        return simhash(features)
+
+    def find(self, fingerprint):
+        """Canonical URL of an earlier page within max_distance bits, or None"""
+        for band, index in enumerate(self.bands):
+            key = (fingerprint >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1)
+            for other, url in index.get(key, ()):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return url
+        return None
+
+    def add(self, url, fingerprint):
+        for band, index in enumerate(self.bands):
+            key = (fingerprint >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1)
+            index.setdefault(key, []).append((fingerprint, url))
+
+    def check(self, url, fingerprint):
+        """Canonical URL if this page duplicates an earlier one, otherwise None, the caller add()s it once stored"""
+        if fingerprint is None:
+            return None
+        canonical = self.find(fingerprint)
+
+        stats = self.patterns.setdefault(url_pattern(url), [0, 0])
+        stats[0] += 1
+        if canonical is not None:
+            stats[1] += 1
+        return canonical
+
+    def duplicate_prone(self, pattern):
+        seen, duplicates = self.patterns.get(pattern, (0, 0))
+        return seen >= self.min_samples and duplicates >= self.duplicate_ratio * seen
+
+    def priority(self, url):
+        """Extra frontier priority for url, so URL shapes that keep repeating pages are crawled last"""
+        return self.penalty if self.duplicate_prone(url_pattern(url)) else 0
+
+    def duplicate_patterns(self):
+        return sorted(pattern for pattern in self.patterns if self.duplicate_prone(pattern))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Site template detection for NBHScraper and NextJSScraper
+Header, footer and nav blocks of the page shell are keyed by a structural hash so a block repeated across
+pages is extracted once into the site-level components and skipped when each page is extracted
+"""
+
+import hashlib
+
+from bs4 import Tag
+
+from html_parsers import element_text
+
+TEMPLATE_TAGS = ('header', 'footer', 'nav')
+
+# Page content, landmarks inside these belong to the page
+CONTENT_TAGS = ('main', 'article', 'section')
+
+# Attributes that identify what a block shows, classes and state flags vary with the current page
+HASHED_ATTRIBUTES = ('href', 'src')
+
+
+def structural_hash(node):
+    """Hash of a block's element names, link and image targets and normalized text"""
+    if isinstance(node, Tag):
+        elements = [node] + node.find_all(True)
+        names = [(element.name, element.get) for element in elements]
+        text = node.get_text()
+    else:
+        names = [(element.tag, element.get) for element in node.iter() if isinstance(element.tag, str)]
+        text = element_text(node)
+    digest = hashlib.blake2b(digest_size=8)
+    for name, get in names:
+        digest.update(name.encode('utf-8'))
+        for attribute in HASHED_ATTRIBUTES:
+            value = get(attribute)
+            if value:
+                digest.update(f' {attribute}={value}'.encode('utf-8'))
+        digest.update(b'>')
+    digest.update(' '.join(text.split()).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def template_blocks(tree):
+    """Outermost header, footer and nav elements of the page shell, as [(template ID, element)]"""
+    # Only the page shell is walked, content and the blocks themselves are never descended into
+    blocks = []
+    stack = [(tree, False)]
+    while stack:
+        node, is_block = stack.pop()
+        if is_block:
+            blocks.append((structural_hash(node), node))
+            continue
+        if isinstance(node, Tag):
+            children = [(child, child.name) for child in node.contents if isinstance(child, Tag)]
+        else:
+            children = [(child, child.tag) for child in node if isinstance(child.tag, str)]
+        # Pushed in reverse so blocks come off the stack in document order
+        for child, name in reversed(children):
+            if name not in CONTENT_TAGS:
+                stack.append((child, name in TEMPLATE_TAGS))
+    return blocks
+
+
+def block_info(element):
+    """Tag name and id attribute of a template block"""
+    if isinstance(element, Tag):
+        return {"tag": element.name, "id": element.get('id', '')}
+    return {"tag": element.tag, "id": element.get('id', '')}
+
+
+def subtree_nodes(blocks):
+    """Every element inside the given blocks mapped to its template ID, for extractors to skip"""
+    skipped = {}
+    for key, element in blocks:
+        if isinstance(element, Tag):
+            skipped[id(element)] = key
+            skipped.update((id(node), key) for node in element.descendants)
+        else:
+            skipped.update((node, key) for node in element.iter())
+    return skipped
+
+
+class TemplateTable:
+    """Site-wide template blocks keyed by template ID, with the number of pages that show each"""
+
+    def __init__(self):
+        # A block becomes a template once a second page shows it, until then its record keeps under
+        # "inline" what its one page needs to put it back in place when saved
+        self.templates = {}
+        self.pages = {}
+        self.known = set()  # Template IDs an earlier run's output already holds as shared
+
+    def seed(self, keys):
+        """Keep blocks an earlier run saved as templates shared, however few pages this run saw them on"""
+        self.known.update(keys)
+
+    def add(self, key, record):
+        self.templates.setdefault(key, record)
+
+    def add_page(self, keys):
+        """Count one page showing the given templates and return their IDs"""
+        for key in keys:
+            self.pages[key] = self.pages.get(key, 0) + 1
+        return list(keys)
+
+    def shared(self, key):
+        """Whether more than one page shows the block, or an earlier run already shared it"""
+        return self.pages.get(key, 0) > 1 or key in self.known
+
+    def inline(self, key):
+        """Record of a block only one page shows, which that page keeps in place, or None"""
+        if key not in self.templates or self.shared(key):
+            return None
+        return self.templates[key]
+
+    def records(self):
+        """Plain dicts of the shared blocks for JSON output, sorted by ID so unchanged tables keep their bytes"""
+        return {key: dict({name: value for name, value in self.templates[key].items() if name != 'inline'},
+                          pages=self.pages[key])
+                for key in sorted(self.templates) if self.shared(key)}
+
+    def __contains__(self, key):
+        return key in self.templates
+
+    def __len__(self):
+        return sum(1 for key in self.templates if self.shared(key))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Process-pool parse workers for the crawl engines
+The fetch loop ships raw page bytes to worker processes that run the scraper's extractors
+and send back page records for the coordinator to merge
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from image_store import replace_image_paths
+from metrics import Metrics
+
+_worker_scraper = None
+
+
+class DeferredDownloads:
+    """Stands in for the image pool inside a worker and records requested downloads"""
+
+    def __init__(self):
+        self.requests = []
+
+    def submit(self, key, *args):
+        self.requests.append((key,) + args)
+        return None
+
+    def take(self):
+        requests, self.requests = self.requests, []
+        return requests
+
+
+def init_worker(scraper_class, base_url, parser, metrics_settings):
+    """Build the scraper instance each worker process reuses"""
+    global _worker_scraper
+    _worker_scraper = scraper_class(base_url, cache_dir=None, parser=parser)
+    _worker_scraper.image_pool = DeferredDownloads()
+    _worker_scraper.metrics = Metrics(**metrics_settings)
+
+
+def parse_in_worker(url, content, encoding):
+    """Decode and parse one page inside a worker process"""
+    scraper = _worker_scraper
+    # Without a declared charset the parser sniffs it from the bytes
+    with scraper.metrics.timer('decode'):
+        html = content.decode(encoding, errors='replace') if encoding else content
+
+    if hasattr(scraper, 'downloaded_images'):
+        scraper.downloaded_images = {}
+    parsed = scraper.metrics.profile(url, scraper.parse_page, url, html)
+
+    return {
+        "parsed": parsed,
+        "images": getattr(scraper, 'downloaded_images', {}),
+        "downloads": scraper.image_pool.take(),
+        "metrics": scraper.metrics.drain()
+    }
+
+
+def make_parse_pool(scraper, workers):
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(type(scraper), scraper.base_url, scraper.parser, scraper.metrics.settings())
+    )
+
+
+def merge_parsed(scraper, output):
+    """Fold a worker's page record and image requests into the coordinator's scraper"""
+    scraper.metrics.merge(output["metrics"])
+    for img_url, local_path in output["images"].items():
+        if img_url not in scraper.downloaded_images:
+            scraper.remember_image(img_url, local_path)
+
+    remap = {}
+    for key, full_url, subfolder in output["downloads"]:
+        if scraper.image_pool is not None:
+            scraper.image_pool.submit(key, full_url, subfolder)
+            continue
+        # Without a background pool the image is fetched now and the page points at the stored file
+        pending_path = scraper.image_store.pending_path(full_url)
+        try:
+            remap[pending_path] = scraper.fetch_image(full_url, subfolder)
+        except Exception as e:
+            print(f"  Error downloading image {key}: {e}")
+            scraper.metrics.count('image_errors')
+            remap[pending_path] = full_url
+
+    if remap:
+        for img_url, local_path in output["images"].items():
+            if local_path in remap:
+                scraper.remember_image(img_url, remap[local_path])
+        output["parsed"] = replace_image_paths(output["parsed"], remap)
+
+    return scraper.store_page(output["parsed"])
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Adaptive request pacing shared by page and image fetches
+A token bucket per host whose rate grows additively while responses stay fast and is cut
+multiplicatively on 429, 5xx or rising latency, honouring Retry-After
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from http_client import retry_history
+
+# Statuses that ask for fewer requests and may say for how long in Retry-After, any other 5xx also backs off
+THROTTLE_STATUSES = (429, 503)
+
+
+def overloaded(status):
+    """Whether a response status means the origin should get fewer requests"""
+    return status in THROTTLE_STATUSES or status >= 500
+
+
+def retry_after_seconds(value, now=None):
+    """Seconds to wait from a Retry-After header, given as seconds or an HTTP date, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class HostBucket:
+    """Token bucket and latency baseline for one host"""
+    __slots__ = ('rate', 'max_rate', 'burst', 'tokens', 'updated', 'blocked_until', 'samples', 'baseline',
+                 'last_decrease')
+
+    def __init__(self, rate, max_rate, burst, window):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.samples = deque(maxlen=window)  # Latest healthy response times
+        self.baseline = None  # Slow moving average of response times, what healthy looks like
+        self.last_decrease = 0.0
+
+
+class RateLimiter:
+    """Per-host AIMD rate control, thread-safe so crawler and image threads share it"""
+
+    def __init__(self, start_rate=4.0, min_rate=0.2, max_rate=50.0, burst=4, increase=0.5, decrease=0.5,
+                 latency_factor=2.0, latency_floor=0.25, baseline_samples=10, trend_samples=5, baseline_weight=0.05):
+        self.start_rate = start_rate  # Requests per second for a host not seen yet
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase  # Requests per second added per second of healthy responses
+        self.decrease = decrease  # Factor applied to the rate on backoff
+        self.latency_factor = latency_factor
+        self.latency_floor = latency_floor  # Latencies below this never count as rising
+        self.baseline_samples = baseline_samples  # Responses seen before latency can trigger a backoff
+        self.trend_samples = trend_samples  # Recent responses whose median is compared with the baseline
+        self.baseline_weight = baseline_weight  # Share of each response in the baseline once seeded
+        self.hosts = {}
+        self.lock = threading.Lock()
+        self.metrics = None  # Optional Metrics receiving waits, backoffs and current rates
+
+    def _bucket(self, host):
+        bucket = self.hosts.get(host)
+        if bucket is None:
+            bucket = self.hosts[host] = HostBucket(min(self.start_rate, self.max_rate), self.max_rate, self.burst,
+                                                   max(self.baseline_samples, self.trend_samples))
+        return bucket
+
+    def limit_host(self, url, max_rate, burst=1):
+        """Cap the host of url at max_rate requests per second with no bursts above burst, as Crawl-delay asks"""
+        with self.lock:
+            bucket = self._bucket(urlparse(url).netloc)
+            bucket.max_rate = min(bucket.max_rate, max_rate)
+            bucket.rate = min(bucket.rate, bucket.max_rate)
+            bucket.burst = burst
+            bucket.tokens = min(bucket.tokens, burst)
+
+    def acquire(self, url):
+        """Block until the host of url may be sent another request, returning the seconds waited"""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            # Tokens do not accumulate while Retry-After holds the host
+            elapsed = now - max(bucket.updated, bucket.blocked_until)
+            if elapsed > 0:
+                bucket.tokens = min(bucket.burst, bucket.tokens + elapsed * bucket.rate)
+                bucket.updated = now
+            # Taking the token up front queues callers behind each other, so they are served in order
+            bucket.tokens -= 1
+            wait = max(0.0, bucket.blocked_until - now) + max(0.0, -bucket.tokens / bucket.rate)
+
+        waited = 0.0
+        while wait > 0:
+            time.sleep(wait)
+            waited += wait
+            with self.lock:
+                # A Retry-After that arrived while sleeping still applies
+                wait = bucket.blocked_until - time.monotonic()
+
+        if self.metrics is not None and waited:
+            self.metrics.observe('rate_wait', waited)
+        return waited
+
+    def feedback(self, url, status, latency, retry_after=None, sent=None):
+        """Adjust the host's rate from one response to a request sent at time.monotonic() sent"""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            throttled = status in THROTTLE_STATUSES
+            failing = overloaded(status)
+            slow = False
+            if status < 400:
+                bucket.samples.append(latency)
+                if bucket.baseline is None:
+                    # Seeded from the median of the first responses, so one fast outlier cannot set it
+                    if len(bucket.samples) >= self.baseline_samples:
+                        bucket.baseline = statistics.median(bucket.samples)
+                else:
+                    # Drifts both ways, so a host that settles at a higher latency stops looking slow
+                    bucket.baseline += self.baseline_weight * (latency - bucket.baseline)
+                    trend = statistics.median(list(bucket.samples)[-self.trend_samples:])
+                    slow = trend > max(self.latency_floor, self.latency_factor * bucket.baseline)
+            if failing or slow:
+                # Requests sent before the last backoff were paced at the old rate, they don't count again
+                if sent is None or sent >= bucket.last_decrease:
+                    bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                    bucket.last_decrease = now
+                    self._count('rate_backoffs')
+                if throttled:
+                    wait = retry_after_seconds(retry_after)
+                    if wait:
+                        bucket.blocked_until = max(bucket.blocked_until, now + wait)
+                    bucket.tokens = min(bucket.tokens, 0)
+            elif status < 400:
+                # Spread the per-second increase over the requests made in that second
+                bucket.rate = min(bucket.max_rate, bucket.rate + self.increase / bucket.rate)
+            rate = bucket.rate
+
+        if throttled:
+            self._count('throttled_responses')
+        if self.metrics is not None:
+            self.metrics.gauge('request_rate', rate, host=host)
+
+    def _count(self, name):
+        if self.metrics is not None:
+            self.metrics.count(name)
+
+    def get(self, session, url, **kwargs):
+        """session.get(url), feeding the response back into the host's rate, call acquire(url) first"""
+        sent = time.monotonic()
+        try:
+            response = session.get(url, **kwargs)
+        except Exception:
+            # Timeouts and dropped connections are the strongest slow-down signal
+            self.feedback(url, 503, time.monotonic() - sent, sent=sent)
+            raise
+        status = response.status_code
+        # Throttled or failed attempts that urllib3 already retried still mean the host wants fewer requests
+        retried = [attempt.status for attempt in retry_history(response)
+                   if attempt.status and overloaded(attempt.status)]
+        if status < 400 and retried:
+            status = retried[-1]
+        self.feedback(url, status, time.monotonic() - sent, response.headers.get('Retry-After'), sent)
+        return response
+
+    def rates(self):
+        """Current requests per second for every host"""
+        with self.lock:
+            return {host: bucket.rate for host, bucket in self.hosts.items()}
@@ -4,24 +4,61 @@ Nothing Better Health Website Scraper
 Extracts all content from nothingbetterhealth.com and stores it in organized format
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
 import os
-import re
+import sys
 from urllib.parse import urljoin, urlparse
 import time
 from datetime import datetime
 import hashlib
 
+from asset_table import AssetTable, asset_id
+from crawl_core import CrawlCore
+from crawl_frontier import CrawlFrontier
+from crawl_state import CrawlState
+from dom_visitor import DOMVisitor
+from html_parsers import make_soup, parse_lxml
+from http_cache import ResponseCache
+from http_client import CrawlSession
+from metrics import Metrics, timed
+from page_templates import TemplateTable, block_info, subtree_nodes, template_blocks
+from rate_limiter import RateLimiter
+from site_writer import load_json
+from text_normalize import clean_text, clean_texts
+
 class NBHScraper:
-    def __init__(self, base_url="https://www.nothingbetterhealth.com"):
+    # Pages to check when the site has no sitemap
+    seed_paths = [
+        '', '/about', '/contact', '/services', '/products', 
+        '/blog', '/news', '/faq', '/privacy', '/terms'
+    ]
+    
+    def __init__(self, base_url="https://www.nothingbetterhealth.com", cache_dir=".http_cache", parser="html.parser",
+                 state_path=".crawl_state/nbh.sqlite3", profile_dir=None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.parser = parser  # One of html_parsers.PARSER_BACKENDS
+        
+        # Stage timings and counters, profile_dir also keeps cProfile output of slow pages
+        self.metrics = Metrics('nbh_scraper', profile_dir=profile_dir)
+        
+        # Revalidate against bodies from earlier runs instead of refetching them
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        if self.cache:
+            self.cache.metrics = self.metrics
+        
+        # Keep-alive pools with retries and timeouts, sized to the crawl in crawl_site
+        self.session = CrawlSession(cache=self.cache)
+        self.session.metrics = self.metrics
+        
         self.visited_urls = set()
+        self.frontier = CrawlFrontier()
+        
+        # Paces page and image requests per host, adapting to how the server responds
+        self.rate_limiter = RateLimiter()
+        self.rate_limiter.metrics = self.metrics
+        
+        self.state_path = state_path  # Crawl checkpoint, None disables resumable crawls
+        self.crawl_state = None
         self.content_data = {
             "metadata": {
                 "site_name": "Nothing Better Health",
@@ -34,57 +71,57 @@ class NBHScraper:
             "blog_posts": {},
             "products": {},
             "media": {
-                "images": [],
+                "images": {},  # Filled from self.assets when saved
                 "videos": []
             },
-            "components": {}
+            "components": {
+                "templates": {}  # Filled from self.templates when saved
+            },
+            "aliases": {}  # Map near-duplicate URL to the URL of the page stored for it
         }
+        self.assets = AssetTable()  # Every image once, keyed by asset ID
+        self.templates = TemplateTable()  # Header, footer and nav blocks shared across pages, keyed by template ID
         
     def clean_text(self, text):
         """Clean and normalize text content"""
-        if not text:
-            return ""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\-.,!?;:()\'"/@#$%&*+=]', '', text)
-        return text.strip()
+        return clean_text(text)
     
-    def extract_metadata(self, soup):
-        """Extract page metadata"""
-        metadata = {}
-        
-        # Title
-        title_tag = soup.find('title')
-        metadata['title'] = title_tag.text.strip() if title_tag else ""
-        
-        # Meta tags
-        for meta in soup.find_all('meta'):
-            name = meta.get('name') or meta.get('property', '')
-            content = meta.get('content', '')
-            if name and content:
-                metadata[name] = content
-                
-        # Canonical URL
-        canonical = soup.find('link', {'rel': 'canonical'})
-        if canonical:
-            metadata['canonical_url'] = canonical.get('href', '')
-            
-        return metadata
-    
-    def extract_navigation(self, soup):
-        """Extract navigation menu structure"""
+    @timed('extract_all')
+    def extract_all(self, soup, page_url, skip=(), marks=None):
+        """Run every extractor in one walk of the document, returning page data and internal links"""
+        title_tags = []
+        meta_tags = []
+        canonical_tags = []
         nav_data = {
             "main_menu": [],
             "footer_menu": [],
             "social_links": []
         }
+        headers = {level: [] for level in range(1, 7)}
+        paragraphs = []
+        lists = {'ul': [], 'ol': []}
+        sections = []
+        images = []
+        forms = []
+        internal_links = []
+        social_patterns = ['facebook', 'twitter', 'instagram', 'linkedin', 'youtube', 'pinterest']
+        
+        def visit_title(tag):
+            if not title_tags:
+                title_tags.append(tag)
         
-        # Try to find navigation elements
-        nav_elements = soup.find_all(['nav', 'header'])
-        for nav in nav_elements:
-            links = nav.find_all('a')
-            for link in links:
+        def visit_meta(meta):
+            name = meta.get('name') or meta.get('property', '')
+            content = meta.get('content', '')
+            if name and content:
+                meta_tags.append((name, content))
+        
+        def visit_link(link):
+            if not canonical_tags and 'canonical' in (link.get('rel') or []):
+                canonical_tags.append(link)
+        
+        def visit_nav(nav):
+            for link in nav.find_all('a'):
                 href = link.get('href', '')
                 text = self.clean_text(link.get_text())
                 if href and text:
@@ -98,10 +135,9 @@ class NBHScraper:
                     else:
                         nav_data["main_menu"].append(nav_item)
         
-        # Extract social links
-        social_patterns = ['facebook', 'twitter', 'instagram', 'linkedin', 'youtube', 'pinterest']
-        all_links = soup.find_all('a', href=True)
-        for link in all_links:
+        def visit_anchor(link):
+            if not link.has_attr('href'):
+                return
             href = link.get('href', '').lower()
             for pattern in social_patterns:
                 if pattern in href:
@@ -111,114 +147,285 @@ class NBHScraper:
                         "text": self.clean_text(link.get_text())
                     })
                     break
-                    
-        return nav_data
-    
-    def extract_content_sections(self, soup):
-        """Extract main content sections from the page"""
-        content = {
-            "headers": [],
-            "paragraphs": [],
-            "lists": [],
-            "sections": []
-        }
+            
+            href = urljoin(page_url, link['href'])
+            if self.base_url in href and href not in self.visited_urls:
+                internal_links.append(href)
         
-        # Extract headers
-        for i in range(1, 7):
-            headers = soup.find_all(f'h{i}')
-            for header in headers:
-                text = self.clean_text(header.get_text())
-                if text:
-                    content["headers"].append({
-                        "level": i,
-                        "text": text,
-                        "id": header.get('id', '')
-                    })
+        def visit_header(header):
+            text = self.clean_text(header.get_text())
+            if text:
+                level = int(header.name[1])
+                headers[level].append({
+                    "level": level,
+                    "text": text,
+                    "id": header.get('id', '')
+                })
         
-        # Extract paragraphs
-        paragraphs = soup.find_all('p')
-        for p in paragraphs:
+        def visit_paragraph(p):
             text = self.clean_text(p.get_text())
             if text and len(text) > 20:  # Filter out very short paragraphs
-                content["paragraphs"].append(text)
-        
-        # Extract lists
-        for list_type in ['ul', 'ol']:
-            lists = soup.find_all(list_type)
-            for lst in lists:
-                items = []
-                for li in lst.find_all('li'):
-                    text = self.clean_text(li.get_text())
-                    if text:
-                        items.append(text)
-                if items:
-                    content["lists"].append({
-                        "type": list_type,
-                        "items": items
-                    })
+                paragraphs.append(text)
+        
+        def visit_list(lst):
+            items = [text for text in clean_texts(li.get_text() for li in lst.find_all('li')) if text]
+            if items:
+                lists[lst.name].append({
+                    "type": lst.name,
+                    "items": items
+                })
         
-        # Extract main content sections
-        main_sections = soup.find_all(['section', 'article', 'main'])
-        for section in main_sections:
+        def visit_section(section):
             section_data = {
                 "id": section.get('id', ''),
                 "class": ' '.join(section.get('class', [])),
                 "content": self.clean_text(section.get_text())[:500]  # First 500 chars
             }
             if section_data["content"]:
-                content["sections"].append(section_data)
-                
-        return content
-    
-    def extract_images(self, soup, page_url):
-        """Extract all images from the page"""
-        images = []
-        img_tags = soup.find_all('img')
+                sections.append(section_data)
         
-        for img in img_tags:
+        def visit_image(img):
             src = img.get('src', '')
             if src:
-                img_data = {
+                images.append({
                     "src": urljoin(page_url, src),
                     "alt": img.get('alt', ''),
                     "title": img.get('title', ''),
                     "width": img.get('width', ''),
                     "height": img.get('height', ''),
                     "page_url": page_url
-                }
-                images.append(img_data)
-                
-        return images
-    
-    def extract_forms(self, soup):
-        """Extract form data from the page"""
-        forms = []
-        form_tags = soup.find_all('form')
+                })
         
-        for form in form_tags:
+        def visit_form(form):
             form_data = {
                 "action": form.get('action', ''),
                 "method": form.get('method', 'get'),
                 "id": form.get('id', ''),
                 "fields": []
             }
-            
-            # Extract form fields
-            inputs = form.find_all(['input', 'textarea', 'select'])
-            for field in inputs:
-                field_data = {
+            for field in form.find_all(['input', 'textarea', 'select']):
+                form_data["fields"].append({
                     "type": field.get('type', field.name),
                     "name": field.get('name', ''),
                     "id": field.get('id', ''),
                     "placeholder": field.get('placeholder', ''),
                     "required": field.has_attr('required')
-                }
-                form_data["fields"].append(field_data)
-                
+                })
             if form_data["fields"]:
                 forms.append(form_data)
-                
-        return forms
+        
+        visitor = DOMVisitor()
+        visitor.register('title', visit_title)
+        visitor.register('meta', visit_meta)
+        visitor.register('link', visit_link)
+        visitor.register(['nav', 'header'], visit_nav)
+        visitor.register('a', visit_anchor)
+        visitor.register(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'], visit_header)
+        visitor.register('p', visit_paragraph)
+        visitor.register(['ul', 'ol'], visit_list)
+        visitor.register(['section', 'article', 'main'], visit_section)
+        visitor.register('img', visit_image)
+        visitor.register('form', visit_form)
+        
+        def mark_block(key):
+            # How much of each list comes before the skipped block, so a block no other page shares can go back there
+            if key not in marks:
+                marks[key] = {
+                    "navigation": {name: len(items) for name, items in nav_data.items()},
+                    "headers": [len(headers[level]) for level in range(1, 7)],
+                    "paragraphs": len(paragraphs),
+                    "lists": {name: len(items) for name, items in lists.items()},
+                    "sections": len(sections),
+                    "images": len(images),
+                    "forms": len(forms)
+                }
+        
+        visitor.walk(soup, skip, mark_block if marks is not None else None)
+        
+        # Assemble in the same order the multi-pass extractors produce
+        metadata = {'title': title_tags[0].text.strip() if title_tags else ""}
+        for name, content in meta_tags:
+            metadata[name] = content
+        if canonical_tags:
+            metadata['canonical_url'] = canonical_tags[0].get('href', '')
+        
+        content = {
+            "headers": [header for level in range(1, 7) for header in headers[level]],
+            "paragraphs": paragraphs,
+            "lists": lists['ul'] + lists['ol'],
+            "sections": sections
+        }
+        
+        return {
+            "metadata": metadata,
+            "navigation": nav_data,
+            "content": content,
+            "images": images,
+            "forms": forms
+        }, internal_links
+    
+    def fetch_page(self, url):
+        """Fetch the raw HTML of a page"""
+        self.rate_limiter.acquire(url)
+        with self.metrics.timer('fetch'):
+            response = self.rate_limiter.get(self.session, url)
+            response.raise_for_status()
+        self.metrics.count('pages_fetched')
+        self.metrics.count('bytes_downloaded', len(response.content))
+        with self.metrics.timer('decode'):
+            return response.text
+    
+    def fetch_content(self, url):
+        """Fetch a page as undecoded bytes plus the encoding the server declared"""
+        self.rate_limiter.acquire(url)
+        with self.metrics.timer('fetch'):
+            response = self.rate_limiter.get(self.session, url)
+            response.raise_for_status()
+        self.metrics.count('pages_fetched')
+        self.metrics.count('bytes_downloaded', len(response.content))
+        return response.content, response.encoding
+    
+    def tree_backend(self):
+        """Backend of the tree extract_page reads, pages are parsed once per backend in a shared crawl"""
+        return self.parser
+    
+    def parse_tree(self, html):
+        """Parse fetched HTML into the tree the extractors walk"""
+        # The direct lxml path skips building a BeautifulSoup tree entirely
+        with self.metrics.timer('parse'):
+            if self.parser == 'lxml-direct':
+                return parse_lxml(html)
+            return make_soup(html, self.parser)
+    
+    def parse_page(self, url, html):
+        """Extract a page record from fetched HTML without storing it"""
+        return self.extract_page(url, self.parse_tree(html))
+    
+    def extract_page(self, url, soup):
+        """Extract a page record from a parsed tree without storing it"""
+        # Generate page ID
+        page_id = hashlib.md5(url.encode()).hexdigest()[:8]
+        
+        # Header, footer and nav blocks are extracted once for the site, pages only refer to them
+        blocks = template_blocks(soup)
+        templates = {}
+        template_links = []
+        for key, block in blocks:
+            if key not in self.templates and key not in templates:
+                record, links = self.extract_all(block, url)
+                del record["metadata"]
+                templates[key] = dict(block_info(block), **record)
+                template_links += links
+        
+        marks = {}
+        extracted, internal_links = self.extract_all(soup, url, skip=subtree_nodes(blocks), marks=marks)
+        # Blocks seen first here stay in this page unless another page shows them too
+        for key, record in templates.items():
+            record["inline"] = marks.get(key)
+        page_data = {
+            "url": url,
+            "scraped_at": datetime.now().isoformat(),
+            **extracted,
+            "templates": list(dict.fromkeys(key for key, _ in blocks))
+        }
+        
+        # Categorize page
+        url_path = urlparse(url).path.lower()
+        if 'blog' in url_path or 'post' in url_path or 'article' in url_path:
+            category = "blog_posts"
+        elif 'product' in url_path or 'shop' in url_path:
+            category = "products"
+        else:
+            category = "pages"
+        
+        return {
+            "id": page_id,
+            "category": category,
+            "page_data": page_data,
+            "templates": templates,
+            "links": internal_links + template_links
+        }
+    
+    def store_page(self, parsed):
+        """Store a parsed page record in content_data and return its internal links"""
+        page_data = parsed["page_data"]
+        
+        # Images go into the shared asset table once, the page keeps their asset IDs
+        images = {}
+        for img in page_data["images"]:
+            images.setdefault(asset_id(img["src"]), img)
+        page_data = dict(page_data, images=self.assets.add_page(images))
+        
+        # New template blocks join the site-wide table, their images the asset table
+        for key, record in parsed.get("templates", {}).items():
+            images = {}
+            for img in record["images"]:
+                images.setdefault(asset_id(img["src"]), img)
+            record = dict(record, images=self.assets.add_page(images))
+            if record.get("inline"):
+                # The page keeps each image once, count the block's place among those
+                before = parsed["page_data"]["images"][:record["inline"]["images"]]
+                record["inline"] = dict(record["inline"], images=len({asset_id(img["src"]) for img in before}))
+            self.templates.add(key, record)
+        self.templates.add_page(page_data.get("templates", []))
+        
+        self.content_data[parsed["category"]][parsed["id"]] = page_data
+        if self.crawl_state is not None:
+            self.crawl_state.visited(page_data["url"], result=parsed)
+        return parsed["links"]
+    
+    def inline_templates(self, page_data):
+        """page_data with the template blocks no other page shows put back where they were"""
+        single = [(key, self.templates.inline(key)) for key in page_data.get("templates", [])]
+        single = [(key, record) for key, record in single if record is not None]
+        if not single:
+            return page_data
+        
+        navigation = {name: list(items) for name, items in page_data["navigation"].items()}
+        content = {name: list(items) for name, items in page_data["content"].items()}
+        images = list(page_data["images"])
+        forms = list(page_data["forms"])
+        # Last block first, so the marks of earlier ones still count from the page's own items
+        for _, record in reversed(single):
+            at = record["inline"]
+            if at is None:
+                continue
+            for name, index in at["navigation"].items():
+                navigation[name][index:index] = record["navigation"][name]
+            # Headers are grouped by level and lists by type, each group in document order
+            for level in range(1, 7):
+                index = sum(1 for header in content["headers"] if header["level"] < level) + at["headers"][level - 1]
+                content["headers"][index:index] = [header for header in record["content"]["headers"]
+                                                   if header["level"] == level]
+            for list_type in ('ul', 'ol'):
+                index = at["lists"][list_type] + (sum(1 for lst in content["lists"] if lst["type"] == 'ul')
+                                                  if list_type == 'ol' else 0)
+                content["lists"][index:index] = [lst for lst in record["content"]["lists"] if lst["type"] == list_type]
+            for name in ('paragraphs', 'sections'):
+                content[name][at[name]:at[name]] = record["content"][name]
+            images[at["images"]:at["images"]] = record["images"]
+            forms[at["forms"]:at["forms"]] = record["forms"]
+        
+        inlined = {key for key, _ in single}
+        return dict(page_data, navigation=navigation, content=content, images=list(dict.fromkeys(images)),
+                    forms=forms, templates=[key for key in page_data["templates"] if key not in inlined])
+    
+    def store_alias(self, url, canonical_url):
+        """Record a page that repeats canonical_url instead of storing it again"""
+        self.content_data["aliases"][url] = canonical_url
+        if self.crawl_state is not None:
+            self.crawl_state.visited(url, result={"url": url, "aliasOf": canonical_url})
+    
+    def process_page(self, url, html):
+        """Extract and store page data from fetched HTML, returning internal links"""
+        return self.store_page(self.metrics.profile(url, self.parse_page, url, html))
+    
+    def record_error(self, url, error):
+        """Report a page that could not be scraped"""
+        print(f"Error scraping {url}: {error}")
+        self.metrics.count('errors')
+        if self.crawl_state is not None:
+            self.crawl_state.visited(url, error=str(error))
     
     def scrape_page(self, url):
         """Scrape a single page"""
@@ -229,89 +436,84 @@ class NBHScraper:
         self.visited_urls.add(url)
         
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Generate page ID
-            page_id = hashlib.md5(url.encode()).hexdigest()[:8]
-            
-            page_data = {
-                "url": url,
-                "scraped_at": datetime.now().isoformat(),
-                "metadata": self.extract_metadata(soup),
-                "navigation": self.extract_navigation(soup),
-                "content": self.extract_content_sections(soup),
-                "images": self.extract_images(soup, url),
-                "forms": self.extract_forms(soup)
-            }
-            
-            # Store images in media section
-            self.content_data["media"]["images"].extend(page_data["images"])
-            
-            # Categorize page
-            url_path = urlparse(url).path.lower()
-            if 'blog' in url_path or 'post' in url_path or 'article' in url_path:
-                self.content_data["blog_posts"][page_id] = page_data
-            elif 'product' in url_path or 'shop' in url_path:
-                self.content_data["products"][page_id] = page_data
-            else:
-                self.content_data["pages"][page_id] = page_data
-                
-            # Extract internal links for crawling
-            internal_links = []
-            for link in soup.find_all('a', href=True):
-                href = urljoin(url, link['href'])
-                if self.base_url in href and href not in self.visited_urls:
-                    internal_links.append(href)
-                    
-            return internal_links
+            html = self.fetch_page(url)
+            return self.process_page(url, html)
             
         except Exception as e:
-            print(f"Error scraping {url}: {e}")
+            self.record_error(url, e)
             return []
     
-    def crawl_site(self, max_pages=100):
+    def open_crawl_state(self, resume=False, journal=True):
+        """Open the crawl checkpoint, restoring a previous run if resuming, and return pages already done"""
+        state = CrawlState(self.state_path, resume=resume)
+        done = 0
+        if resume:
+            visited, results, _ = state.restore(self.frontier)
+            self.visited_urls |= visited
+            for parsed in results:
+                if "aliasOf" in parsed:
+                    self.store_alias(parsed["url"], parsed["aliasOf"])
+                else:
+                    self.store_page(parsed)
+            done = len(visited)
+            print(f"Resuming crawl: {done} pages done, {len(self.frontier)} queued")
+        
+        self.crawl_state = state
+        if journal:
+            self.frontier.journal = state
+        return done
+    
+    def close_crawl_state(self):
+        if self.crawl_state is not None:
+            if self.frontier.journal is self.crawl_state:
+                self.frontier.journal = None
+            self.crawl_state.close()
+            self.crawl_state = None
+    
+    def begin_crawl(self, resume=False, journal=True, image_workers=0):
+        """Prepare per-crawl state and return the pages already done"""
+        # Checkpoint progress so an interrupted crawl can pick up where it stopped
+        if self.state_path:
+            return self.open_crawl_state(resume, journal)
+        return 0
+    
+    def finish_crawl(self):
+        """Nothing runs in the background while crawling"""
+    
+    def crawl_site(self, max_pages=100, concurrency=1, per_host_limit=4, delay=0.5, parse_workers=0,
+                   resume=False, discover=True, dedupe=True):
         """Crawl the entire site"""
-        to_visit = [self.base_url]
-        pages_scraped = 0
-        
-        # Common pages to check
-        common_paths = [
-            '', '/about', '/contact', '/services', '/products', 
-            '/blog', '/news', '/faq', '/privacy', '/terms'
-        ]
-        
-        for path in common_paths:
-            url = urljoin(self.base_url, path)
-            if url not in to_visit:
-                to_visit.append(url)
-        
-        while to_visit and pages_scraped < max_pages:
-            url = to_visit.pop(0)
-            new_links = self.scrape_page(url)
-            
-            if new_links:
-                for link in new_links:
-                    if link not in self.visited_urls and link not in to_visit:
-                        to_visit.append(link)
-                        
-            pages_scraped += 1
-            time.sleep(0.5)  # Be respectful to the server
+        pages_scraped = CrawlCore([self]).crawl(
+            max_pages=max_pages, concurrency=concurrency, per_host_limit=per_host_limit, delay=delay,
+            parse_workers=parse_workers, resume=resume, discover=discover, dedupe=dedupe
+        )
             
         print(f"\nScraping complete! Scraped {pages_scraped} pages")
+        if self.cache:
+            print(self.cache.report())
         
     def save_data(self, output_dir="scraped_content"):
         """Save scraped data in multiple formats"""
         os.makedirs(output_dir, exist_ok=True)
         
         # Save as JSON (complete data)
+        started = time.perf_counter()
         json_path = os.path.join(output_dir, "complete_content.json")
+        # Templates the previous export shares stay out of the pages a partial crawl saw them on
+        self.templates.seed(load_json(json_path).get("components", {}).get("templates", {}))
+        media = dict(self.content_data["media"], images=self.assets.records())
+        components = dict(self.content_data["components"], templates=self.templates.records())
+        pages = {page_type: {page_id: self.inline_templates(page_data)
+                             for page_id, page_data in self.content_data[page_type].items()}
+                 for page_type in ("pages", "blog_posts", "products")}
         with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(self.content_data, f, indent=2, ensure_ascii=False)
+            json.dump(dict(self.content_data, media=media, components=components, **pages), f, indent=2,
+                      ensure_ascii=False)
         print(f"Saved complete data to {json_path}")
+        self.metrics.since('save_json', started)
         
         # Save pages as individual markdown files
+        started = time.perf_counter()
         pages_dir = os.path.join(output_dir, "pages")
         os.makedirs(pages_dir, exist_ok=True)
         
@@ -319,25 +521,30 @@ class NBHScraper:
             type_dir = os.path.join(pages_dir, page_type)
             os.makedirs(type_dir, exist_ok=True)
             
-            for page_id, page_data in self.content_data[page_type].items():
+            for page_id, page_data in pages[page_type].items():
                 md_content = self.convert_to_markdown(page_data)
                 md_path = os.path.join(type_dir, f"{page_id}.md")
                 with open(md_path, 'w', encoding='utf-8') as f:
                     f.write(md_content)
+        self.metrics.since('save_markdown', started)
                     
         # Save summary
+        started = time.perf_counter()
         summary_path = os.path.join(output_dir, "summary.json")
         summary = {
             "total_pages": len(self.visited_urls),
             "blog_posts": len(self.content_data["blog_posts"]),
             "products": len(self.content_data["products"]),
             "regular_pages": len(self.content_data["pages"]),
-            "images": len(self.content_data["media"]["images"]),
+            "images": len(self.assets),
+            "aliases": len(self.content_data["aliases"]),
+            "templates": len(self.templates),
             "scraped_at": self.content_data["metadata"]["scraped_at"]
         }
         with open(summary_path, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2)
         print(f"Saved summary to {summary_path}")
+        self.metrics.since('save_summary', started)
         
     def convert_to_markdown(self, page_data):
         """Convert page data to markdown format"""
@@ -371,13 +578,12 @@ class NBHScraper:
             md_lines.append("")
             
         # Images
-        images = page_data.get("images", [])
+        images = [self.assets.get(key) for key in page_data.get("images", [])]
+        images = [img for img in images if img is not None]
         if images:
             md_lines.append("\n## Images\n")
             for img in images[:10]:  # Limit to first 10 images
-                alt = img.get("alt", "Image")
-                src = img.get("src", "")
-                md_lines.append(f"![{alt}]({src})")
+                md_lines.append(f"![{img.alt}]({img.src})")
                 
         return "\n".join(md_lines)
 
@@ -386,15 +592,20 @@ def main():
     scraper = NBHScraper()
     
     # Crawl the site
-    scraper.crawl_site(max_pages=50)  # Adjust max_pages as needed
+    # Pass --resume to continue an interrupted crawl
+    scraper.crawl_site(max_pages=50, concurrency=8, resume='--resume' in sys.argv[1:])  # Adjust max_pages as needed
     
     # Save the data
     scraper.save_data()
     
+    print("\n" + scraper.metrics.report())
+    scraper.metrics.write_prometheus(os.path.join('scraped_content', 'metrics.prom'))
+    
     print("\nScraping complete! Check the 'scraped_content' directory for results.")
     print("- complete_content.json: All content in structured JSON format")
     print("- pages/: Individual markdown files for each page")
     print("- summary.json: Overview of scraped content")
+    print("- metrics.prom: Crawl timings and counters in Prometheus text format")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,26 +4,89 @@ Nothing Better Health Website Scraper for Next.js/React/Tailwind 4.0
 Downloads all content and images for rebuilding with modern stack
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import Tag
 import json
 import os
 import re
-from urllib.parse import urljoin, urlparse, unquote
+import sys
+from urllib.parse import quote, urljoin, urlparse
 import time
+from collections import Counter
 from datetime import datetime
-import hashlib
-from pathlib import Path
+
+from asset_table import AssetTable, asset_id
+from crawl_core import CrawlCore
+from crawl_frontier import CrawlFrontier
+from crawl_state import CrawlState
+from http_cache import ResponseCache
+from http_client import CrawlSession
+from metrics import Metrics, timed
+from page_templates import TemplateTable, block_info, subtree_nodes, template_blocks
+from rate_limiter import RateLimiter
+from search_index import LY_KEEP_AFTER, LY_MIN_STEM, STEM_SUFFIXES, STOP_WORDS, SearchIndex
+from html_parsers import make_soup
+from image_pipeline import ImageDownloadPool
+from image_store import ImageStore, media_key, replace_image_paths
+from image_variants import ImageOptimizer
+from site_writer import (SHARD_KINDS, LazyMapping, PageShardWriter, SiteDataFile, SiteMerge, collection, load_json,
+                         join_tables, page_references, site_index_path, split_tables, write_atomic, write_if_changed,
+                         write_json_streaming)
+from text_normalize import clean_text, clean_texts
+
+# Statuses that mean a page is gone for good, so the merge drops its earlier record
+GONE_STATUSES = (404, 410)
+
+# Elements that group page content into sections
+SECTION_CONTAINERS = ('section', 'div')
+SECTION_HEADINGS = ('h1', 'h2', 'h3')
+CONTENT_BLOCKS = ('p', 'ul', 'ol', 'blockquote', 'img', 'figure')
 
 class NextJSScraper:
-    def __init__(self, base_url="https://www.nothingbetterhealth.com"):
+    # Important pages to check when the site has no sitemap
+    seed_paths = [
+        '', '/about', '/contact', '/services', '/products',
+        '/blog', '/portfolio', '/testimonials', '/faq',
+        '/privacy-policy', '/terms', '/pricing'
+    ]
+    
+    def __init__(self, base_url="https://www.nothingbetterhealth.com", cache_dir=".http_cache", parser="html.parser",
+                 stream_dir=None, state_path=".crawl_state/nextjs.sqlite3", profile_dir=None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.parser = parser  # One of html_parsers.PARSER_BACKENDS, lxml-direct uses the lxml soup
+        
+        # Stage timings and counters, profile_dir also keeps cProfile output of slow pages
+        self.metrics = Metrics('nextjs_scraper', profile_dir=profile_dir)
+        
+        # Revalidate against bodies from earlier runs instead of refetching them
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        if self.cache:
+            self.cache.metrics = self.metrics
+        
+        # Keep-alive pools with retries and timeouts, sized to the crawl in crawl_site
+        self.session = CrawlSession(cache=self.cache)
+        self.session.metrics = self.metrics
+        
         self.visited_urls = set()
+        self.failed_urls = set()  # Visited but not fetched, their earlier records are carried over
+        self.has_navigation = False  # Set once the home page's menus are extracted
+        self.frontier = CrawlFrontier()
+        
+        # Paces page and image requests per host, adapting to how the server responds
+        self.rate_limiter = RateLimiter()
+        self.rate_limiter.metrics = self.metrics
+        
+        self.state_path = state_path  # Crawl checkpoint, None disables resumable crawls
+        self.crawl_state = None
         self.downloaded_images = {}  # Map original URL to local path
+        self.assets = AssetTable()  # Every image once, keyed by asset ID, pages refer to the IDs
+        self.templates = TemplateTable()  # Header, footer and nav blocks shared across pages, keyed by template ID
+        self.image_store = ImageStore()  # Content-addressed files under public/images
+        self.image_pool = None  # Background download pool while crawling
+        self.image_remap = {}  # Provisional paths of queued downloads mapped to stored path or original URL
+        
+        # Streaming mode writes each page to a shard in stream_dir instead of keeping it in site_data
+        self.stream_dir = stream_dir
+        self.page_writer = None
         
         # Next.js compatible data structure
         self.site_data = {
@@ -50,22 +113,20 @@ class NextJSScraper:
                 "features": [],
                 "testimonials": [],
                 "cta": [],
-                "forms": []
+                "forms": [],
+                "templates": {}  # Filled from self.templates when saved
             },
             "media": {
                 "images": {},
                 "videos": []
             },
-            "seo": {}
+            "seo": {},
+            "aliases": {}  # Map near-duplicate URL to the URL of the page stored for it
         }
         
     def clean_text(self, text):
         """Clean and normalize text content"""
-        if not text:
-            return ""
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[^\w\s\-.,!?;:()\'"/@#$%&*+=]', '', text)
-        return text.strip()
+        return clean_text(text)
     
     def generate_slug(self, text):
         """Generate URL-friendly slug"""
@@ -73,71 +134,114 @@ class NextJSScraper:
         text = re.sub(r'[-\s]+', '-', text)
         return text.strip('-')
     
+    def image_source(self, img_url, context_page=""):
+        """Work out the remote URL and public/images subfolder for an image"""
+        # Handle relative and absolute URLs
+        full_url = urljoin(self.base_url, img_url)
+        
+        # Organize images by context
+        if 'product' in context_page.lower():
+            subfolder = 'products'
+        elif 'blog' in context_page.lower() or 'post' in context_page.lower():
+            subfolder = 'blog'
+        elif 'hero' in context_page.lower() or 'banner' in context_page.lower():
+            subfolder = 'hero'
+        elif 'logo' in img_url.lower():
+            subfolder = 'logos'
+        else:
+            subfolder = 'general'
+        
+        return full_url, subfolder
+    
+    def fetch_image(self, full_url, subfolder):
+        """Download an image into the content-addressed store and return its public path"""
+        print(f"  Downloading: {full_url}")
+        # The body is streamed outside requests, so an interrupted transfer is retried here
+        local_path, size, written = self.session.retrying(self.stream_image, full_url, subfolder)
+        self.metrics.count('images_downloaded')
+        self.metrics.count('image_bytes', size)
+        if not written:
+            self.metrics.count('images_deduplicated')
+        return local_path
+    
+    def stream_image(self, full_url, subfolder):
+        self.rate_limiter.acquire(full_url)
+        with self.metrics.timer('image_download'):
+            with self.rate_limiter.get(self.session, full_url, stream=True) as response:
+                response.raise_for_status()
+                return self.image_store.put(full_url, response.iter_content(chunk_size=8192), subfolder,
+                                            response.headers.get('Content-Type'))
+    
+    def queue_image(self, full_url, subfolder):
+        """Fetch an image now or hand it to the pool, returning the path pages should use"""
+        if self.image_pool is not None:
+            # The stored path is only known once the bytes are hashed, other renditions share the download
+            self.image_pool.submit(media_key(full_url), full_url, subfolder)
+            return self.image_store.pending_path(full_url)
+        return self.fetch_image(full_url, subfolder)
+    
     def download_image(self, img_url, context_page=""):
         """Download image and return local path"""
         if img_url in self.downloaded_images:
             return self.downloaded_images[img_url]
             
         try:
-            # Handle relative and absolute URLs
-            full_url = urljoin(self.base_url, img_url)
-            
-            # Generate filename
-            parsed = urlparse(full_url)
-            filename = os.path.basename(unquote(parsed.path))
-            
-            # If no filename, generate one
-            if not filename or '.' not in filename:
-                ext = '.jpg'  # Default extension
-                if 'png' in full_url.lower():
-                    ext = '.png'
-                elif 'gif' in full_url.lower():
-                    ext = '.gif'
-                elif 'svg' in full_url.lower():
-                    ext = '.svg'
-                elif 'webp' in full_url.lower():
-                    ext = '.webp'
-                
-                # Generate unique filename based on URL
-                filename = hashlib.md5(full_url.encode()).hexdigest()[:12] + ext
-            
-            # Organize images by context
-            if 'product' in context_page.lower():
-                subfolder = 'products'
-            elif 'blog' in context_page.lower() or 'post' in context_page.lower():
-                subfolder = 'blog'
-            elif 'hero' in context_page.lower() or 'banner' in context_page.lower():
-                subfolder = 'hero'
-            elif 'logo' in img_url.lower():
-                subfolder = 'logos'
-            else:
-                subfolder = 'general'
-            
-            # Create subfolder
-            save_dir = Path(f'public/images/{subfolder}')
-            save_dir.mkdir(parents=True, exist_ok=True)
+            full_url, subfolder = self.image_source(img_url, context_page)
             
-            # Local path for Next.js
-            local_path = f'/images/{subfolder}/{filename}'
-            full_save_path = Path(f'public{local_path}')
-            
-            # Download if not exists
-            if not full_save_path.exists():
-                print(f"  Downloading: {filename}")
-                response = self.session.get(full_url, timeout=10, stream=True)
-                response.raise_for_status()
-                
-                with open(full_save_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-            
-            self.downloaded_images[img_url] = local_path
+            # Images stored by this or an earlier run are never fetched again
+            local_path = self.image_store.lookup(full_url) or self.queue_image(full_url, subfolder)
+            self.metrics.count('images')
+            self.remember_image(img_url, local_path)
             return local_path
             
         except Exception as e:
             print(f"  Error downloading image {img_url}: {e}")
+            self.metrics.count('image_errors')
             return img_url  # Return original URL if download fails
     
+    def remember_image(self, img_url, local_path):
+        self.downloaded_images[img_url] = local_path
+        if self.crawl_state is not None:
+            self.crawl_state.image(img_url, local_path)
+    
+    def forget_image(self, img_url, fallback=None):
+        self.downloaded_images.pop(img_url, None)
+        # The checkpoint keeps the fallback so resumed pages can still be pointed at it
+        if self.crawl_state is not None:
+            self.crawl_state.image(img_url, fallback)
+    
+    def drain_images(self):
+        """Wait for queued image downloads and swap provisional paths for stored files or original URLs"""
+        remap = {}
+        failed_paths = {}
+        if self.image_pool is not None:
+            failed = self.image_pool.drain()
+            for full_url, local_path in self.image_pool.completed().items():
+                remap[self.image_store.pending_path(full_url)] = local_path
+            self.image_pool.shutdown()
+            self.image_pool = None
+            
+            for full_url, error in failed.items():
+                print(f"  Error downloading image {full_url}: {error}")
+                self.metrics.count('image_errors')
+                pending_path = self.image_store.pending_path(full_url)
+                remap[pending_path] = full_url
+                failed_paths[pending_path] = full_url
+        self.image_store.save()
+        
+        for img_url, path in list(self.downloaded_images.items()):
+            if path in failed_paths:
+                self.forget_image(img_url, failed_paths[path])
+            elif path in remap:
+                self.remember_image(img_url, remap[path])
+        
+        self.image_remap.update(remap)
+        if self.image_remap:
+            self.site_data = replace_image_paths(self.site_data, self.image_remap)
+            self.assets.replace_paths(self.image_remap)
+            # Streamed page shards are rewritten when siteData.json is assembled
+    
+    @timed('extract_seo_data')
     def extract_seo_data(self, soup):
         """Extract SEO metadata"""
         seo = {}
@@ -174,6 +278,7 @@ class NextJSScraper:
         
         return seo
     
+    @timed('extract_navigation')
     def extract_navigation(self, soup):
         """Extract navigation structure"""
         nav_data = {
@@ -241,7 +346,8 @@ class NextJSScraper:
                     
         return nav_data
     
-    def extract_components(self, soup, page_url):
+    @timed('extract_components')
+    def extract_components(self, soup, page_url, skip=(), marks=None):
         """Extract reusable components from the page"""
         components = {
             "hero": None,
@@ -328,160 +434,235 @@ class NextJSScraper:
                     components["features"].append(feature_data)
         
         # Forms
-        forms = soup.find_all('form')
-        for form in forms:
-            form_data = {
-                "id": form.get('id', f"form_{len(components['forms'])}"),
-                "action": form.get('action', ''),
-                "method": form.get('method', 'POST'),
-                "fields": []
-            }
-            
-            # Extract fields
-            inputs = form.find_all(['input', 'textarea', 'select'])
-            for field in inputs:
-                if field.get('type') != 'hidden':
-                    field_data = {
-                        "type": field.get('type', field.name),
-                        "name": field.get('name', ''),
-                        "label": field.get('placeholder', field.get('name', '')),
-                        "required": field.has_attr('required'),
-                        "options": []
-                    }
-                    
-                    # For select fields, get options
-                    if field.name == 'select':
-                        options = field.find_all('option')
-                        field_data["options"] = [opt.get_text() for opt in options]
-                    
-                    form_data["fields"].append(field_data)
-            
+        for form in soup.find_all('form'):
+            if id(form) in skip:
+                if marks is not None:
+                    marks.setdefault(skip[id(form)], {}).setdefault("forms", len(components["forms"]))
+                continue
+            form_data = self.extract_form(form, len(components["forms"]))
             if form_data["fields"]:
                 components["forms"].append(form_data)
         
         return components
     
-    def extract_page_content(self, soup, page_url):
-        """Extract main content with images properly mapped"""
-        content = {
-            "sections": [],
-            "images": {}
+    def extract_form(self, form, index):
+        """Extract a form and its visible fields, index numbers forms without an id"""
+        form_data = {
+            "id": form.get('id', f"form_{index}"),
+            "action": form.get('action', ''),
+            "method": form.get('method', 'POST'),
+            "fields": []
         }
         
-        # Main content areas
-        main_content = soup.find('main') or soup.find('article') or soup.find('[role="main"]') or soup.find('body')
+        # Extract fields
+        inputs = form.find_all(['input', 'textarea', 'select'])
+        for field in inputs:
+            if field.get('type') != 'hidden':
+                field_data = {
+                    "type": field.get('type', field.name),
+                    "name": field.get('name', ''),
+                    "label": field.get('placeholder', field.get('name', '')),
+                    "required": field.has_attr('required'),
+                    "options": []
+                }
+                
+                # For select fields, get options
+                if field.name == 'select':
+                    options = field.find_all('option')
+                    field_data["options"] = [opt.get_text() for opt in options]
+                
+                form_data["fields"].append(field_data)
         
-        if main_content:
-            # Process sections
-            sections = main_content.find_all(['section', 'div'])
-            
-            for section in sections:
-                section_data = {
-                    "id": section.get('id', ''),
-                    "className": ' '.join(section.get('class', [])),
+        return form_data
+    
+    @timed('extract_templates')
+    def extract_template(self, block, content, page_url):
+        """Extract a header, footer or nav block shared across pages, recording its images in content"""
+        links = []
+        for link in block.find_all('a', href=True):
+            href = link['href']
+            links.append({
+                "text": self.clean_text(link.get_text()),
+                "href": href if href.startswith('http') else f"/{href.lstrip('/')}",
+                "isExternal": not self.base_url in urljoin(self.base_url, href)
+            })
+        images = [self.image_asset(img, content, page_url) for img in block.find_all('img') if img.get('src')]
+        return dict(block_info(block), **{
+            "text": self.clean_text(block.get_text(' '))[:500],
+            "links": links,
+            "images": list(dict.fromkeys(images))
+        })
+    
+    def image_asset(self, img, content, page_url):
+        """Download an <img> and record it among the page's assets, returning its asset ID"""
+        local_path = self.download_image(img['src'], page_url)
+        key = asset_id(urljoin(self.base_url, img['src']))
+        # The first record of an image is kept
+        content["images"].setdefault(key, {
+            "src": local_path,
+            "alt": img.get('alt', ''),
+            "width": img.get('width', ''),
+            "height": img.get('height', ''),
+            "pageUrl": page_url
+        })
+        return key
+    
+    def add_content_block(self, elem, section_data, content, page_url):
+        """Append a content element to its section, downloading any images"""
+        if elem.name == 'img':
+            # Image element
+            if elem.get('src'):
+                key = self.image_asset(elem, content, page_url)
+                section_data["images"].append(key)
+                section_data["content"].append({
+                    "type": "image",
+                    "asset": key
+                })
+                
+        elif elem.name == 'figure':
+            # Figure with image and caption
+            img = elem.find('img')
+            if img and img.get('src'):
+                key = self.image_asset(img, content, page_url)
+                caption = elem.find('figcaption')
+                section_data["images"].append(key)
+                section_data["content"].append({
+                    "type": "figure",
+                    "asset": key,
+                    "caption": self.clean_text(caption.get_text()) if caption else ""
+                })
+                
+        elif elem.name == 'p':
+            # Paragraph - check for inline images
+            text = self.clean_text(elem.get_text())
+            if text:
+                # Check for images within paragraph
+                inline_imgs = elem.find_all('img')
+                for img in inline_imgs:
+                    if img.get('src'):
+                        section_data["images"].append(self.image_asset(img, content, page_url))
+                
+                section_data["content"].append({
+                    "type": "paragraph",
+                    "text": text
+                })
+                
+        elif elem.name in ['ul', 'ol']:
+            # List
+            items = clean_texts(li.get_text() for li in elem.find_all('li'))
+            if items:
+                section_data["content"].append({
+                    "type": "list",
+                    "listType": elem.name,
+                    "items": items
+                })
+                
+        elif elem.name == 'blockquote':
+            # Blockquote
+            section_data["content"].append({
+                "type": "blockquote",
+                "text": self.clean_text(elem.get_text())
+            })
+    
+    def build_sections(self, main_content, content, page_url, skip=(), marks=None):
+        """Build page sections in one pass over the main content"""
+        # Every heading and content block belongs to its nearest section/div only,
+        # so nested Wix wrappers no longer each repeat the same heading
+        position = {}  # Map container to its document order
+        sections = {}  # Map container to its section record
+        
+        def section_for(container):
+            section_data = sections.get(id(container))
+            if section_data is None:
+                section_data = sections[id(container)] = {
+                    "id": container.get('id', ''),
+                    "className": ' '.join(container.get('class', [])),
                     "heading": None,
                     "content": [],
                     "images": []
                 }
-                
-                # Get section heading
-                heading = section.find(['h1', 'h2', 'h3'])
-                if heading:
+            return section_data
+        
+        skipped_at = {}  # Map skipped block to the number of containers before it
+        for elem in main_content.descendants:
+            if not isinstance(elem, Tag):
+                continue
+            if id(elem) in skip:
+                skipped_at.setdefault(skip[id(elem)], len(position))
+                continue
+            name = elem.name
+            
+            if name in SECTION_CONTAINERS:
+                position[id(elem)] = len(position)
+            
+            elif name in SECTION_HEADINGS:
+                # Nearest enclosing container inside the main content
+                container = elem.parent
+                while (container is not None and container is not main_content
+                       and container.name not in SECTION_CONTAINERS):
+                    container = container.parent
+                if container is None or container is main_content:
+                    continue
+                section_data = section_for(container)
+                if section_data["heading"] is None:
                     section_data["heading"] = {
-                        "level": int(heading.name[1]),
-                        "text": self.clean_text(heading.get_text())
+                        "level": int(name[1]),
+                        "text": self.clean_text(elem.get_text())
                     }
-                
-                # Process content blocks
-                for elem in section.find_all(['p', 'ul', 'ol', 'blockquote', 'img', 'figure'], recursive=False):
-                    if elem.name == 'img':
-                        # Image element
-                        img_src = elem.get('src')
-                        if img_src:
-                            local_path = self.download_image(img_src, page_url)
-                            img_data = {
-                                "type": "image",
-                                "src": local_path,
-                                "alt": elem.get('alt', ''),
-                                "caption": "",
-                                "width": elem.get('width', ''),
-                                "height": elem.get('height', '')
-                            }
-                            section_data["images"].append(local_path)
-                            section_data["content"].append(img_data)
-                            content["images"][local_path] = img_data
-                            
-                    elif elem.name == 'figure':
-                        # Figure with image and caption
-                        img = elem.find('img')
-                        if img and img.get('src'):
-                            local_path = self.download_image(img['src'], page_url)
-                            caption = elem.find('figcaption')
-                            img_data = {
-                                "type": "figure",
-                                "src": local_path,
-                                "alt": img.get('alt', ''),
-                                "caption": self.clean_text(caption.get_text()) if caption else "",
-                                "width": img.get('width', ''),
-                                "height": img.get('height', '')
-                            }
-                            section_data["images"].append(local_path)
-                            section_data["content"].append(img_data)
-                            content["images"][local_path] = img_data
-                            
-                    elif elem.name == 'p':
-                        # Paragraph - check for inline images
-                        text = self.clean_text(elem.get_text())
-                        if text:
-                            # Check for images within paragraph
-                            inline_imgs = elem.find_all('img')
-                            for img in inline_imgs:
-                                if img.get('src'):
-                                    local_path = self.download_image(img['src'], page_url)
-                                    section_data["images"].append(local_path)
-                            
-                            section_data["content"].append({
-                                "type": "paragraph",
-                                "text": text
-                            })
-                            
-                    elif elem.name in ['ul', 'ol']:
-                        # List
-                        items = []
-                        for li in elem.find_all('li'):
-                            items.append(self.clean_text(li.get_text()))
-                        if items:
-                            section_data["content"].append({
-                                "type": "list",
-                                "listType": elem.name,
-                                "items": items
-                            })
-                            
-                    elif elem.name == 'blockquote':
-                        # Blockquote
-                        section_data["content"].append({
-                            "type": "blockquote",
-                            "text": self.clean_text(elem.get_text())
-                        })
-                
-                # Only add section if it has content
-                if section_data["content"] or section_data["heading"]:
-                    content["sections"].append(section_data)
+            
+            elif (name in CONTENT_BLOCKS and elem.parent is not main_content
+                  and elem.parent.name in SECTION_CONTAINERS):
+                self.add_content_block(elem, section_for(elem.parent), content, page_url)
+        
+        # A heading-only section adopts the heading-less content section right after it
+        merged = []
+        merged_at = []  # Container position of each merged section
+        for key in sorted(sections, key=position.get):
+            section_data = sections[key]
+            if not (section_data["content"] or section_data["heading"]):
+                continue
+            previous = merged[-1] if merged else None
+            if (previous is not None and previous["heading"] and not previous["content"]
+                    and section_data["heading"] is None):
+                previous["content"] = section_data["content"]
+                previous["images"] = section_data["images"]
+                continue
+            merged.append(section_data)
+            merged_at.append(position[key])
+        
+        if marks is not None:
+            for block, at in skipped_at.items():
+                marks.setdefault(block, {})["sections"] = sum(1 for start in merged_at if start < at)
+        return merged
+    
+    @timed('extract_page_content')
+    def extract_page_content(self, soup, page_url, skip=(), marks=None):
+        """Extract main content with images properly mapped, leaving out template blocks in skip"""
+        content = {
+            "sections": [],
+            "images": {}
+        }
+        
+        # Main content areas
+        main_content = soup.find('main') or soup.find('article') or soup.find('[role="main"]') or soup.find('body')
+        
+        if main_content:
+            content["sections"] = self.build_sections(main_content, content, page_url, skip, marks)
         
         # Also grab any standalone images not in sections
         all_images = soup.find_all('img')
         for img in all_images:
-            src = img.get('src')
-            if src and src not in content["images"]:
-                local_path = self.download_image(src, page_url)
-                content["images"][local_path] = {
-                    "src": local_path,
-                    "alt": img.get('alt', ''),
-                    "pageUrl": page_url
-                }
+            if not img.get('src'):
+                continue
+            if id(img) in skip:
+                if marks is not None:
+                    marks.setdefault(skip[id(img)], {}).setdefault("images", len(content["images"]))
+                continue
+            self.image_asset(img, content, page_url)
         
         return content
     
+    @timed('categorize_page')
     def categorize_page(self, url, soup):
         """Categorize page type based on URL and content"""
         url_lower = url.lower()
@@ -506,6 +687,181 @@ class NextJSScraper:
         
         return 'page'
     
+    def fetch_page(self, url):
+        """Fetch the raw HTML of a page"""
+        self.rate_limiter.acquire(url)
+        with self.metrics.timer('fetch'):
+            response = self.rate_limiter.get(self.session, url)
+            response.raise_for_status()
+        self.metrics.count('pages_fetched')
+        self.metrics.count('bytes_downloaded', len(response.content))
+        with self.metrics.timer('decode'):
+            return response.text
+    
+    def fetch_content(self, url):
+        """Fetch a page as undecoded bytes plus the encoding the server declared"""
+        self.rate_limiter.acquire(url)
+        with self.metrics.timer('fetch'):
+            response = self.rate_limiter.get(self.session, url)
+            response.raise_for_status()
+        self.metrics.count('pages_fetched')
+        self.metrics.count('bytes_downloaded', len(response.content))
+        return response.content, response.encoding
+    
+    def tree_backend(self):
+        """Backend of the tree extract_page reads, pages are parsed once per backend in a shared crawl"""
+        return 'lxml' if self.parser == 'lxml-direct' else self.parser
+    
+    def parse_tree(self, html):
+        """Parse fetched HTML into the soup the extractors walk"""
+        with self.metrics.timer('parse'):
+            return make_soup(html, self.tree_backend())
+    
+    def parse_page(self, url, html):
+        """Extract a page record from fetched HTML without storing it"""
+        return self.extract_page(url, self.parse_tree(html))
+    
+    def extract_page(self, url, soup):
+        """Extract a page record from a parsed soup without storing it"""
+        # Generate page slug
+        path = urlparse(url).path.strip('/')
+        slug = path if path else 'home'
+        
+        # Extract all data
+        page_type = self.categorize_page(url, soup)
+        
+        # Header, footer and nav blocks are extracted once for the site, pages only refer to them
+        blocks = template_blocks(soup)
+        skip = subtree_nodes(blocks)
+        marks = {}
+        
+        page_data = {
+            "url": url,
+            "slug": slug,
+            "type": page_type,
+            "scrapedAt": datetime.now().isoformat(),
+            "seo": self.extract_seo_data(soup),
+            "content": self.extract_page_content(soup, url, skip, marks),
+            "components": self.extract_components(soup, url, skip, marks),
+            "templates": list(dict.fromkeys(key for key, _ in blocks))
+        }
+        
+        # Image records move to the site-wide asset table, the page keeps their IDs
+        assets = page_data["content"]["images"]
+        page_data["content"]["images"] = list(assets)
+        
+        template_assets = {"images": {}}
+        templates = {}
+        for key, block in blocks:
+            if key not in self.templates and key not in templates:
+                templates[key] = self.extract_template(block, template_assets, url)
+                # Blocks seen first here stay in this page unless another page shows them too
+                at = marks.get(key, {})
+                forms = []
+                if "forms" in at:
+                    for form in block.find_all('form'):
+                        form_data = self.extract_form(form, at["forms"] + len(forms))
+                        if form_data["fields"]:
+                            forms.append(form_data)
+                templates[key]["inline"] = {
+                    "marks": at,
+                    # Sections of the block on its own, only when it sits inside the main content
+                    "sections": self.build_sections(block, template_assets, url) if "sections" in at else [],
+                    "forms": forms
+                }
+        for key, record in template_assets["images"].items():
+            assets.setdefault(key, record)
+        
+        # Extract navigation (only once from home page)
+        navigation = self.extract_navigation(soup) if url == self.base_url else None
+        
+        # Find internal links to crawl, those of templates already stored were followed from earlier pages
+        known = subtree_nodes([(key, block) for key, block in blocks if key in self.templates])
+        internal_links = []
+        for link in soup.find_all('a', href=True):
+            if id(link) in known:
+                continue
+            href = urljoin(url, link['href'])
+            parsed = urlparse(href)
+            
+            # Only follow internal links
+            if self.base_url in href and href not in self.visited_urls:
+                # Skip anchors and query parameters for now
+                if not parsed.fragment and not parsed.query:
+                    internal_links.append(href)
+        
+        return {
+            "page_data": page_data,
+            "assets": assets,
+            "templates": templates,
+            "navigation": navigation,
+            "links": internal_links
+        }
+    
+    def store_page(self, parsed):
+        """Store a parsed page record in site_data and return its internal links"""
+        page_data = parsed["page_data"]
+        slug = page_data["slug"]
+        page_type = page_data["type"]
+        self.assets.add_page(parsed.get("assets", {}))
+        for key, record in parsed.get("templates", {}).items():
+            self.templates.add(key, record)
+        self.templates.add_page(page_data.get("templates", []))
+        
+        # Streamed pages go straight to disk
+        if self.page_writer is not None:
+            kind = 'posts' if page_type == 'blog' else 'products' if page_type == 'product' else 'pages'
+            self.page_writer.write(kind, slug, page_data)
+        
+        # Store in appropriate category
+        elif page_type == 'blog':
+            self.site_data["blog"]["posts"][slug] = page_data
+        elif page_type == 'product':
+            self.site_data["products"][slug] = page_data
+        else:
+            self.site_data["pages"][slug] = page_data
+        
+        # Update SEO data
+        if self.page_writer is None:
+            self.site_data["seo"][slug] = page_data["seo"]
+        
+        if parsed["navigation"] is not None:
+            self.site_data["navigation"] = parsed["navigation"]
+            self.has_navigation = True
+        
+        if self.crawl_state is not None:
+            self.crawl_state.visited(page_data["url"], result=parsed)
+                    
+        return parsed["links"]
+    
+    def store_alias(self, url, canonical_url):
+        """Record a page that repeats canonical_url instead of storing it again"""
+        self.site_data["aliases"][url] = canonical_url
+        if self.crawl_state is not None:
+            self.crawl_state.visited(url, result={"url": url, "aliasOf": canonical_url})
+    
+    def process_page(self, url, html):
+        """Extract and store page data from fetched HTML, returning internal links"""
+        return self.store_page(self.metrics.profile(url, self.parse_page, url, html))
+    
+    def record_error(self, url, error):
+        """Report a page that could not be scraped"""
+        print(f"Error scraping {url}: {error}")
+        self.metrics.count('errors')
+        response = getattr(error, 'response', None)
+        if response is not None and response.status_code in GONE_STATUSES:
+            # Fetched and gone, the merge removes the page like one that no longer produces a record
+            if self.crawl_state is not None:
+                self.crawl_state.visited(url)
+            return
+        self.failed_urls.add(url)
+        if self.crawl_state is not None:
+            self.crawl_state.visited(url, error=str(error))
+    
+    def fetched_urls(self):
+        """URLs this crawl actually fetched, the only ones whose missing pages count as removed"""
+        return self.visited_urls - self.failed_urls
+    
     def scrape_page(self, url):
         """Scrape a single page with all images"""
         if url in self.visited_urls:
@@ -515,110 +871,366 @@ class NextJSScraper:
         self.visited_urls.add(url)
         
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Generate page slug
-            path = urlparse(url).path.strip('/')
-            slug = path if path else 'home'
-            
-            # Extract all data
-            page_type = self.categorize_page(url, soup)
-            
-            page_data = {
-                "url": url,
-                "slug": slug,
-                "type": page_type,
-                "scrapedAt": datetime.now().isoformat(),
-                "seo": self.extract_seo_data(soup),
-                "content": self.extract_page_content(soup, url),
-                "components": self.extract_components(soup, url)
-            }
-            
-            # Store in appropriate category
-            if page_type == 'blog':
-                self.site_data["blog"]["posts"][slug] = page_data
-            elif page_type == 'product':
-                self.site_data["products"][slug] = page_data
-            else:
-                self.site_data["pages"][slug] = page_data
+            html = self.fetch_page(url)
+            return self.process_page(url, html)
             
-            # Update SEO data
-            self.site_data["seo"][slug] = page_data["seo"]
+        except Exception as e:
+            self.record_error(url, e)
+            return []
+    
+    def open_crawl_state(self, resume=False, journal=True):
+        """Open the crawl checkpoint, restoring a previous run if resuming, and return pages already done"""
+        state = CrawlState(self.state_path, resume=resume)
+        done = 0
+        if resume:
+            visited, results, images = state.restore(self.frontier)
+            self.visited_urls |= visited
+            self.failed_urls |= state.failed()
+            self.downloaded_images.update(images)
+            self.resume_images()
+            for parsed in results:
+                if "aliasOf" in parsed:
+                    self.store_alias(parsed["url"], parsed["aliasOf"])
+                else:
+                    self.store_page(parsed)
+            done = len(visited)
+            print(f"Resuming crawl: {done} pages done, {len(self.frontier)} queued")
+        
+        self.crawl_state = state
+        if journal:
+            self.frontier.journal = state
+        return done
+    
+    def resume_images(self):
+        """Point pages restored from the checkpoint at stored files, queueing downloads that never finished"""
+        for img_url, path in list(self.downloaded_images.items()):
+            full_url, subfolder = self.image_source(img_url)
+            pending_path = self.image_store.pending_path(full_url)
             
-            # Extract navigation (only once from home page)
-            if url == self.base_url:
-                self.site_data["navigation"] = self.extract_navigation(soup)
+            if not path.startswith('/images/'):
+                # Failed last time, pages fall back to the original URL and the image is retried
+                del self.downloaded_images[img_url]
+                self.image_remap[pending_path] = path
+                continue
             
-            # Find internal links to crawl
-            internal_links = []
-            for link in soup.find_all('a', href=True):
-                href = urljoin(url, link['href'])
-                parsed = urlparse(href)
-                
-                # Only follow internal links
-                if self.base_url in href and href not in self.visited_urls:
-                    # Skip anchors and query parameters for now
-                    if not parsed.fragment and not parsed.query:
-                        internal_links.append(href)
-                        
-            return internal_links
+            if self.image_store.is_pending(path):
+                path = self.image_store.lookup(full_url)
+                if path is None:
+                    try:
+                        path = self.queue_image(full_url, subfolder)
+                    except Exception as e:
+                        print(f"  Error downloading image {img_url}: {e}")
+                        self.metrics.count('image_errors')
+                        del self.downloaded_images[img_url]
+                        self.image_remap[pending_path] = full_url
+                        continue
+                self.downloaded_images[img_url] = path
             
-        except Exception as e:
-            print(f"Error scraping {url}: {e}")
-            return []
+            if path != pending_path:
+                self.image_remap[pending_path] = path
+    
+    def close_crawl_state(self):
+        if self.crawl_state is not None:
+            if self.frontier.journal is self.crawl_state:
+                self.frontier.journal = None
+            self.crawl_state.close()
+            self.crawl_state = None
+        if self.page_writer is not None:
+            self.page_writer.close()
+        # Downloads that finished are kept in the manifest even when the crawl fails
+        self.image_store.save()
+    
+    def begin_crawl(self, resume=False, journal=True, image_workers=4):
+        """Prepare per-crawl state and return the pages already done"""
+        if self.stream_dir:
+            if self.page_writer is not None:
+                self.page_writer.close()
+            self.page_writer = PageShardWriter(self.stream_dir, resume=resume)
+        
+        # Images download in the background while pages are parsed
+        if image_workers:
+            self.image_pool = ImageDownloadPool(self.fetch_image, max_workers=image_workers)
+        
+        # Checkpoint progress so an interrupted crawl can pick up where it stopped
+        if self.state_path:
+            return self.open_crawl_state(resume, journal)
+        return 0
     
-    def crawl_site(self, max_pages=100):
+    def finish_crawl(self):
+        """Wait for the image downloads queued while crawling"""
+        self.drain_images()
+    
+    def crawl_site(self, max_pages=100, concurrency=1, per_host_limit=4, delay=0.5, parse_workers=0,
+                   resume=False, discover=True, image_workers=4, dedupe=True):
         """Crawl the entire site"""
-        to_visit = [self.base_url]
-        pages_scraped = 0
-        
-        # Important pages to check
-        important_paths = [
-            '', '/about', '/contact', '/services', '/products',
-            '/blog', '/portfolio', '/testimonials', '/faq',
-            '/privacy-policy', '/terms', '/pricing'
-        ]
-        
-        for path in important_paths:
-            url = urljoin(self.base_url, path)
-            if url not in to_visit:
-                to_visit.append(url)
-        
-        while to_visit and pages_scraped < max_pages:
-            url = to_visit.pop(0)
-            new_links = self.scrape_page(url)
-            
-            if new_links:
-                for link in new_links:
-                    if link not in self.visited_urls and link not in to_visit:
-                        to_visit.append(link)
-                        
-            pages_scraped += 1
-            time.sleep(0.5)  # Respectful crawling
+        pages_scraped = CrawlCore([self]).crawl(
+            max_pages=max_pages, concurrency=concurrency, per_host_limit=per_host_limit, delay=delay,
+            parse_workers=parse_workers, resume=resume, discover=discover, image_workers=image_workers,
+            dedupe=dedupe
+        )
             
         print(f"\n✓ Scraping complete! Processed {pages_scraped} pages")
         print(f"✓ Downloaded {len(self.downloaded_images)} images")
+        if self.cache:
+            print(f"✓ {self.cache.report()}")
+        
+    def optimize_images(self, workers=None):
+        """Build responsive variants of downloaded images and record them under media.images"""
+        with self.metrics.timer('optimize_images'):
+            records = ImageOptimizer(self.image_store, workers=workers).run(self.downloaded_images.values())
+        self.site_data["media"]["images"].update(records)
+        self.metrics.count('images_with_variants', len(records))
+        print(f"✓ Responsive variants for {len(records)} images")
+    
+    def new_pages(self, kind):
+        """Yield (slug, page_data) of one collection from this crawl as saved"""
+        if self.page_writer is not None:
+            for _, slug, page_data in self.page_writer.iter_pages(kind, self.final_page):
+                yield slug, page_data
+        else:
+            for slug, page_data in collection(self.site_data, kind).items():
+                yield slug, self.inline_templates(page_data)
+    
+    def new_page(self, kind, slug):
+        if self.page_writer is not None:
+            return self.final_page(self.page_writer.read(kind, slug))
+        return self.inline_templates(collection(self.site_data, kind)[slug])
+    
+    def merged_pages(self, merge):
+        """Yield (kind, slug, page_data) for every page of the merged output, one page in memory at a time"""
+        for kind in SHARD_KINDS:
+            for slug, page_data in merge.records(kind, lambda slug: self.new_page(kind, slug)):
+                yield kind, slug, page_data
+    
+    def final_image_paths(self, page_data):
+        return replace_image_paths(page_data, self.image_remap) if self.image_remap else page_data
+    
+    def final_page(self, page_data):
+        return self.final_image_paths(self.inline_templates(page_data))
+    
+    def inline_templates(self, page_data):
+        """page_data with the template blocks no other page shows put back where they were"""
+        single = [(key, self.templates.inline(key)) for key in page_data.get("templates", [])]
+        single = [(key, record) for key, record in single if record is not None]
+        if not single:
+            return page_data
         
-    def save_nextjs_data(self):
-        """Save data in Next.js compatible format"""
+        sections = list(page_data["content"]["sections"])
+        images = list(page_data["content"]["images"])
+        forms = list(page_data["components"]["forms"])
+        # Last block first, so the marks of earlier ones still count from the page's own items
+        for _, record in reversed(single):
+            inline = record["inline"]
+            at = inline["marks"]
+            if "sections" in at:
+                sections[at["sections"]:at["sections"]] = inline["sections"]
+            if "images" in at:
+                images[at["images"]:at["images"]] = record["images"]
+            if "forms" in at:
+                forms[at["forms"]:at["forms"]] = inline["forms"]
+        
+        inlined = {key for key, _ in single}
+        content = dict(page_data["content"], sections=sections, images=list(dict.fromkeys(images)))
+        return dict(page_data, content=content, components=dict(page_data["components"], forms=forms),
+                    templates=[key for key in page_data["templates"] if key not in inlined])
+    
+    def site_wide_data(self, previous, merge):
+        """Everything in site_data but the page collections, keeping the previous timestamp if nothing changed"""
+        site = {key: value for key, value in self.site_data.items() if key not in ('pages', 'products', 'seo')}
+        # Assets stay in the table while a merged page shows them, directly or through one of its templates
+        previous_media = previous.get("media", {})
+        known_templates = dict(previous.get("components", {}).get("templates", {}), **self.templates.records())
+        shown = Counter()
+        listed = Counter()
+        for asset_ids, template_ids in merge.referenced():
+            template_ids = [key for key in template_ids if key in known_templates]
+            listed.update(template_ids)
+            asset_ids = set(asset_ids)
+            for key in template_ids:
+                asset_ids.update(known_templates[key]["images"])
+            shown.update(asset_ids)
+        known_assets = dict(previous_media.get("assets", {}), **self.assets.records(camel_case=True))
+        assets = {key: dict(known_assets[key], pages=shown[key]) for key in sorted(shown) if key in known_assets}
+        # As do the responsive variants of their images
+        sources = {asset["src"] for asset in assets.values()}
+        images = dict(previous_media.get("images", {}), **site["media"]["images"])
+        images = {path: images[path] for path in sorted(images) if path in sources}
+        site["media"] = dict(site["media"], assets=assets, images=images)
+        # Menus come from the home page, a crawl that could not fetch it keeps the previous ones
+        if not self.has_navigation and previous.get("navigation"):
+            site["navigation"] = previous["navigation"]
+        # So do the header, footer and nav templates, counted over the merged pages that list them
+        templates = {key: dict(known_templates[key], pages=listed[key]) for key in sorted(listed)}
+        site["components"] = dict(site["components"], templates=templates)
+        # Aliases of URLs not crawled this time are carried over like their pages
+        fetched = self.fetched_urls()
+        aliases = {url: canonical for url, canonical in previous.get("aliases", {}).items() if url not in fetched}
+        site["aliases"] = dict(sorted(dict(aliases, **self.site_data["aliases"]).items()))
+        site["blog"] = {key: value for key, value in self.site_data["blog"].items() if key != 'posts'}
+        previous_blog = {key: value for key, value in previous.get("blog", {}).items() if key != 'posts'}
+        
+        # A new timestamp alone would change the file's bytes
+        unchanged = not merge.has_changes() and site["blog"] == previous_blog and all(
+            value == previous.get(key) for key, value in site.items() if key not in ('metadata', 'blog'))
+        if unchanged and previous.get("metadata"):
+            site["metadata"] = dict(site["metadata"], scrapedAt=previous["metadata"].get("scrapedAt"))
+        return site
+    
+    def write_site_data(self, site_data_path):
+        """Merge this crawl into the existing siteData.json, one page in memory at a time when streaming"""
+        # The index gives the url and contentHash of every previous page, records are read only to carry them over
+        previous_file = SiteDataFile.open(site_data_path)
+        if previous_file is not None:
+            previous = previous_file.site()
+            merge = SiteMerge(previous_file.entries(), self.fetched_urls(), previous_file.record)
+        else:
+            # Written before the index existed, read whole once
+            previous = load_json(site_data_path)
+            merge = SiteMerge(previous, self.fetched_urls())
+        # Templates the previous file shares stay out of the pages a partial crawl saw them on
+        self.templates.seed(previous.get("components", {}).get("templates", {}))
+        for kind in SHARD_KINDS:
+            merge.add(kind, self.new_pages(kind))
+        
+        entries = {kind: {} for kind in SHARD_KINDS}
+        spans = {kind: {} for kind in SHARD_KINDS}
+        
+        def records_of(kind):
+            def records():
+                for slug, page_data in merge.records(kind, lambda slug: self.new_page(kind, slug)):
+                    asset_ids, template_ids = page_references(page_data)
+                    # The references let the next merge prune the tables without reading carried-over pages
+                    entries[kind][slug] = {"url": page_data.get("url"), "contentHash": page_data.get("contentHash"),
+                                           "assets": asset_ids, "templates": template_ids}
+                    yield slug, page_data
+            return records
+        
+        def seo_entries():
+            for kind in SHARD_KINDS:
+                for slug, page_data in merge.records(kind, lambda slug: self.new_page(kind, slug)):
+                    yield slug, page_data["seo"]
+        
+        site = self.site_wide_data(previous, merge)
+        output = dict(self.site_data, **site)
+        output["pages"] = LazyMapping(records_of('pages'), spans["pages"])
+        output["blog"] = dict(site["blog"], posts=LazyMapping(records_of('posts'), spans["posts"]))
+        output["products"] = LazyMapping(records_of('products'), spans["products"])
+        output["seo"] = LazyMapping(seo_entries)
+        
+        written = write_json_streaming(site_data_path, output)
+        index = {
+            "size": os.path.getsize(site_data_path),
+            "site": site,
+            "pages": {kind: {slug: dict(entry, span=spans[kind][slug]) for slug, entry in entries[kind].items()}
+                      for kind in SHARD_KINDS}
+        }
+        write_if_changed(site_index_path(site_data_path), json.dumps(index, ensure_ascii=False))
+        # Carried-over records now live at their offsets in the new file
+        merge.load = SiteDataFile(site_data_path, index).record
+        return merge, written
+    
+    def write_sharded_site_data(self, data_dir):
+        """Write one JSON file per page, post and product plus a small index, rewriting only changed pages"""
+        index_path = os.path.join(data_dir, 'index.json')
+        site_path = os.path.join(data_dir, 'site.json')
+        tables_path = os.path.join(data_dir, 'assets.json')
+        previous_index = load_json(index_path)
+        previous_site = join_tables(load_json(site_path), load_json(tables_path))
+        # Templates the previous site.json shares stay out of the pages a partial crawl saw them on
+        self.templates.seed(previous_site.get("components", {}).get("templates", {}))
+        
+        # Index entries carry the url and contentHash SiteMerge needs, so old shards are never read
+        entries = {kind: {slug: entry for slug, entry in previous_index.get(kind, {}).items()
+                          if os.path.exists(os.path.join(data_dir, kind, entry["file"]))}
+                   for kind in SHARD_KINDS}
+        merge = SiteMerge({"pages": entries["pages"], "blog": {"posts": entries["posts"]},
+                           "products": entries["products"]}, self.fetched_urls(),
+                          lambda kind, slug: load_json(os.path.join(data_dir, kind, entries[kind][slug]["file"])))
+        
+        index = {}
+        shards_written = 0
+        for kind in SHARD_KINDS:
+            merge.add(kind, self.new_pages(kind))
+            os.makedirs(os.path.join(data_dir, kind), exist_ok=True)
+            index[kind] = {}
+            for slug, digest in merge.entries[kind]:
+                if digest is None:
+                    index[kind][slug] = entries[kind][slug]
+                    continue
+                page_data = dict(self.new_page(kind, slug), contentHash=digest)
+                file_name = quote(slug, safe='') + '.json'
+                write_atomic(os.path.join(data_dir, kind, file_name), json.dumps(page_data, indent=2, ensure_ascii=False))
+                shards_written += 1
+                index[kind][slug] = {
+                    "type": page_data["type"],
+                    "title": page_data["seo"].get("title", ""),
+                    "url": page_data["url"],
+                    "contentHash": digest,
+                    "file": file_name
+                }
+            for slug in merge.changes["removed"][kind]:
+                os.remove(os.path.join(data_dir, kind, entries[kind][slug]["file"]))
+        
+        # Routes import site.json statically, the asset, variant and template tables load on first use
+        site, tables = split_tables(self.site_wide_data(previous_site, merge))
+        written = write_if_changed(site_path, json.dumps(site, indent=2, ensure_ascii=False))
+        written = write_if_changed(tables_path, json.dumps(tables, indent=2, ensure_ascii=False)) or written
+        written = write_if_changed(index_path, json.dumps(index, indent=2, ensure_ascii=False)) or written
+        print(f"  {shards_written} page shards written")
+        return merge, written
+    
+    def write_changes(self, merge, site_data_written, path='scrape_changes.json'):
+        """Record which slugs were added, changed or removed so builds can rebuild only those routes"""
+        changes = {
+            "generatedAt": datetime.now().isoformat(),
+            "siteDataChanged": site_data_written,
+            "added": merge.changes["added"],
+            "changed": merge.changes["changed"],
+            "removed": merge.changes["removed"],
+            "unchanged": merge.unchanged
+        }
+        write_atomic(path, json.dumps(changes, indent=2, ensure_ascii=False))
+        counts = {state: sum(len(slugs) for slugs in changes[state].values()) for state in ('added', 'changed', 'removed')}
+        print(f"✓ Saved changes to {path}: {counts['added']} added, {counts['changed']} changed, "
+              f"{counts['removed']} removed, {merge.unchanged} unchanged")
+    
+    def save_nextjs_data(self, layout='single'):
+        """Save data in Next.js compatible format, as one siteData.json or with layout='sharded' one file per page"""
+        if layout not in ('single', 'sharded'):
+            raise ValueError(f"Unknown layout {layout!r}, expected 'single' or 'sharded'")
+        started = time.perf_counter()
         # Create data directory for Next.js
         os.makedirs('src/data', exist_ok=True)
         
         # Save main site data
         site_data_path = 'src/data/siteData.json'
-        with open(site_data_path, 'w', encoding='utf-8') as f:
-            # Convert sets to lists for JSON serialization
-            if isinstance(self.site_data["blog"]["categories"], set):
-                self.site_data["blog"]["categories"] = list(self.site_data["blog"]["categories"])
-            if isinstance(self.site_data["blog"]["tags"], set):
-                self.site_data["blog"]["tags"] = list(self.site_data["blog"]["tags"])
-            
-            json.dump(self.site_data, f, indent=2, ensure_ascii=False)
-        print(f"✓ Saved site data to {site_data_path}")
+        # Convert sets to lists for JSON serialization
+        if isinstance(self.site_data["blog"]["categories"], set):
+            self.site_data["blog"]["categories"] = list(self.site_data["blog"]["categories"])
+        if isinstance(self.site_data["blog"]["tags"], set):
+            self.site_data["blog"]["tags"] = list(self.site_data["blog"]["tags"])
+        
+        if layout == 'sharded':
+            # Routes load only their own page file, listed in src/data/index.json
+            merge, written = self.write_sharded_site_data('src/data')
+            print(f"✓ {'Saved' if written else 'Unchanged'} sharded site data in src/data")
+        else:
+            merge, written = self.write_site_data(site_data_path)
+            print(f"✓ {'Saved' if written else 'Unchanged'} site data at {site_data_path}")
+        self.write_changes(merge, written)
+        self.metrics.since('save_site_data', started)
+        
+        # Inverted index of every merged page, so a search never loads page content
+        started = time.perf_counter()
+        search_index = SearchIndex()
+        for kind, slug, page_data in self.merged_pages(merge):
+            search_index.add(kind, slug, page_data)
+        search_written = search_index.write('src/data/search')
+        print(f"✓ {'Saved' if search_written else 'Unchanged'} search index of {len(search_index)} pages in src/data/search")
+        self.metrics.since('save_search_index', started)
         
         # Create TypeScript type definitions
+        started = time.perf_counter()
         types_content = '''// Auto-generated types from scraped content
 
 export interface SiteMetadata {
@@ -655,11 +1267,29 @@ export interface ContentBlock {
   text?: string;
   items?: string[];
   listType?: 'ul' | 'ol';
-  src?: string;
-  alt?: string;
+  asset?: string;
   caption?: string;
 }
 
+export interface ImageAsset {
+  src: string;
+  alt: string;
+  title: string;
+  width: string;
+  height: string;
+  pageUrl: string;
+  pages: number;
+}
+
+export interface PageTemplate {
+  tag: string;
+  id: string;
+  text: string;
+  links: NavigationItem[];
+  images: string[];  // Asset IDs
+  pages: number;
+}
+
 export interface PageSection {
   id: string;
   className: string;
@@ -668,7 +1298,7 @@ export interface PageSection {
     text: string;
   };
   content: ContentBlock[];
-  images: string[];
+  images: string[];  // Asset IDs
 }
 
 export interface PageData {
@@ -676,12 +1306,30 @@ export interface PageData {
   slug: string;
   type: string;
   scrapedAt: string;
+  contentHash?: string;
   seo: SEOData;
   content: {
     sections: PageSection[];
-    images: Record<string, any>;
+    images: string[];  // Asset IDs
   };
   components: any;
+  templates: string[];  // Template IDs of the shared header, footer and nav blocks
+}
+
+export interface ImageVariant {
+  src: string;
+  width: number;
+  height: number;
+  format: 'avif' | 'webp';
+  bytes: number;
+}
+
+export interface OptimizedImage {
+  width: number;
+  height: number;
+  variants: ImageVariant[];
+  srcset: Record<string, string>;
+  placeholder: string;
 }
 
 export interface SiteData {
@@ -698,21 +1346,163 @@ export interface SiteData {
     tags: string[];
   };
   products: Record<string, PageData>;
+  components: {
+    templates: Record<string, PageTemplate>;
+    [name: string]: any;
+  };
+  media: {
+    images: Record<string, OptimizedImage>;
+    assets: Record<string, ImageAsset>;
+    videos: any[];
+  };
   seo: Record<string, SEOData>;
+  aliases: Record<string, string>;  // Near-duplicate URL to the URL of its stored page
+}
+
+export interface PageIndexEntry {
+  type: string;
+  title: string;
+  url: string;
+  contentHash: string;
+  file: string;
+}
+
+export interface PageIndex {
+  pages: Record<string, PageIndexEntry>;
+  posts: Record<string, PageIndexEntry>;
+  products: Record<string, PageIndexEntry>;
+}
+
+// Site-wide data of the sharded layout, pages are loaded one file at a time
+export type SiteShell = Omit<SiteData, 'pages' | 'products' | 'seo' | 'blog' | 'components' | 'media'> & {
+  blog: Omit<SiteData['blog'], 'posts'>;
+  components: Omit<SiteData['components'], 'templates'>;
+  media: Omit<SiteData['media'], 'images' | 'assets'>;
+};
+
+// Tables of the sharded layout in src/data/assets.json, loaded on demand
+export interface SiteTables {
+  assets: Record<string, ImageAsset>;
+  images: Record<string, OptimizedImage>;
+  templates: Record<string, PageTemplate>;
+}
+
+// Full-text search index in src/data/search, term shards are loaded on demand
+export interface SearchIndex {
+  version: number;
+  fields: Record<string, number>;  // Score of one term occurrence per field
+  shards: number;
+  docs: [string, string, string][];  // [collection, slug, title] by document number
+}
+
+export type SearchShard = Record<string, number[]>;  // Term to flat [doc, score, doc, score, ...]
+
+export interface SearchResult {
+  collection: 'pages' | 'posts' | 'products';
+  slug: string;
+  title: string;
+  score: number;
 }
 '''
         
         types_path = 'src/types/siteData.ts'
         os.makedirs('src/types', exist_ok=True)
-        with open(types_path, 'w', encoding='utf-8') as f:
-            f.write(types_content)
-        print(f"✓ Created TypeScript types at {types_path}")
+        # Rewriting identical files would still invalidate the Next.js build cache
+        written = write_if_changed(types_path, types_content)
+        print(f"✓ {'Created' if written else 'Unchanged'} TypeScript types at {types_path}")
+        self.metrics.since('save_types', started)
         
         # Create data access utilities
-        utils_content = '''// Utility functions for accessing site data
+        started = time.perf_counter()
+        if layout == 'sharded':
+            utils_content = '''// Utility functions for accessing sharded site data, each page file is loaded on demand
+
+import site from '@/data/site.json';
+import index from '@/data/index.json';
+import {
+  ImageAsset, OptimizedImage, PageData, PageIndex, PageIndexEntry, PageTemplate, SEOData, SiteShell, SiteTables
+} from '@/types/siteData';
+
+type Collection = keyof PageIndex;
+
+const COLLECTIONS: Collection[] = ['pages', 'posts', 'products'];
+
+// Literal prefixes let the bundler split every page file into its own chunk
+const loaders: Record<Collection, (file: string) => Promise<{ default: unknown }>> = {
+  pages: (file) => import(`../data/pages/${file}`),
+  posts: (file) => import(`../data/posts/${file}`),
+  products: (file) => import(`../data/products/${file}`)
+};
+
+export const getSiteData = (): SiteShell => site as SiteShell;
+
+export const getPageIndex = (): PageIndex => index as PageIndex;
+
+export const findPage = (slug: string): { collection: Collection; entry: PageIndexEntry } | null => {
+  const pageIndex = getPageIndex();
+  for (const collection of COLLECTIONS) {
+    const entry = pageIndex[collection][slug];
+    if (entry) {
+      return { collection, entry };
+    }
+  }
+  return null;
+};
+
+const loadPage = async (collection: Collection, entry: PageIndexEntry): Promise<PageData> => {
+  const loaded = await loaders[collection](entry.file);
+  return loaded.default as PageData;
+};
+
+export const getPageBySlug = async (slug: string): Promise<PageData | null> => {
+  const found = findPage(slug);
+  return found ? loadPage(found.collection, found.entry) : null;
+};
+
+const loadCollection = (collection: Collection): Promise<PageData[]> =>
+  Promise.all(Object.values(getPageIndex()[collection]).map((entry) => loadPage(collection, entry)));
+
+// Loads every page, prefer getPageIndex() for listings
+export const getAllPages = async (): Promise<PageData[]> =>
+  (await Promise.all(COLLECTIONS.map(loadCollection))).flat();
+
+export const getBlogPosts = (): Promise<PageData[]> => loadCollection('posts');
+
+export const getProducts = (): Promise<PageData[]> => loadCollection('products');
+
+export const getNavigation = () => {
+  const data = getSiteData();
+  return data.navigation;
+};
+
+export const getSEOData = async (slug: string): Promise<SEOData | null> => {
+  const page = await getPageBySlug(slug);
+  return page ? page.seo : null;
+};
+
+// Assets, image variants and templates are one chunk of their own, loaded once on first use
+let tables: Promise<SiteTables> | null = null;
+
+const loadTables = (): Promise<SiteTables> => {
+  if (!tables) {
+    tables = import('../data/assets.json').then((module) => module.default as SiteTables);
+  }
+  return tables;
+};
+
+export const getAsset = async (id: string): Promise<ImageAsset | null> => (await loadTables()).assets[id] || null;
+
+export const getOptimizedImage = async (src: string): Promise<OptimizedImage | null> =>
+  (await loadTables()).images[src] || null;
+
+export const getTemplate = async (id: string): Promise<PageTemplate | null> =>
+  (await loadTables()).templates[id] || null;
+'''
+        else:
+            utils_content = '''// Utility functions for accessing site data
 
 import siteData from '@/data/siteData.json';
-import { SiteData, PageData } from '@/types/siteData';
+import { ImageAsset, PageTemplate, SiteData, PageData } from '@/types/siteData';
 
 export const getSiteData = (): SiteData => siteData as SiteData;
 
@@ -749,29 +1539,142 @@ export const getSEOData = (slug: string) => {
   const data = getSiteData();
   return data.seo[slug] || null;
 };
+
+export const getAsset = (id: string): ImageAsset | null => {
+  const data = getSiteData();
+  return data.media.assets[id] || null;
+};
+
+export const getTemplate = (id: string): PageTemplate | null => {
+  const data = getSiteData();
+  return data.components.templates[id] || null;
+};
 '''
         
         utils_path = 'src/lib/siteData.ts'
         os.makedirs('src/lib', exist_ok=True)
-        with open(utils_path, 'w', encoding='utf-8') as f:
-            f.write(utils_content)
-        print(f"✓ Created data utilities at {utils_path}")
+        written = write_if_changed(utils_path, utils_content)
+        print(f"✓ {'Created' if written else 'Unchanged'} data utilities at {utils_path}")
+        self.metrics.since('save_utils', started)
+        
+        # Search helper for the index in src/data/search, tokenizing queries as search_index does
+        started = time.perf_counter()
+        ts_list = lambda words: '[' + ', '.join(f"'{word}'" for word in words) + ']'
+        search_content = '''// Full-text search over the precomputed index in src/data/search
+
+import searchIndex from '@/data/search/index.json';
+import { SearchIndex, SearchResult, SearchShard } from '@/types/siteData';
+
+const index = searchIndex as unknown as SearchIndex;
+
+const STOP_WORDS = new Set<string>(STOP_WORDS_LIST);
+
+const STEM_SUFFIXES = STEM_SUFFIXES_LIST;
+const LY_MIN_STEM = LY_MIN_STEM_VALUE;
+const LY_KEEP_AFTER = 'LY_KEEP_AFTER_VALUE';
+
+const shards = new Map<number, Promise<SearchShard>>();
+
+export const stem = (input: string): string => {
+  let word = input;
+  if (word.length > 4 && word.endsWith('ies')) {
+    word = word.slice(0, -3) + 'y';
+  } else if (word.length > 3 && word.endsWith('s') && !['ss', 'us', 'is'].some((end) => word.endsWith(end))) {
+    word = word.slice(0, -1);
+  }
+
+  for (const suffix of STEM_SUFFIXES) {
+    if (!word.endsWith(suffix)) {
+      continue;
+    }
+    const stripped = word.slice(0, -suffix.length);
+    if (stripped.length < 3 || (suffix === 'ly' && (stripped.length < LY_MIN_STEM
+        || LY_KEEP_AFTER.includes(stripped[stripped.length - 1])))) {
+      continue;
+    }
+    word = stripped;
+    const last = word[word.length - 1];
+    if ((suffix === 'ing' || suffix === 'ed') && last === word[word.length - 2] && !'lsz'.includes(last)) {
+      word = word.slice(0, -1);
+    }
+    break;
+  }
+  return word;
+};
+
+export const tokenize = (text: string): string[] =>
+  (text.normalize('NFKD').replace(/\\p{M}/gu, '').toLowerCase().match(/[a-z0-9]+/g) || [])
+    .filter((word) => !STOP_WORDS.has(word))
+    .map(stem);
+
+// 32-bit FNV-1a, the scraper puts each term in the shard this picks
+const shardOf = (term: string): number => {
+  let hash = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(term)) {
+    hash = Math.imul(hash ^ byte, 0x01000193) >>> 0;
+  }
+  return hash % index.shards;
+};
+
+const loadShard = (shard: number): Promise<SearchShard> => {
+  let loaded = shards.get(shard);
+  if (!loaded) {
+    loaded = import(`../data/search/terms-${shard}.json`).then((module) => module.default as SearchShard);
+    shards.set(shard, loaded);
+  }
+  return loaded;
+};
+
+const postingsOf = async (term: string): Promise<number[]> => {
+  const shard = await loadShard(shardOf(term));
+  return Object.prototype.hasOwnProperty.call(shard, term) ? shard[term] : [];
+};
+
+export const search = async (query: string, limit = 10): Promise<SearchResult[]> => {
+  const terms = Array.from(new Set(tokenize(query)));
+  const scores = new Map<number, number>();
+  for (const postings of await Promise.all(terms.map(postingsOf))) {
+    // Terms found on fewer pages weigh more
+    const idf = Math.log(1 + index.docs.length / Math.max(1, postings.length / 2));
+    for (let i = 0; i < postings.length; i += 2) {
+      scores.set(postings[i], (scores.get(postings[i]) || 0) + postings[i + 1] * idf);
+    }
+  }
+
+  return Array.from(scores)
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, limit)
+    .map(([doc, score]) => {
+      const [collection, slug, title] = index.docs[doc];
+      return { collection: collection as SearchResult['collection'], slug, title, score };
+    });
+};
+'''.replace('STOP_WORDS_LIST', ts_list(sorted(STOP_WORDS))).replace('STEM_SUFFIXES_LIST', ts_list(STEM_SUFFIXES)).replace(
+            'LY_MIN_STEM_VALUE', str(LY_MIN_STEM)).replace('LY_KEEP_AFTER_VALUE', LY_KEEP_AFTER)
+        
+        search_path = 'src/lib/search.ts'
+        written = write_if_changed(search_path, search_content)
+        print(f"✓ {'Created' if written else 'Unchanged'} search helper at {search_path}")
+        self.metrics.since('save_search_helper', started)
         
         # Create summary report
+        started = time.perf_counter()
+        slugs = merge.slugs()
         summary = {
             "statistics": {
                 "totalPages": len(self.visited_urls),
-                "regularPages": len(self.site_data["pages"]),
-                "blogPosts": len(self.site_data["blog"]["posts"]),
-                "products": len(self.site_data["products"]),
+                "regularPages": len(slugs["pages"]),
+                "blogPosts": len(slugs["posts"]),
+                "products": len(slugs["products"]),
                 "totalImages": len(self.downloaded_images),
                 "forms": len(self.site_data["components"]["forms"]),
+                "templates": len(self.templates),
                 "mainMenuItems": len(self.site_data["navigation"]["mainMenu"]),
                 "socialLinks": len(self.site_data["navigation"]["socialLinks"])
             },
-            "pages": list(self.site_data["pages"].keys()),
-            "blogPosts": list(self.site_data["blog"]["posts"].keys()),
-            "products": list(self.site_data["products"].keys()),
+            "pages": slugs["pages"],
+            "blogPosts": slugs["posts"],
+            "products": slugs["products"],
             "imagesByCategory": {}
         }
         
@@ -781,26 +1684,35 @@ export const getSEOData = (slug: string) => {
             summary["imagesByCategory"][category] = summary["imagesByCategory"].get(category, 0) + 1
         
         summary_path = 'scrape_summary.json'
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
-        print(f"✓ Saved summary to {summary_path}")
+        written = write_if_changed(summary_path, json.dumps(summary, indent=2))
+        print(f"✓ {'Saved' if written else 'Unchanged'} summary at {summary_path}")
+        self.metrics.since('save_summary', started)
 
 def main():
     print("🚀 Starting Nothing Better Health scraper for Next.js/React/Tailwind 4.0...")
     print("=" * 60)
     
-    scraper = NextJSScraper()
+    scraper = NextJSScraper(stream_dir=".crawl_pages")
     
     # Crawl the site
-    scraper.crawl_site(max_pages=50)
+    # Pass --resume to continue an interrupted crawl
+    scraper.crawl_site(max_pages=50, concurrency=8, resume='--resume' in sys.argv[1:])
+    
+    # WebP/AVIF sizes and blur placeholders, skipped if Pillow is missing
+    scraper.optimize_images()
     
     # Save all data
-    scraper.save_nextjs_data()
+    # Pass --sharded to write one data file per page for the Next.js app
+    scraper.save_nextjs_data(layout='sharded' if '--sharded' in sys.argv[1:] else 'single')
+    
+    print("\n" + scraper.metrics.report())
+    scraper.metrics.write_prometheus('scrape_metrics.prom')
     
     print("\n" + "=" * 60)
     print("✅ Scraping complete!")
     print("\n📁 Created structure:")
     print("  • public/images/     - All downloaded images organized by category")
+    print("  • public/images/variants/ - Responsive WebP/AVIF versions of each image")
     print("  • src/data/          - Site content in JSON format")
     print("  • src/types/         - TypeScript type definitions")
     print("  • src/lib/           - Data access utilities")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Full-text search index for the Next.js site data
+Page titles, headings and body text are tokenized and stemmed into an inverted index with field boosts,
+split into term shards so a query loads only the shards its terms fall in
+"""
+
+import json
+import os
+import re
+import unicodedata
+
+from site_writer import write_if_changed
+
+# Score of one occurrence of a term in each field
+FIELD_BOOSTS = {'title': 5, 'headings': 3, 'body': 1}
+
+STOP_WORDS = frozenset("""
+a about all also an and any are as at be been but by can do for from has have how i if in into is it its
+just me more most my no not of on or our so such than that the their them then there these they this
+those to too us very was we were what when where which who why will with you your
+""".split())
+
+TERM = re.compile(r'[a-z0-9]+')
+
+# Tried in order, the first that leaves a stem of three or more characters is stripped
+STEM_SUFFIXES = ('ingly', 'edly', 'ing', 'ed', 'ly', 'ment')
+# -ly needs a longer stem that ends in none of these, so quickly -> quick but early, apply and family stay whole
+LY_MIN_STEM = 4
+LY_KEEP_AFTER = 'aiouypr'
+
+TERMS_PER_SHARD = 2000
+MAX_SHARDS = 64
+
+INDEX_VERSION = 2
+
+
+def normalize(text):
+    """Lowercase ASCII folding of text, accents dropped"""
+    # Every mark goes, as \p{M} in the TS helper
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.category(char).startswith('M')).lower()
+
+
+def stem(word):
+    """Light suffix-stripping stemmer, mirrored in the generated src/lib/search.ts"""
+    if len(word) > 4 and word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    for suffix in STEM_SUFFIXES:
+        if not word.endswith(suffix):
+            continue
+        stripped = word[:-len(suffix)]
+        if len(stripped) < 3 or (suffix == 'ly' and (len(stripped) < LY_MIN_STEM or stripped[-1] in LY_KEEP_AFTER)):
+            continue
+        word = stripped
+        # stopped -> stop, but still -> still
+        if suffix in ('ing', 'ed') and word[-1] == word[-2] and word[-1] not in 'lsz':
+            word = word[:-1]
+        break
+    return word
+
+
+def tokenize(text):
+    """Stemmed index terms of text, stop words left out"""
+    return [stem(word) for word in TERM.findall(normalize(text)) if word not in STOP_WORDS]
+
+
+def shard_of(term, shards):
+    """32-bit FNV-1a of the term modulo the shard count, as the TS helper computes it"""
+    value = 0x811c9dc5
+    for byte in term.encode('utf-8'):
+        value = ((value ^ byte) * 0x01000193) & 0xffffffff
+    return value % shards
+
+
+def page_fields(page_data):
+    """Searchable text of a NextJSScraper page record, by field"""
+    seo = page_data.get("seo", {})
+    headings = []
+    body = [seo.get("description", "")]
+    for section in page_data.get("content", {}).get("sections", []):
+        if section.get("heading"):
+            headings.append(section["heading"]["text"])
+        for block in section.get("content", []):
+            if block.get("type") == 'list':
+                body.extend(block.get("items", []))
+            else:
+                body.append(block.get("text") or block.get("caption") or "")
+    return {
+        'title': seo.get("title") or page_data.get("slug", ""),
+        'headings': ' '.join(headings),
+        'body': ' '.join(body)
+    }
+
+
+class SearchIndex:
+    """Inverted index of term to {document number: boosted term frequency}"""
+
+    def __init__(self):
+        self.docs = []  # [kind, slug, title] by document number
+        self.postings = {}
+
+    def add(self, kind, slug, page_data):
+        fields = page_fields(page_data)
+        doc = len(self.docs)
+        self.docs.append([kind, slug, fields['title']])
+        for field, boost in FIELD_BOOSTS.items():
+            for term in tokenize(fields[field]):
+                scores = self.postings.setdefault(term, {})
+                scores[doc] = scores.get(doc, 0) + boost
+
+    def shard_count(self):
+        return max(1, min(MAX_SHARDS, -(-len(self.postings) // TERMS_PER_SHARD)))
+
+    def write(self, directory):
+        """Write index.json and one terms-N.json per shard, returning the number of files that changed"""
+        os.makedirs(directory, exist_ok=True)
+        shards = self.shard_count()
+        terms = [{} for _ in range(shards)]
+        for term in sorted(self.postings):
+            # Flat [doc, score, doc, score, ...] arrays keep the shard files small
+            terms[shard_of(term, shards)][term] = [value for item in sorted(self.postings[term].items())
+                                                   for value in item]
+
+        meta = {"version": INDEX_VERSION, "fields": FIELD_BOOSTS, "shards": shards, "docs": self.docs}
+        written = int(write_if_changed(os.path.join(directory, 'index.json'),
+                                       json.dumps(meta, separators=(',', ':'), ensure_ascii=False)))
+        for shard, entries in enumerate(terms):
+            path = os.path.join(directory, f'terms-{shard}.json')
+            written += write_if_changed(path, json.dumps(entries, separators=(',', ':'), ensure_ascii=False))
+
+        # Shards beyond the current count belong to a larger earlier index
+        for name in os.listdir(directory):
+            match = re.fullmatch(r'terms-(\d+)\.json', name)
+            if match and int(match.group(1)) >= shards:
+                os.remove(os.path.join(directory, name))
+        return written
+
+    def __len__(self):
+        return len(self.docs)
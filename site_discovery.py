@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+URL discovery for NBHScraper and NextJSScraper
+Reads robots.txt rules and Crawl-delay, then streams nested sitemap indexes so the frontier starts
+from the site's real URL set instead of guessed paths
+"""
+
+import zlib
+import xml.etree.ElementTree as ET
+from collections import deque
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+class SiteDiscovery:
+    """robots.txt rules plus the pages and lastmod dates listed in a site's sitemaps"""
+
+    def __init__(self, session, base_url, max_sitemaps=200, timeout=30):
+        self.session = session
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc
+        self.user_agent = session.headers.get('User-Agent', '*')
+        self.max_sitemaps = max_sitemaps
+        self.timeout = timeout
+        self.robots = None
+        self.crawl_delay = None
+        self.sitemaps = []
+
+    def read_robots(self):
+        """Fetch robots.txt, treating a missing file as allowing everything like RobotFileParser.read"""
+        self.robots = RobotFileParser(urljoin(self.base_url, '/robots.txt'))
+        try:
+            response = self.session.get(self.robots.url, timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            print(f"Could not fetch robots.txt: {e}")
+            self.robots.allow_all = True
+            return
+
+        with response:
+            if response.status_code in (401, 403):
+                self.robots.disallow_all = True
+            elif response.status_code >= 400:
+                self.robots.allow_all = True
+            else:
+                self.robots.parse(line.decode('utf-8', 'replace') for line in response.iter_lines())
+                self.crawl_delay = self.robots.crawl_delay(self.user_agent)
+                self.sitemaps = self.robots.site_maps() or []
+
+    def allowed(self, url):
+        """Whether robots.txt lets this crawler fetch url"""
+        return self.robots is None or self.robots.can_fetch(self.user_agent, url)
+
+    def read_sitemap(self, url):
+        """Yield ('url' or 'sitemap', loc, lastmod) from a sitemap as its bytes arrive"""
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            parser = ET.XMLPullParser(events=('end',))
+            decompressor = None
+            first = True
+            for chunk in response.iter_content(65536):
+                # Sitemaps may be served as .xml.gz files rather than gzip-encoded responses
+                if first and chunk.startswith(GZIP_MAGIC):
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                first = False
+                parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+                yield from self._entries(parser)
+            parser.close()
+            yield from self._entries(parser)
+
+    def _entries(self, parser):
+        for _, elem in parser.read_events():
+            kind = _local_name(elem.tag)
+            if kind not in ('url', 'sitemap'):
+                continue
+            fields = {_local_name(child.tag): (child.text or '').strip() for child in elem}
+            # Finished entries are dropped so large sitemaps stream in constant memory
+            elem.clear()
+            if fields.get('loc'):
+                yield kind, fields['loc'], fields.get('lastmod') or None
+
+    def discover(self):
+        """Return {url: lastmod} for every same-site page robots.txt allows, from all nested sitemaps"""
+        if self.robots is None:
+            self.read_robots()
+
+        queue = deque(self.sitemaps or [urljoin(self.base_url, '/sitemap.xml')])
+        read = set()
+        urls = {}
+        while queue and len(read) < self.max_sitemaps:
+            sitemap_url = queue.popleft()
+            if sitemap_url in read:
+                continue
+            read.add(sitemap_url)
+            try:
+                for kind, loc, lastmod in self.read_sitemap(sitemap_url):
+                    if kind == 'sitemap':
+                        queue.append(loc)
+                        continue
+                    if urlparse(loc).netloc != self.host or not self.allowed(loc):
+                        continue
+                    # The home page is crawled as base_url, listed with or without a trailing slash
+                    if loc.rstrip('/') == self.base_url.rstrip('/'):
+                        loc = self.base_url
+                    urls[loc] = lastmod
+            except (requests.RequestException, ET.ParseError, zlib.error) as e:
+                print(f"Could not read sitemap {sitemap_url}: {e}")
+        return urls
+
+    def seeds(self):
+        """Discovered URLs, most recently modified first"""
+        urls = self.discover()
+        # ISO 8601 dates sort as text, undated pages go last
+        return sorted(urls, key=lambda url: urls[url] or '', reverse=True)
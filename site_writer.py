@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Streaming output for NextJSScraper
+Writes each page record to its own shard as soon as it is scraped, assembles siteData.json
+from the shards without holding every page in memory and merges it into the previous file
+so pages whose content did not change keep their bytes
+"""
+
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+from urllib.parse import quote
+
+# Shard folder for each page collection in site_data
+SHARD_KINDS = ('pages', 'posts', 'products')
+
+# Page fields that differ on every crawl and are left out of contentHash
+VOLATILE_FIELDS = ('scrapedAt', 'contentHash')
+
+# Site-wide tables the sharded layout keeps out of site.json, by name in its assets.json and place in site_data
+SITE_TABLES = {"assets": ("media", "assets"), "images": ("media", "images"), "templates": ("components", "templates")}
+
+
+def write_atomic(path, text):
+    """Write text to path so readers never see a half-written file"""
+    tmp_path = path + '.part'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_if_changed(path, text):
+    """write_atomic unless path already holds text, returning whether it was written"""
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    write_atomic(path, text)
+    return True
+
+
+def load_json(path):
+    """Parse a previously written JSON file, or return {} if it is missing or unreadable"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError as e:
+        print(f"Ignoring unreadable {path}: {e}")
+        return {}
+
+
+def content_hash(page_data):
+    """SHA-256 of a page record's extracted data, ignoring when it was scraped"""
+    stable = {key: value for key, value in page_data.items() if key not in VOLATILE_FIELDS}
+    text = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def page_references(page_data):
+    """(asset IDs, template IDs) a page record shows"""
+    return page_data.get("content", {}).get("images", []), page_data.get("templates", [])
+
+
+def split_tables(site):
+    """(site without the SITE_TABLES, those tables by name) for the sharded layout's site.json and assets.json"""
+    shell = dict(site)
+    tables = {}
+    for name, (section, key) in SITE_TABLES.items():
+        shell[section] = {k: v for k, v in shell.get(section, {}).items() if k != key}
+        tables[name] = site.get(section, {}).get(key, {})
+    return shell, tables
+
+
+def join_tables(shell, tables):
+    """Inverse of split_tables, a site.json written before the split keeps its own tables"""
+    site = dict(shell)
+    for name, (section, key) in SITE_TABLES.items():
+        if name in tables:
+            site[section] = dict(site.get(section, {}), **{key: tables[name]})
+    return site
+
+
+def collection(site_data, kind):
+    """The page collection of site_data for a shard kind"""
+    if kind == 'posts':
+        return site_data.get("blog", {}).get("posts", {})
+    return site_data.get(kind, {})
+
+
+class PageShardWriter:
+    def __init__(self, shard_dir=".crawl_pages", resume=False):
+        self.shard_dir = shard_dir
+        self.slugs = {kind: [] for kind in SHARD_KINDS}  # Slugs per kind in crawl order
+        self.known = set()
+
+        if not resume and os.path.isdir(shard_dir):
+            shutil.rmtree(shard_dir)
+        for kind in SHARD_KINDS:
+            os.makedirs(os.path.join(shard_dir, kind), exist_ok=True)
+
+        # The index records crawl order so a crashed run can still be assembled
+        self.index_path = os.path.join(shard_dir, 'index.ndjson')
+        if resume and os.path.exists(self.index_path):
+            for kind, slug in self._read_index():
+                self._remember(kind, slug)
+        self.index = open(self.index_path, 'a', encoding='utf-8')  # None once closed, shards stay readable
+
+    def _shard_path(self, kind, slug):
+        return os.path.join(self.shard_dir, kind, quote(slug, safe='') + '.json')
+
+    def _remember(self, kind, slug):
+        if (kind, slug) in self.known:
+            return False
+        self.known.add((kind, slug))
+        self.slugs[kind].append(slug)
+        return True
+
+    def _read_index(self):
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    yield entry["kind"], entry["slug"]
+
+    def write(self, kind, slug, page_data):
+        """Persist one page record"""
+        write_atomic(self._shard_path(kind, slug), json.dumps(page_data, ensure_ascii=False))
+        if self.index is None:
+            self.index = open(self.index_path, 'a', encoding='utf-8')
+        if self._remember(kind, slug):
+            self.index.write(json.dumps({"kind": kind, "slug": slug}, ensure_ascii=False) + '\n')
+            self.index.flush()
+
+    def read(self, kind, slug):
+        with open(self._shard_path(kind, slug), encoding='utf-8') as f:
+            return json.load(f)
+
+    def iter_pages(self, kind=None, transform=None):
+        """Yield (kind, slug, page_data) one shard at a time in crawl order"""
+        if self.index is not None:
+            self.index.flush()
+        seen = set()
+        for entry_kind, slug in self._read_index():
+            if (kind is not None and entry_kind != kind) or (entry_kind, slug) in seen:
+                continue
+            seen.add((entry_kind, slug))
+            page_data = self.read(entry_kind, slug)
+            yield entry_kind, slug, transform(page_data) if transform else page_data
+
+    def close(self):
+        """Close the index file, the shards can still be read for saving"""
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+
+class LazyMapping:
+    """JSON object whose items are produced one at a time while it is written"""
+
+    def __init__(self, items, spans=None):
+        self.items = items  # Callable returning an iterator of (key, value)
+        self.spans = spans  # Optional dict receiving key: [byte offset, byte length] of each written value
+
+
+class _CountingWriter:
+    """Encodes text into a binary file, keeping the byte offset for LazyMapping spans"""
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.f.write(data)
+        self.offset += len(data)
+
+
+def _has_lazy(value):
+    if isinstance(value, LazyMapping):
+        return True
+    if isinstance(value, dict):
+        return any(_has_lazy(v) for v in value.values())
+    return False
+
+
+def _dump(f, value, level):
+    # Matches json.dump(..., indent=2, ensure_ascii=False) byte for byte
+    if not _has_lazy(value):
+        f.write(json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + '  ' * level))
+        return
+
+    items = value.items()
+    spans = value.spans if isinstance(value, LazyMapping) else None
+    pad = '  ' * (level + 1)
+    first = True
+    f.write('{')
+    for key, item in items:
+        f.write('\n' if first else ',\n')
+        first = False
+        f.write(pad + json.dumps(key, ensure_ascii=False) + ': ')
+        start = f.offset
+        _dump(f, item, level + 1)
+        if spans is not None:
+            spans[key] = [start, f.offset - start]
+    f.write('}' if first else '\n' + '  ' * level + '}')
+
+
+def write_json_streaming(path, data):
+    """Write data containing LazyMapping placeholders as indented JSON atomically, unless the file already holds it"""
+    tmp_path = path + '.part'
+    with open(tmp_path, 'wb') as f:
+        _dump(_CountingWriter(f), data, 0)
+    if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def site_index_path(site_data_path):
+    """Path of the index written next to a siteData.json"""
+    return os.path.splitext(site_data_path)[0] + '.index.json'
+
+
+class SiteDataFile:
+    """A siteData.json read through its index, one page record at a time"""
+
+    def __init__(self, path, index):
+        self.path = path
+        self.index = index  # {"size", "site": everything but the page collections, "pages": {kind: {slug: entry}}}
+
+    @classmethod
+    def open(cls, path):
+        """The file with its index, or None if either is missing or the index was written for other bytes"""
+        index = load_json(site_index_path(path))
+        if not index or not os.path.exists(path) or index.get("size") != os.path.getsize(path):
+            return None
+        return cls(path, index)
+
+    def site(self):
+        return self.index["site"]
+
+    def entries(self):
+        """The url and contentHash of every page record, shaped like site_data for SiteMerge"""
+        pages = self.index["pages"]
+        return {"pages": pages["pages"], "blog": {"posts": pages["posts"]}, "products": pages["products"]}
+
+    def record(self, kind, slug):
+        offset, length = self.index["pages"][kind][slug]["span"]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+
+class SiteMerge:
+    """Plan for merging a new crawl into the previous siteData.json by page content hash"""
+
+    def __init__(self, previous, crawled_urls, load=None):
+        self.previous = {kind: collection(previous, kind) for kind in SHARD_KINDS}
+        self.crawled_urls = crawled_urls
+        self.load = load  # load(kind, slug) reads a carried-over record when previous only holds its url and hash
+        self.entries = {}  # Kind to [(slug, new contentHash)], None keeps the previous record
+        self.references = {kind: {} for kind in SHARD_KINDS}  # Kind to {slug: page_references} of the new crawl
+        self.changes = {state: {kind: [] for kind in SHARD_KINDS} for state in ('added', 'changed', 'removed')}
+        self.unchanged = 0
+
+    def add(self, kind, pages):
+        """Plan one collection from the (slug, page_data) pairs of the new crawl"""
+        hashes = {}
+        for slug, page_data in pages:
+            hashes[slug] = content_hash(page_data)
+            self.references[kind][slug] = page_references(page_data)
+        previous = self.previous[kind]
+        entries = []
+        # Previous order first so unchanged stretches of the file stay put
+        for slug, old_page in previous.items():
+            if slug in hashes:
+                if old_page.get("contentHash") == hashes[slug]:
+                    entries.append((slug, None))
+                    self.unchanged += 1
+                else:
+                    entries.append((slug, hashes[slug]))
+                    self.changes["changed"][kind].append(slug)
+            elif old_page.get("url") in self.crawled_urls:
+                # Crawled this time without producing the page, so it is gone
+                self.changes["removed"][kind].append(slug)
+            else:
+                # Not reached by this crawl, carried over as it was
+                entries.append((slug, None))
+        for slug, digest in hashes.items():
+            if slug not in previous:
+                entries.append((slug, digest))
+                self.changes["added"][kind].append(slug)
+        self.entries[kind] = entries
+
+    def has_changes(self):
+        return any(slugs for state in self.changes.values() for slugs in state.values())
+
+    def slugs(self):
+        """Slugs of every merged collection in output order"""
+        return {kind: [slug for slug, _ in entries] for kind, entries in self.entries.items()}
+
+    def records(self, kind, read):
+        """Yield (slug, page_data) for a merged collection, read(slug) loads a page of the new crawl"""
+        for slug, digest in self.entries[kind]:
+            if digest is None:
+                yield slug, self.load(kind, slug) if self.load else self.previous[kind][slug]
+            else:
+                yield slug, dict(read(slug), contentHash=digest)
+
+    def referenced(self):
+        """Yield page_references of every merged page, reading a carried-over record only if its entry lacks them"""
+        for kind, entries in self.entries.items():
+            for slug, _ in entries:
+                references = self.references[kind].get(slug)
+                if references is None:
+                    old_page = self.previous[kind][slug]
+                    if "assets" in old_page:
+                        references = old_page["assets"], old_page["templates"]
+                    else:
+                        references = page_references(self.load(kind, slug) if self.load else old_page)
+                yield references
@@ -34,11 +34,29 @@ export interface ContentBlock {
   text?: string;
   items?: string[];
   listType?: 'ul' | 'ol';
-  src?: string;
-  alt?: string;
+  asset?: string;
   caption?: string;
 }
 
+export interface ImageAsset {
+  src: string;
+  alt: string;
+  title: string;
+  width: string;
+  height: string;
+  pageUrl: string;
+  pages: number;
+}
+
+export interface PageTemplate {
+  tag: string;
+  id: string;
+  text: string;
+  links: NavigationItem[];
+  images: string[];  // Asset IDs
+  pages: number;
+}
+
 export interface PageSection {
   id: string;
   className: string;
@@ -47,7 +65,7 @@ export interface PageSection {
     text: string;
   };
   content: ContentBlock[];
-  images: string[];
+  images: string[];  // Asset IDs
 }
 
 export interface PageData {
@@ -55,12 +73,30 @@ export interface PageData {
   slug: string;
   type: string;
   scrapedAt: string;
+  contentHash?: string;
   seo: SEOData;
   content: {
     sections: PageSection[];
-    images: Record<string, any>;
+    images: string[];  // Asset IDs
   };
   components: any;
+  templates: string[];  // Template IDs of the shared header, footer and nav blocks
+}
+
+export interface ImageVariant {
+  src: string;
+  width: number;
+  height: number;
+  format: 'avif' | 'webp';
+  bytes: number;
+}
+
+export interface OptimizedImage {
+  width: number;
+  height: number;
+  variants: ImageVariant[];
+  srcset: Record<string, string>;
+  placeholder: string;
 }
 
 export interface SiteData {
@@ -77,5 +113,60 @@ export interface SiteData {
     tags: string[];
   };
   products: Record<string, PageData>;
+  components: {
+    templates: Record<string, PageTemplate>;
+    [name: string]: any;
+  };
+  media: {
+    images: Record<string, OptimizedImage>;
+    assets: Record<string, ImageAsset>;
+    videos: any[];
+  };
   seo: Record<string, SEOData>;
+  aliases: Record<string, string>;  // Near-duplicate URL to the URL of its stored page
+}
+
+export interface PageIndexEntry {
+  type: string;
+  title: string;
+  url: string;
+  contentHash: string;
+  file: string;
+}
+
+export interface PageIndex {
+  pages: Record<string, PageIndexEntry>;
+  posts: Record<string, PageIndexEntry>;
+  products: Record<string, PageIndexEntry>;
+}
+
+// Site-wide data of the sharded layout, pages are loaded one file at a time
+export type SiteShell = Omit<SiteData, 'pages' | 'products' | 'seo' | 'blog' | 'components' | 'media'> & {
+  blog: Omit<SiteData['blog'], 'posts'>;
+  components: Omit<SiteData['components'], 'templates'>;
+  media: Omit<SiteData['media'], 'images' | 'assets'>;
+};
+
+// Tables of the sharded layout in src/data/assets.json, loaded on demand
+export interface SiteTables {
+  assets: Record<string, ImageAsset>;
+  images: Record<string, OptimizedImage>;
+  templates: Record<string, PageTemplate>;
+}
+
+// Full-text search index in src/data/search, term shards are loaded on demand
+export interface SearchIndex {
+  version: number;
+  fields: Record<string, number>;  // Score of one term occurrence per field
+  shards: number;
+  docs: [string, string, string][];  // [collection, slug, title] by document number
+}
+
+export type SearchShard = Record<string, number[]>;  // Term to flat [doc, score, doc, score, ...]
+
+export interface SearchResult {
+  collection: 'pages' | 'posts' | 'products';
+  slug: string;
+  title: string;
+  score: number;
 }
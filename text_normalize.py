@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Text normalization shared by NBHScraper and NextJSScraper
+Collapses whitespace and drops special characters with a translate-table fast path for ASCII
+and a bounded memo cache for the nav labels and footer text repeated on every page
+"""
+
+import re
+from functools import lru_cache
+
+WHITESPACE = re.compile(r'\s+')
+# Keep word characters, whitespace and basic punctuation
+DISALLOWED = re.compile(r'[^\w\s\-.,!?;:()\'"/@#$%&*+=]')
+
+# Same rule as DISALLOWED for the ASCII range, applied with str.translate
+ASCII_DELETE = {c: None for c in range(128) if DISALLOWED.match(chr(c))}
+
+CACHE_SIZE = 16384
+# Labels and short lines repeat across pages, longer texts are mostly one-off and would push them out
+CACHE_MAX_LENGTH = 256
+
+
+def clean_text_uncached(text):
+    """Clean and normalize text content"""
+    if not text:
+        return ""
+    if text.isascii():
+        # str.split() splits on the same whitespace as \s
+        return ' '.join(text.split()).translate(ASCII_DELETE).strip()
+    text = WHITESPACE.sub(' ', text)
+    return DISALLOWED.sub('', text).strip()
+
+
+clean_text_cached = lru_cache(maxsize=CACHE_SIZE)(clean_text_uncached)
+
+
+def clean_text(text):
+    """clean_text_uncached, memoized for strings short enough to repeat"""
+    if text and len(text) <= CACHE_MAX_LENGTH:
+        return clean_text_cached(text)
+    return clean_text_uncached(text)
+
+
+def clean_texts(texts):
+    """Clean many strings in one call, normalizing each distinct string once"""
+    done = {}
+    results = []
+    for text in texts:
+        cleaned = done.get(text)
+        if cleaned is None:
+            cleaned = done[text] = clean_text(text)
+        results.append(cleaned)
+    return results